@@ -13,6 +13,7 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import os
+from database import HEATMAP_CELL_SCALE, period_cutoff, to_epoch
 
 class Analytics:
     def __init__(self, database):
@@ -215,38 +216,29 @@ class Analytics:
         print(f"✅ PDF report generated: {filepath}")
         return filepath
         
-    def generate_heatmap_data(self, period='all'):
+    def _period_cutoff_epoch(self, period):
+        """ts_epoch lower bound for an analytics period (same as statistics and the heatmap viewport)"""
+        return to_epoch(period_cutoff(period))
+        
+    def generate_heatmap_data(self, period='all', limit=None):
         """
         Generate heatmap data for visualization
         
         Args:
             period (str): Time period
+            limit (int): Keep only the busiest `limit` cells (all if None)
             
         Returns:
-            list: List of [lat, lon, intensity] for heatmap
+            list: List of [lat, lon, intensity] for heatmap, busiest first
         """
-        if period == 'all':
-            detections = self.db.get_all_detections()
-        else:
-            hours_map = {'today': 24, 'week': 168, 'month': 720}
-            detections = self.db.get_detections_last_hours(hours_map.get(period, 24))
+        # Read the pre-aggregated grid cells instead of every detection row
+        cells = self.db.get_heatmap_cells(self._period_cutoff_epoch(period))
+        busiest = sorted(cells.items(), key=lambda cell: cell[1], reverse=True)
         
-        # Group by location and count
-        location_counts = {}
-        for d in detections:
-            key = f"{d['latitude']:.4f}_{d['longitude']:.4f}"
-            if key not in location_counts:
-                location_counts[key] = {
-                    'lat': d['latitude'],
-                    'lon': d['longitude'],
-                    'count': 0
-                }
-            location_counts[key]['count'] += 1
-        
-        # Convert to heatmap format
+        # Convert to heatmap format (cell centers)
         heatmap_data = [
-            [loc['lat'], loc['lon'], loc['count']]
-            for loc in location_counts.values()
+            [cell_lat / HEATMAP_CELL_SCALE, cell_lon / HEATMAP_CELL_SCALE, count]
+            for (cell_lat, cell_lon), count in busiest[:limit]
         ]
         
         return heatmap_data
@@ -261,19 +253,12 @@ class Analytics:
         Returns:
             dict: Hour -> count mapping
         """
-        if period == 'all':
-            detections = self.db.get_all_detections()
-        else:
-            hours_map = {'today': 24, 'week': 168, 'month': 720}
-            detections = self.db.get_detections_last_hours(hours_map.get(period, 24))
+        buckets, _ = self.db.get_statistics_buckets(self._period_cutoff_epoch(period))
         
         hourly_counts = {str(h).zfill(2): 0 for h in range(24)}
         
-        for d in detections:
-            timestamp = d['timestamp']
-            if ' ' in timestamp:
-                hour = timestamp.split()[1].split(':')[0]
-                hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
+        for (hour, _alert_level), (count, _confidence_sum) in buckets.items():
+            hourly_counts[hour] = hourly_counts.get(hour, 0) + count
         
         return hourly_counts
 
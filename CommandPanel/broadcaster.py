@@ -0,0 +1,110 @@
+"""
+Broadcaster - Coalesced, rate-limited fan-out of new detections
+Stored detections are collected per target and flushed to Socket.IO
+clients as one 'new_detections' frame every `interval` seconds. A newer
+detection of the same target replaces the pending one, and snapshots are
+only sent to clients that subscribed to images (everyone else gets the
+image_url to load on demand).
+"""
+
+import collections
+import threading
+import time
+
+
+class Broadcaster:
+    def __init__(self, socketio, send, interval=0.1, max_frame=200, tick=None):
+        """
+        Initialize the broadcaster
+        
+        Args:
+            socketio (SocketIO): Used to run the flush loop as a background task
+            send (callable): send(event, payload, full_payload) fans a frame out;
+                full_payload (with images) goes to image subscribers
+            interval (float): Seconds between frames
+            max_frame (int): Max detections per frame (the rest wait for the next one)
+            tick (callable): Optional hook run on every loop iteration
+        """
+        self.socketio = socketio
+        self.send = send
+        self.interval = interval
+        self.max_frame = max_frame
+        self.tick = tick
+        
+        self.pending = collections.OrderedDict()  # target key -> (item, image_base64, merged)
+        self.lock = threading.Lock()
+        self.published = 0
+        self.merged = 0
+        self.frames = 0
+        self._task = None
+        
+    def publish(self, key, detection_id, detection, duration=0):
+        """
+        Queue a stored detection for the next frame
+        
+        Args:
+            key (str): Target identity; a pending detection with the same key is superseded
+            detection_id (int): Database id
+            detection (dict): Detection data (image_base64 is split off)
+            duration (float): How long the target has been visible
+        """
+        detection = dict(detection)
+        image_base64 = detection.pop('image_base64', None)
+        detection['id'] = detection_id
+        detection['image_url'] = f"/api/detections/{detection_id}/image" if image_base64 else None
+        item = {'detection': detection, 'duration': duration, 'detection_id': detection_id}
+        
+        with self.lock:
+            self.published += 1
+            previous = self.pending.pop(key, None)
+            merged = 0
+            if previous is not None:
+                merged = previous[2] + 1
+                self.merged += 1
+            self.pending[key] = (item, image_base64, merged)
+            
+    def start(self):
+        """Start the flush loop"""
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+            
+    def depth(self):
+        """Detections waiting for the next frame"""
+        return len(self.pending)
+        
+    def _take_frame(self):
+        with self.lock:
+            count = min(len(self.pending), self.max_frame)
+            return [self.pending.popitem(last=False)[1] for _ in range(count)]
+            
+    def flush(self):
+        """Send one frame now (no-op when nothing is pending)"""
+        entries = self._take_frame()
+        if not entries:
+            return
+            
+        timestamp = time.time()
+        lite = []
+        full = []
+        for item, image_base64, merged in entries:
+            item = dict(item, merged=merged)  # merged: superseded updates folded into this one
+            lite.append(item)
+            full.append(dict(item, detection=dict(item['detection'], image_base64=image_base64)))
+            
+        self.frames += 1
+        self.send(
+            'new_detections',
+            {'detections': lite, 'timestamp': timestamp},
+            {'detections': full, 'timestamp': timestamp}
+        )
+        
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                self.flush()
+                if self.tick:
+                    self.tick()
+            except Exception as e:
+                print(f"❌ Broadcast error: {e}")
+            self.socketio.sleep(max(self.interval - (time.monotonic() - started), 0))
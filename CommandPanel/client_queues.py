@@ -0,0 +1,191 @@
+"""
+Client Queues - Bounded per-client outbound queues for Socket.IO events
+Each connected client gets its own small queue. Events are emitted with an
+ack callback and only `window` of them may be un-acked at once, so a slow or
+stalled client stops receiving instead of piling up buffers on the server.
+When a queue is full the overflow policy decides what gives:
+
+    drop_oldest  discard the oldest queued event
+    coalesce     keep only the newest event of the same name (latest snapshot)
+    disconnect   drop the client (it resyncs when it reconnects)
+
+Clients that lost events get a 'backpressure' event so they can delta-sync.
+"""
+
+import collections
+import threading
+import time
+
+OVERFLOW_POLICIES = ('drop_oldest', 'coalesce', 'disconnect')
+
+
+class ClientQueue:
+    def __init__(self, sid):
+        self.sid = sid
+        self.queue = collections.deque()
+        self.in_flight = collections.OrderedDict()  # Un-acked event id -> send time, oldest first
+        self.next_id = 0
+        self.lost = 0  # Events dropped since the last 'backpressure' notice
+        self.sent = 0
+        self.dropped = 0
+
+
+class ClientQueueManager:
+    def __init__(self, socketio, max_size=32, policy='drop_oldest', window=4, ack_timeout=5.0):
+        """
+        Initialize the queue manager
+        
+        Args:
+            socketio (SocketIO): Used to emit and disconnect
+            max_size (int): Events queued per client before the overflow policy applies
+            policy (str): One of OVERFLOW_POLICIES
+            window (int): Un-acked events allowed in flight per client
+            ack_timeout (float): Seconds before an un-acked event stops counting
+                against the window (clients that never ack are slowed, not stuck)
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(OVERFLOW_POLICIES)}")
+            
+        self.socketio = socketio
+        self.max_size = max_size
+        self.policy = policy
+        self.window = window
+        self.ack_timeout = ack_timeout
+        
+        self.clients = {}
+        self.lock = threading.RLock()
+        self.dropped = 0
+        self.coalesced = 0
+        self.disconnected = 0
+        
+    def register(self, sid):
+        """Start queueing for a newly connected client"""
+        with self.lock:
+            self.clients.setdefault(sid, ClientQueue(sid))
+            
+    def unregister(self, sid):
+        """Forget a disconnected client (and everything queued for it)"""
+        with self.lock:
+            self.clients.pop(sid, None)
+            
+    def enqueue(self, sid, event, data):
+        """
+        Queue an event for one client and send what its window allows
+        
+        Args:
+            sid (str): Socket.IO session id
+            event (str): Event name
+            data: Event payload (shared between clients; never mutated)
+        """
+        with self.lock:
+            client = self.clients.get(sid)
+            if client is None:
+                return
+                
+            overflow = len(client.queue) >= self.max_size
+            if overflow and self.policy == 'disconnect':
+                self._drop_client(client)
+            else:
+                if overflow and self.policy == 'coalesce':
+                    self._coalesce(client, event)
+                if len(client.queue) >= self.max_size:
+                    client.queue.popleft()
+                    self._lose(client, 1)
+                client.queue.append((event, data))
+                self._pump(client)
+                return
+                
+        # Outside the lock: disconnect runs the server's disconnect handler,
+        # which calls back into unregister()
+        self.socketio.server.disconnect(sid, namespace='/')
+            
+    def _coalesce(self, client, event):
+        """Drop queued events superseded by a newer one of the same name"""
+        kept = collections.deque(item for item in client.queue if item[0] != event)
+        superseded = len(client.queue) - len(kept)
+        client.queue = kept
+        self.coalesced += superseded
+        self._lose(client, superseded)
+        
+    def _lose(self, client, count):
+        client.lost += count
+        client.dropped += count
+        self.dropped += count
+        
+    def _drop_client(self, client):
+        """Forget a client whose queue overflowed (caller disconnects it after releasing the lock)"""
+        self.clients.pop(client.sid, None)
+        self.disconnected += 1
+        print(f"⚠️ Disconnecting slow client {client.sid} (send queue full)")
+        
+    def _pump(self, client):
+        """Emit queued events while the client's ack window has room"""
+        now = time.monotonic()
+        while client.in_flight and now - next(iter(client.in_flight.values())) >= self.ack_timeout:
+            client.in_flight.popitem(last=False)
+            
+        while client.queue and len(client.in_flight) < self.window:
+            if client.lost:
+                # Tell the client ahead of the next event that it missed some
+                self.socketio.emit('backpressure', {'dropped': client.lost}, to=client.sid)
+                client.lost = 0
+                
+            event, data = client.queue.popleft()
+            client.next_id += 1
+            event_id = client.next_id
+            client.in_flight[event_id] = now
+            client.sent += 1
+            # The ack carries the id of the event it answers, so late acks of
+            # timed-out events cannot free the slot of a newer one
+            self.socketio.emit(event, data, to=client.sid,
+                               callback=lambda *args, sid=client.sid, event_id=event_id: self.ack(sid, event_id))
+            
+    def ack(self, sid, event_id):
+        """
+        Client acknowledged an event: free its window slot and keep sending
+        
+        Args:
+            sid (str): Socket.IO session id
+            event_id (int): Id the event was emitted with
+        """
+        with self.lock:
+            client = self.clients.get(sid)
+            if client is None:
+                return
+            if client.in_flight.pop(event_id, None) is not None:
+                self._pump(client)
+            
+    def pump_all(self):
+        """Retry every client (called periodically so timed-out windows reopen)"""
+        with self.lock:
+            for client in list(self.clients.values()):
+                if client.queue:
+                    self._pump(client)
+                    
+    def metrics(self, top=10):
+        """
+        Queue depth metrics
+        
+        Returns:
+            dict: Totals plus the `top` deepest client queues
+        """
+        with self.lock:
+            depths = sorted(
+                ((len(c.queue), len(c.in_flight), c.sid, c.sent, c.dropped) for c in self.clients.values()),
+                reverse=True
+            )
+            return {
+                'clients': len(depths),
+                'policy': self.policy,
+                'max_size': self.max_size,
+                'window': self.window,
+                'total_depth': sum(depth for depth, *_ in depths),
+                'max_depth': depths[0][0] if depths else 0,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+                'disconnected': self.disconnected,
+                'deepest': [
+                    {'sid': sid, 'depth': depth, 'in_flight': in_flight, 'sent': sent, 'dropped': dropped}
+                    for depth, in_flight, sid, sent, dropped in depths[:top]
+                ]
+            }
@@ -0,0 +1,170 @@
+"""
+Compression Module - Negotiated response compression and compact encodings
+gzip is always available; brotli and zstd are used when the optional
+`brotli` / `zstandard` packages are installed. MessagePack responses and
+socket payloads need the optional `msgpack` package.
+"""
+
+import collections
+import gzip
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json', 'application/msgpack', 'text/html', 'text/css',
+    'text/csv', 'text/plain', 'application/javascript', 'text/javascript'
+)
+
+
+def available_encodings():
+    """Content codings this server can produce, most compact first"""
+    encodings = []
+    if zstandard:
+        encodings.append('zstd')
+    if brotli:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick a content coding
+    
+    Args:
+        accept_encoding: werkzeug Accept-Encoding header (request.accept_encodings)
+        
+    Returns:
+        str: 'zstd', 'br', 'gzip', or None for identity
+    """
+    for encoding in available_encodings():
+        if accept_encoding[encoding] > 0:  # Quality 0 means "not acceptable"
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    """
+    Compress bytes with a content coding
+    
+    Args:
+        body (bytes): Payload
+        encoding (str): 'zstd', 'br', or 'gzip'
+        
+    Returns:
+        bytes: Compressed payload
+    """
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(body)
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def wants_msgpack(request):
+    """True if the client prefers MessagePack over JSON and msgpack is installed"""
+    if msgpack is None:
+        return False
+    return request.accept_mimetypes[MSGPACK_MIMETYPE] > request.accept_mimetypes['application/json']
+
+
+def pack(payload):
+    """Encode a payload as MessagePack"""
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+class ResponseCompressor:
+    def __init__(self, app=None, min_size=1024, max_memo=128):
+        """
+        Compress responses above `min_size` bytes for clients that accept it
+        
+        Args:
+            app (Flask): Application to install the after_request hook on
+            min_size (int): Smaller bodies are sent as-is
+            max_memo (int): Compressed bodies remembered by ETag, so cached
+                responses are not recompressed on every hit
+        """
+        self.min_size = min_size
+        self.max_memo = max_memo
+        self.memo = collections.OrderedDict()
+        self.lock = threading.Lock()
+        
+        if app is not None:
+            self.init_app(app)
+            
+    def init_app(self, app):
+        """Register the after_request hook"""
+        from flask import request
+        
+        @app.after_request
+        def compress_response(response):
+            return self.process(request, response)
+            
+    def process(self, request, response):
+        """
+        Compress a response in place when it is worth it
+        
+        Args:
+            request: Current Flask request
+            response: Outgoing Flask response
+            
+        Returns:
+            Response: The (possibly compressed) response
+        """
+        response.vary.add('Accept-Encoding')
+        
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+            
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+            
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+            
+        etag, _weak = response.get_etag()
+        response.set_data(self._compressed(body, encoding, etag))
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # Same resource, different bytes: weak validator, as nginx does
+            response.set_etag(etag, weak=True)
+        return response
+        
+    def _compressed(self, body, encoding, etag):
+        if not etag:
+            return compress(body, encoding)
+            
+        key = (etag, encoding)
+        with self.lock:
+            if key in self.memo:
+                self.memo.move_to_end(key)
+                return self.memo[key]
+                
+        data = compress(body, encoding)
+        with self.lock:
+            self.memo[key] = data
+            while len(self.memo) > self.max_memo:
+                self.memo.popitem(last=False)
+        return data
@@ -5,18 +5,616 @@ Handles all database operations for the Command Panel
 
 import sqlite3
 import json
+import atexit
+import base64
+import binascii
+import calendar
+import collections
+import hashlib
+import math
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
 import os
 
+SCHEMA_VERSION = 5  # Stored in PRAGMA user_version; see DetectionDatabase.migrate()
+
+DETECTION_COLUMNS = (
+    'timestamp', 'ts_epoch', 'latitude', 'longitude', 'confidence', 'message', 'drone_id',
+    'alert_level', 'duration', 'in_safe_zone', 'image_id'
+)
+
+# Columns returned by list queries: everything except the legacy inline image
+DETECTION_LIST_COLUMNS = ('id',) + DETECTION_COLUMNS + ('created_at',)
+DETECTION_SELECT = ', '.join(DETECTION_LIST_COLUMNS)
+
+# Fields a client can request with query_detections(fields=...); image_base64 is read from the image store
+DETECTION_FIELDS = DETECTION_LIST_COLUMNS + ('image_base64',)
+
+HEATMAP_CELL_SCALE = 10000  # Heatmap grid: 4 decimal places (~11 m)
+
+# Heatmap tile pyramid: at level L the world is split into 2^L columns of
+# 360/2^L degrees (equirectangular, square in degrees). Level 21 is ~19 m.
+HEATMAP_TILE_LEVELS = (6, 9, 12, 15, 18, 21)
+
+UPSERT_HOURLY_ROLLUP_SQL = '''
+    INSERT INTO hourly_rollup (hour_epoch, alert_level, drone_id, count, confidence_sum)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(hour_epoch, alert_level, drone_id) DO UPDATE
+    SET count = count + excluded.count, confidence_sum = confidence_sum + excluded.confidence_sum
+'''
+
+UPSERT_HEATMAP_TILE_SQL = '''
+    INSERT INTO heatmap_tiles (level, day_epoch, tx, ty, count, lat_sum, lon_sum)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(level, day_epoch, tx, ty) DO UPDATE
+    SET count = count + excluded.count,
+        lat_sum = lat_sum + excluded.lat_sum,
+        lon_sum = lon_sum + excluded.lon_sum
+'''
+
+UPSERT_HEATMAP_ROLLUP_SQL = '''
+    INSERT INTO heatmap_rollup (hour_epoch, cell_lat, cell_lon, drone_id, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(hour_epoch, cell_lat, cell_lon, drone_id) DO UPDATE
+    SET count = count + excluded.count
+'''
+
+INSERT_IMAGE_SQL = 'INSERT OR IGNORE INTO detection_images (image_id, data) VALUES (?, ?)'
+
+INSERT_DETECTION_SQL = f'''
+    INSERT INTO detections ({', '.join(DETECTION_COLUMNS)})
+    VALUES ({', '.join('?' * len(DETECTION_COLUMNS))})
+'''
+
+UPSERT_TRACKING_SQL = '''
+    INSERT INTO detection_tracking
+    (location_key, first_seen, last_seen, latitude, longitude)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(location_key) DO UPDATE
+    SET last_seen = excluded.last_seen, count = count + 1
+'''
+
+
+def decode_image(image_base64):
+    """
+    Decode a base64 snapshot into raw bytes and its content address
+    
+    Args:
+        image_base64 (str): Base64-encoded JPEG (or None)
+        
+    Returns:
+        tuple: (image_id, jpeg_bytes), or (None, None) if there is no valid image
+    """
+    if not image_base64:
+        return None, None
+    try:
+        data = base64.b64decode(image_base64, validate=True)
+    except (binascii.Error, ValueError, TypeError):
+        return None, None
+    return hashlib.sha256(data).hexdigest(), data
+
+
+def validate_detection(data):
+    """
+    Check the fields every stored detection needs
+    
+    Args:
+        data (dict): Detection data from JSON
+        
+    Returns:
+        dict: Copy of `data` with latitude, longitude and confidence as floats
+        
+    Raises:
+        ValueError: If one of them is missing, not a number or out of range
+    """
+    if not isinstance(data, dict):
+        raise ValueError("detection must be an object")
+        
+    values = {}
+    for field in ('latitude', 'longitude', 'confidence'):
+        value = data.get(field)
+        if value is None or isinstance(value, bool):
+            raise ValueError(f"{field} is required")
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number") from None
+        if not math.isfinite(value):
+            raise ValueError(f"{field} must be finite")
+        values[field] = value
+        
+    if not -90 <= values['latitude'] <= 90:
+        raise ValueError("latitude must be between -90 and 90")
+    if not -180 <= values['longitude'] <= 180:
+        raise ValueError("longitude must be between -180 and 180")
+    if not 0 <= values['confidence'] <= 1:
+        raise ValueError("confidence must be between 0 and 1")
+    return {**data, **values}
+
+
+def to_epoch(value):
+    """
+    Convert a detection timestamp to indexed integer seconds
+    
+    Timestamps are naive local wall-clock strings ("YYYY-MM-DD HH:MM:SS").
+    They are encoded as if they were UTC, which is exactly what SQLite's
+    strftime('%s', ...) does, so Python cutoffs and SQL backfills agree and
+    strftime('%H', ts_epoch, 'unixepoch') still yields the local hour.
+    
+    Args:
+        value (str | datetime): Timestamp
+        
+    Returns:
+        int: Seconds since 1970-01-01 00:00:00 wall-clock
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip())
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        value = datetime.now()
+    return calendar.timegm(value.timetuple())
+
+
+def grid_cell(value):
+    """Snap a latitude/longitude to its integer heatmap cell (HEATMAP_CELL_SCALE units)"""
+    return int(round(value * HEATMAP_CELL_SCALE))
+
+
+def rollup_deltas(rows):
+    """
+    Aggregate detection rows into rollup increments
+    
+    Args:
+        rows (list): Detection rows in DETECTION_COLUMNS order
+        
+    Returns:
+        tuple: (hourly upsert params, heatmap upsert params)
+    """
+    ts_i, lat_i, lon_i, conf_i, drone_i, alert_i = (
+        DETECTION_COLUMNS.index(name)
+        for name in ('ts_epoch', 'latitude', 'longitude', 'confidence', 'drone_id', 'alert_level')
+    )
+    hourly = {}
+    cells = {}
+    
+    for row in rows:
+        if row[ts_i] is None or row[lat_i] is None or row[lon_i] is None:
+            continue
+        hour = row[ts_i] - row[ts_i] % 3600
+        drone_id = row[drone_i] or ''  # NULLs would never collide in the primary key
+        
+        bucket = hourly.setdefault((hour, row[alert_i], drone_id), [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += row[conf_i] or 0.0
+        
+        cell = (hour, grid_cell(row[lat_i]), grid_cell(row[lon_i]), drone_id)
+        cells[cell] = cells.get(cell, 0) + 1
+        
+    return (
+        [key + tuple(value) for key, value in hourly.items()],
+        [key + (count,) for key, count in cells.items()]
+    )
+
+
+def tile_xy(lat, lon, level):
+    """
+    Heatmap tile containing a point
+    
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        level (int): Pyramid level (see HEATMAP_TILE_LEVELS)
+        
+    Returns:
+        tuple: (tx, ty) integer tile coordinates
+    """
+    n = 1 << level
+    tx = int((lon + 180.0) * n // 360.0)
+    ty = int((lat + 90.0) * n // 360.0)
+    return min(max(tx, 0), n - 1), min(max(ty, 0), n // 2 - 1)
+
+
+def tile_deltas(rows, levels=HEATMAP_TILE_LEVELS):
+    """
+    Aggregate detection rows into per-day heatmap tile increments
+    
+    Args:
+        rows (list): Detection rows in DETECTION_COLUMNS order
+        levels (tuple): Pyramid levels to update
+        
+    Returns:
+        list: Upsert params (level, day_epoch, tx, ty, count, lat_sum, lon_sum)
+    """
+    ts_i, lat_i, lon_i = (DETECTION_COLUMNS.index(name) for name in ('ts_epoch', 'latitude', 'longitude'))
+    tiles = {}
+    
+    for row in rows:
+        if row[ts_i] is None or row[lat_i] is None or row[lon_i] is None:
+            continue
+        day = row[ts_i] - row[ts_i] % 86400
+        for level in levels:
+            tile = tiles.setdefault((level, day) + tile_xy(row[lat_i], row[lon_i], level), [0, 0.0, 0.0])
+            tile[0] += 1
+            tile[1] += row[lat_i]
+            tile[2] += row[lon_i]
+            
+    return [key + tuple(value) for key, value in tiles.items()]
+
+
+def compact_ids(ids):
+    """
+    Collapse sorted ids into inclusive ranges
+    
+    Args:
+        ids (list): Ascending integer ids
+        
+    Returns:
+        list: [[first, last], ...]
+    """
+    ranges = []
+    for detection_id in ids:
+        if ranges and detection_id == ranges[-1][1] + 1:
+            ranges[-1][1] = detection_id
+        else:
+            ranges.append([detection_id, detection_id])
+    return ranges
+
+
+def period_cutoff(period):
+    """
+    Start of a statistics/export period
+    
+    Args:
+        period (str): 'today', 'week', 'month', or 'all'
+        
+    Returns:
+        datetime: Earliest timestamp included in the period
+    """
+    if period == 'today':
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    elif period == 'week':
+        return datetime.now() - timedelta(days=7)
+    elif period == 'month':
+        return datetime.now() - timedelta(days=30)
+    else:
+        return datetime(2000, 1, 1)  # All time
+
+
+def summarize_buckets(buckets, period):
+    """
+    Turn (hour, alert_level) -> [count, confidence_sum] buckets into the statistics dict
+    
+    Args:
+        buckets (dict): Output of DetectionDatabase.get_statistics_buckets()
+        period (str): Period label echoed back in the result
+        
+    Returns:
+        dict: Statistics dictionary
+    """
+    total = 0
+    confidence_sum = 0.0
+    hourly = {}
+    alert_breakdown = {}
+    
+    for (hour, alert_level), (count, conf_sum) in buckets.items():
+        total += count
+        confidence_sum += conf_sum
+        hourly[hour] = hourly.get(hour, 0) + count
+        alert_breakdown[alert_level] = alert_breakdown.get(alert_level, 0) + count
+        
+    # Busiest hour (earliest one wins a tie)
+    peak = min(hourly.items(), key=lambda item: (-item[1], item[0])) if hourly else None
+    
+    return {
+        'total_detections': total,
+        'high_alerts': alert_breakdown.get('HIGH', 0),
+        'average_confidence': round(confidence_sum / total, 4) if total else 0,
+        'peak_hour': f"{peak[0]}:00" if peak else "N/A",
+        'peak_hour_count': peak[1] if peak else 0,
+        'alert_breakdown': alert_breakdown,
+        'period': period
+    }
+
+
+class ReaderPoolExhausted(Exception):
+    """Every pooled reader stayed busy for the whole acquire timeout"""
+
+
+class ConnectionManager:
+    def __init__(self, db_path, readers=4, cache_size_mb=16, mmap_size_mb=256, busy_timeout_ms=5000,
+                 acquire_timeout=5.0):
+        """
+        One writer connection plus a pool of read-only reader connections (WAL mode)
+        
+        Args:
+            db_path (str): SQLite database file
+            readers (int): Max concurrent reader connections
+            cache_size_mb (int): Page cache per connection
+            mmap_size_mb (int): Memory-mapped I/O window per connection (0 = off)
+            busy_timeout_ms (int): How long to wait on a locked database
+            acquire_timeout (float): How long reader() waits for a pooled connection
+        """
+        self.db_path = db_path
+        self.max_readers = readers
+        self.acquire_timeout = acquire_timeout
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.busy_timeout_ms = busy_timeout_ms
+        
+        self._pool = queue.LifoQueue()  # Most recently used first keeps caches warm
+        self._pool_lock = threading.Lock()
+        self._reader_count = 0
+        self._readers = []
+        
+        # The writer owns the file: it creates it and switches it to WAL
+        self.writer = self._connect(readonly=False)
+        self.writer.execute('PRAGMA journal_mode=WAL')
+        
+    def _connect(self, readonly):
+        if readonly:
+            uri = Path(self.db_path).absolute().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA synchronous = NORMAL')  # Durable at checkpoints; safe with WAL
+        conn.execute(f'PRAGMA cache_size = {-int(self.cache_size_mb * 1024)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size_mb * 1024 * 1024)}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        return conn
+        
+    @contextmanager
+    def reader(self):
+        """
+        Borrow a read-only connection for the duration of a `with` block
+        
+        Readers see the last committed snapshot and never block the writer.
+        
+        Raises:
+            ReaderPoolExhausted: If no reader frees up within acquire_timeout
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._pool_lock:
+                if self._reader_count < self.max_readers:
+                    self._reader_count += 1
+                    conn = self._connect(readonly=True)
+                    self._readers.append(conn)
+            if conn is None:
+                # Pool exhausted: wait (bounded) for a reader to come back
+                try:
+                    conn = self._pool.get(timeout=self.acquire_timeout)
+                except queue.Empty:
+                    raise ReaderPoolExhausted(
+                        f"All {self.max_readers} database readers busy for {self.acquire_timeout}s"
+                    ) from None
+                
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+            
+    @contextmanager
+    def dedicated_reader(self):
+        """
+        Open a read-only connection outside the pool for a `with` block
+        
+        For readers held as long as a client takes to download (streamed
+        responses), so slow clients cannot starve the pool.
+        """
+        conn = self._connect(readonly=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+            
+    def close(self):
+        """Close every connection"""
+        for conn in self._readers:
+            conn.close()
+        self._readers = []
+        self.writer.close()
+
+
+class DetectionWriter:
+    def __init__(self, database, max_rows=200, max_delay=0.05):
+        """
+        Write-behind buffer that commits queued rows in grouped transactions
+        
+        Args:
+            database (DetectionDatabase): Database to write to
+            max_rows (int): Flush as soon as this many rows are pending
+            max_delay (float): Flush at most this many seconds after the first pending row
+        """
+        self.db = database
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        
+        self.cond = threading.Condition()
+        self.pending_detections = []  # (data, duration, on_commit)
+        self.pending_tracking = []  # (lat, lon, seen_at)
+        self.pending_barriers = []  # on_commit callbacks waiting for everything queued before them
+        self.is_running = True
+        
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        
+    def _pending_count(self):
+        return len(self.pending_detections) + len(self.pending_tracking) + len(self.pending_barriers)
+        
+    def add_detection(self, data, duration=0, on_commit=None):
+        """Queue a detection; `on_commit(detection_id)` runs once it is durable"""
+        with self.cond:
+            self.pending_detections.append((data, duration, on_commit))
+            self.cond.notify()
+            
+    def add_tracking(self, lat, lon):
+        """Queue a tracking upsert for this location"""
+        with self.cond:
+            self.pending_tracking.append((lat, lon, datetime.now().isoformat()))
+            self.cond.notify()
+            
+    def add_barrier(self, on_commit, on_error=None):
+        """
+        Run `on_commit()` once every row queued so far is committed (or rejected
+        as invalid), or `on_error(exception)` if some of them could not be written
+        """
+        with self.cond:
+            self.pending_barriers.append((on_commit, on_error))
+            self.cond.notify()
+            
+    def _take_pending(self):
+        pending = self.pending_detections, self.pending_tracking, self.pending_barriers
+        self.pending_detections, self.pending_tracking, self.pending_barriers = [], [], []
+        return pending
+        
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.is_running and not self._pending_count():
+                    self.cond.wait()
+                if not self.is_running:
+                    return  # close() flushes whatever is left
+                    
+                # Let the batch fill up to max_rows or max_delay, whichever comes first
+                deadline = time.monotonic() + self.max_delay
+                while self.is_running and self._pending_count() < self.max_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                    
+                detections, tracking, barriers = self._take_pending()
+                
+            self._write(detections, tracking, barriers)
+            
+    def _write(self, detections, tracking, barriers=()):
+        error = None
+        stored = []
+        if detections or tracking:
+            try:
+                ids = self.db.add_detections_bulk(
+                    [(data, duration) for data, duration, _ in detections],
+                    tracking_updates=tracking
+                )
+                stored = list(zip(detections, ids))
+            except Exception as e:
+                # One bad row fails the grouped insert; retry one by one so only it is lost
+                print(f"⚠️ Write-behind flush failed ({len(detections)} detections): {e}, retrying row by row")
+                stored, error = self._write_each(detections, tracking)
+                
+        for (_, _, on_commit), detection_id in stored:
+            if on_commit:
+                try:
+                    on_commit(detection_id)
+                except Exception as e:
+                    print(f"⚠️ on_commit callback error: {e}")
+                    
+        # Rows are committed in queue order, so everything before these barriers is durable
+        for on_commit, on_error in barriers:
+            try:
+                if error is None:
+                    on_commit()
+                elif on_error:
+                    on_error(error)
+                else:
+                    print(f"❌ Write-behind barrier failed: {error}")
+            except Exception as e:
+                print(f"⚠️ on_commit callback error: {e}")
+                
+    def _write_each(self, detections, tracking):
+        """
+        Write rows one transaction at a time after a grouped flush failed
+        
+        Invalid detections (ValueError) are rejected and dropped; any other
+        failure is returned so the barriers behind it fail.
+        
+        Returns:
+            tuple: ([((data, duration, on_commit), detection_id), ...] stored, last error or None)
+        """
+        stored = []
+        error = None
+        if tracking:
+            try:
+                self.db.add_detections_bulk([], tracking_updates=tracking)
+            except Exception as e:
+                print(f"❌ Tracking updates failed ({len(tracking)} rows): {e}")
+                error = e
+                
+        for item in detections:
+            data, duration, _ = item
+            try:
+                ids = self.db.add_detections_bulk([(data, duration)])
+                stored.append((item, ids[0]))
+            except ValueError as e:
+                print(f"⚠️ Rejected detection {data.get('message')!r}: {e}")
+            except Exception as e:
+                print(f"❌ Detection {data.get('message')!r} not stored: {e}")
+                error = e
+        return stored, error
+        
+    def flush(self):
+        """Synchronously commit everything queued so far"""
+        with self.cond:
+            pending = self._take_pending()
+        self._write(*pending)
+        
+    def close(self):
+        """Stop the writer thread and flush the remaining rows"""
+        with self.cond:
+            self.is_running = False
+            self.cond.notify_all()
+        self.thread.join(timeout=2.0)
+        self.flush()
+
+
 class DetectionDatabase:
-    def __init__(self, db_path='data/detections.db'):
-        """Initialize database connection and create tables if needed"""
+    def __init__(self, db_path='data/detections.db', readers=4, cache_size_mb=16, mmap_size_mb=256,
+                 image_cache_size=256, reader_timeout=5.0):
+        """
+        Initialize database connections and create tables if needed
+        
+        Args:
+            db_path (str): SQLite database file
+            readers (int): Size of the read-only connection pool
+            cache_size_mb (int): SQLite page cache per connection
+            mmap_size_mb (int): Memory-mapped I/O window per connection (0 = off)
+            image_cache_size (int): Snapshots kept in memory by get_image()
+            reader_timeout (float): Max wait for a pooled reader before
+                ReaderPoolExhausted is raised
+        """
         # Ensure data directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        self.connections = ConnectionManager(
+            db_path,
+            readers=readers,
+            cache_size_mb=cache_size_mb,
+            mmap_size_mb=mmap_size_mb,
+            acquire_timeout=reader_timeout
+        )
+        self.conn = self.connections.writer  # All writes go through this connection
+        self._batch_depth = 0
+        self._write_lock = threading.RLock()  # Serializes transactions on self.conn
+        self.writer = None  # DetectionWriter when write-behind mode is on
+        self.write_generation = 0  # Bumped after every committed change; cache key for readers
+        self._commit_listeners = []
+        self._uncommitted = []  # Detections written inside an open batch()
+        self.image_cache_size = image_cache_size
+        self._image_cache = collections.OrderedDict()  # image_id -> bytes, least recently used first
+        self._image_cache_lock = threading.Lock()
+        self._image_cache_epoch = 0  # Bumped on clear so in-flight loads of pruned images are not stored
         self.create_tables()
         
     def create_tables(self):
@@ -28,6 +626,7 @@ class DetectionDatabase:
             CREATE TABLE IF NOT EXISTS detections (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp DATETIME NOT NULL,
+                ts_epoch INTEGER,
                 latitude REAL NOT NULL,
                 longitude REAL NOT NULL,
                 confidence REAL NOT NULL,
@@ -37,10 +636,65 @@ class DetectionDatabase:
                 duration REAL DEFAULT 0,
                 in_safe_zone BOOLEAN DEFAULT 0,
                 image_base64 TEXT,
+                image_id TEXT,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        # Snapshots, stored once per distinct JPEG and keyed by SHA-256
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS detection_images (
+                image_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Pre-aggregated counts, updated in the same transaction as each insert
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hourly_rollup (
+                hour_epoch INTEGER NOT NULL,
+                alert_level TEXT NOT NULL,
+                drone_id TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                confidence_sum REAL NOT NULL,
+                PRIMARY KEY (hour_epoch, alert_level, drone_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS heatmap_rollup (
+                hour_epoch INTEGER NOT NULL,
+                cell_lat INTEGER NOT NULL,
+                cell_lon INTEGER NOT NULL,
+                drone_id TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (hour_epoch, cell_lat, cell_lon, drone_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Multi-resolution heatmap counts per tile per day (HEATMAP_TILE_LEVELS)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS heatmap_tiles (
+                level INTEGER NOT NULL,
+                day_epoch INTEGER NOT NULL,
+                tx INTEGER NOT NULL,
+                ty INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                lat_sum REAL NOT NULL,
+                lon_sum REAL NOT NULL,
+                PRIMARY KEY (level, day_epoch, tx, ty)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Ids of pruned detections, so syncing clients can drop them
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS detection_tombstones (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                detection_id INTEGER NOT NULL,
+                deleted_epoch INTEGER NOT NULL
+            )
+        ''')
+        
         # Table 2: Safe Zones
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS safe_zones (
@@ -67,8 +721,234 @@ class DetectionDatabase:
         ''')
         
         self.conn.commit()
+        self.migrate()
         print("✅ Database tables created/verified")
         
+    def migrate(self):
+        """Upgrade an existing database file to SCHEMA_VERSION"""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        if version < 1:
+            self._migrate_epoch_timestamps()
+        if version < 2:
+            self._migrate_image_blobs()
+        if version < 3:
+            self._migrate_rollups()
+        if version < 4:
+            self._migrate_heatmap_tiles()
+        if version < 5:
+            self._migrate_keyset_indexes()
+            
+        if version != SCHEMA_VERSION:
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self.conn.commit()
+            print(f"✅ Database schema migrated (v{version} -> v{SCHEMA_VERSION})")
+            
+    def _migrate_epoch_timestamps(self):
+        """
+        v1: integer ts_epoch column + time-range indexes
+        
+        `WHERE datetime(timestamp) >= datetime(?)` can't use an index, so all
+        range filters now compare ts_epoch directly.
+        """
+        cursor = self.conn.cursor()
+        columns = {row['name'] for row in cursor.execute('PRAGMA table_info(detections)')}
+        if 'ts_epoch' not in columns:
+            cursor.execute('ALTER TABLE detections ADD COLUMN ts_epoch INTEGER')
+            
+        cursor.execute('''
+            UPDATE detections
+            SET ts_epoch = CAST(COALESCE(strftime('%s', timestamp), strftime('%s', created_at)) AS INTEGER)
+            WHERE ts_epoch IS NULL
+        ''')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections (ts_epoch)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detections_alert_ts ON detections (alert_level, ts_epoch)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detections_drone_ts ON detections (drone_id, ts_epoch)')
+        self.conn.commit()
+        
+    def _migrate_image_blobs(self):
+        """
+        v2: move inline image_base64 text into the detection_images blob table
+        
+        Rows keep only image_id; list queries no longer drag ~20 KB of base64
+        per detection through Python.
+        """
+        cursor = self.conn.cursor()
+        columns = {row['name'] for row in cursor.execute('PRAGMA table_info(detections)')}
+        if 'image_id' not in columns:
+            cursor.execute('ALTER TABLE detections ADD COLUMN image_id TEXT')
+            
+        moved = 0
+        while True:
+            rows = cursor.execute('''
+                SELECT id, image_base64 FROM detections
+                WHERE image_base64 IS NOT NULL
+                LIMIT 500
+            ''').fetchall()
+            if not rows:
+                break
+                
+            for row in rows:
+                image_id, data = decode_image(row['image_base64'])
+                if image_id:
+                    cursor.execute(INSERT_IMAGE_SQL, (image_id, data))
+                cursor.execute(
+                    'UPDATE detections SET image_id = ?, image_base64 = NULL WHERE id = ?',
+                    (image_id, row['id'])
+                )
+            moved += len(rows)
+            self.conn.commit()
+            
+        if moved:
+            print(f"🖼️  Moved {moved} inline snapshots to the image store")
+        
+    def _migrate_rollups(self):
+        """v3: backfill hourly_rollup/heatmap_rollup from existing detections"""
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM hourly_rollup')
+        cursor.execute('DELETE FROM heatmap_rollup')
+        
+        def apply(rows):
+            hourly, cells = rollup_deltas(rows)
+            cursor.executemany(UPSERT_HOURLY_ROLLUP_SQL, hourly)
+            cursor.executemany(UPSERT_HEATMAP_ROLLUP_SQL, cells)
+            
+        self._backfill(cursor, apply)
+        
+    def _migrate_heatmap_tiles(self):
+        """v4: backfill the heatmap tile pyramid from existing detections"""
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM heatmap_tiles')
+        self._backfill(cursor, lambda rows: cursor.executemany(UPSERT_HEATMAP_TILE_SQL, tile_deltas(rows)))
+        
+    def _migrate_keyset_indexes(self):
+        """
+        v5: (filter column, id) indexes for keyset-paginated list queries
+        
+        SQLite appends the rowid to every index, so an index on alert_level
+        alone is already ordered by (alert_level, id).
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detections_alert_id ON detections (alert_level)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detections_drone_id ON detections (drone_id)')
+        self.conn.commit()
+        
+    def _backfill(self, cursor, apply, chunk_size=5000):
+        """Feed every stored detection row (DETECTION_COLUMNS order) to `apply` in id order"""
+        columns = ', '.join(DETECTION_COLUMNS)
+        last_id = 0
+        while True:
+            rows = cursor.execute(f'''
+                SELECT id, {columns} FROM detections
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, chunk_size)).fetchall()
+            if not rows:
+                break
+                
+            apply([tuple(row)[1:] for row in rows])
+            last_id = rows[-1]['id']
+            
+        self.conn.commit()
+        
+    @contextmanager
+    def batch(self):
+        """
+        Group detection/tracking writes into a single transaction
+        
+        Usage:
+            with db.batch():
+                db.add_detection(...)
+                db.update_detection_tracking(...)
+        """
+        with self._write_lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.conn.commit()
+                    records, self._uncommitted = self._uncommitted, []
+                    if records:
+                        self._notify_committed(records)
+                
+    def _commit(self):
+        """Commit now unless a batch() is open (it commits once on exit)"""
+        if self._batch_depth == 0:
+            self.conn.commit()
+            
+    def _rollback(self):
+        """Undo a failed write so its half-done rows are not committed by the next one"""
+        if self._batch_depth == 0:
+            self.conn.rollback()
+            
+    def add_commit_listener(self, callback):
+        """
+        Register a hook for newly committed detections
+        
+        Args:
+            callback (callable): Called with a list of detection dicts
+                (DETECTION_COLUMNS plus 'id') after each commit
+        """
+        self._commit_listeners.append(callback)
+        
+    def _update_rollups(self, cursor, rows, sign=1):
+        """
+        Fold detection rows into the rollup tables (caller commits)
+        
+        Args:
+            cursor: Cursor on the writer connection
+            rows (list): Detection rows in DETECTION_COLUMNS order
+            sign (int): 1 for inserted rows, -1 for deleted rows
+        """
+        hourly, cells = rollup_deltas(rows)
+        tiles = tile_deltas(rows)
+        if sign < 0:
+            # Negate the trailing count/sum columns of every upsert
+            hourly = [row[:3] + tuple(-value for value in row[3:]) for row in hourly]
+            cells = [row[:4] + (-row[4],) for row in cells]
+            tiles = [row[:4] + tuple(-value for value in row[4:]) for row in tiles]
+            
+        cursor.executemany(UPSERT_HOURLY_ROLLUP_SQL, hourly)
+        cursor.executemany(UPSERT_HEATMAP_ROLLUP_SQL, cells)
+        cursor.executemany(UPSERT_HEATMAP_TILE_SQL, tiles)
+        
+    def _detections_written(self, rows, ids):
+        """Notify listeners about inserted rows, deferring until commit inside batch()"""
+        records = [dict(zip(DETECTION_COLUMNS, row), id=i) for row, i in zip(rows, ids)]
+        if self._batch_depth:
+            self._uncommitted.extend(records)
+        else:
+            self._notify_committed(records)
+            
+    def _notify_committed(self, records):
+        self.write_generation += 1
+        for callback in self._commit_listeners:
+            try:
+                callback(records)
+            except Exception as e:
+                print(f"⚠️ Commit listener error: {e}")
+            
+    def enable_write_behind(self, max_rows=200, max_delay=0.05):
+        """
+        Buffer queue_detection()/queue_tracking_update() calls and commit them
+        in grouped transactions from a background thread
+        
+        Args:
+            max_rows (int): Rows per transaction before an early flush
+            max_delay (float): Max seconds a queued row waits for its commit
+        """
+        if self.writer is None:
+            self.writer = DetectionWriter(self, max_rows=max_rows, max_delay=max_delay)
+            atexit.register(self.flush)
+            print(f"✅ Write-behind enabled ({max_rows} rows / {max_delay * 1000:.0f} ms)")
+            
+    def flush(self):
+        """Commit anything still sitting in the write-behind buffer"""
+        if self.writer:
+            self.writer.flush()
+        
     def calculate_alert_level(self, confidence):
         """
         Calculate alert level based on confidence score
@@ -86,20 +966,22 @@ class DetectionDatabase:
         else:
             return "LOW"       # Uncertain
             
-    def is_in_safe_zone(self, lat, lon):
+    def is_in_safe_zone(self, lat, lon, zones=None):
         """
         Check if coordinates are within any safe zone
         
         Args:
             lat (float): Latitude
             lon (float): Longitude
+            zones (list): Preloaded safe zone rows (queried if None)
             
         Returns:
             bool: True if in safe zone, False otherwise
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM safe_zones')
-        zones = cursor.fetchall()
+        if zones is None:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT * FROM safe_zones')
+            zones = cursor.fetchall()
         
         for zone in zones:
             # Calculate distance using Haversine formula (simplified)
@@ -118,6 +1000,28 @@ class DetectionDatabase:
                 
         return False
         
+    def _detection_row(self, data, duration, zones=None, image_id=None):
+        """
+        Build the INSERT parameters (in DETECTION_COLUMNS order) for one detection
+        
+        Raises:
+            ValueError: If the detection fails validate_detection()
+        """
+        data = validate_detection(data)
+        return (
+            data.get('timestamp'),
+            to_epoch(data.get('timestamp')),
+            data.get('latitude'),
+            data.get('longitude'),
+            data.get('confidence'),
+            data.get('message'),
+            data.get('drone_id'),
+            self.calculate_alert_level(data['confidence']),
+            duration,
+            self.is_in_safe_zone(data['latitude'], data['longitude'], zones),
+            image_id
+        )
+        
     def add_detection(self, data, duration=0):
         """
         Add a new detection to the database
@@ -129,43 +1033,155 @@ class DetectionDatabase:
         Returns:
             int: ID of inserted detection
         """
-        cursor = self.conn.cursor()
+        image_id, image_data = decode_image(data.get('image_base64'))
         
-        # Calculate alert level
-        alert_level = self.calculate_alert_level(data.get('confidence', 0))
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            row = self._detection_row(data, duration, image_id=image_id)
+            
+            try:
+                # Store the snapshot (once per distinct image), then the detection
+                if image_id:
+                    cursor.execute(INSERT_IMAGE_SQL, (image_id, image_data))
+                cursor.execute(INSERT_DETECTION_SQL, row)
+                detection_id = cursor.lastrowid
+                self._update_rollups(cursor, [row])
+                self._commit()
+            except Exception:
+                self._rollback()
+                raise
+            
+            self._detections_written([row], [detection_id])
         
-        # Check if in safe zone
-        in_safe_zone = self.is_in_safe_zone(
-            data.get('latitude', 0),
-            data.get('longitude', 0)
-        )
+        alert_level, lat, lon = (row[DETECTION_COLUMNS.index(name)] for name in ('alert_level', 'latitude', 'longitude'))
+        print(f"✅ Detection #{detection_id} added: {data.get('message')} "
+              f"[{alert_level}] @ ({lat:.5f}, {lon:.5f})")
         
-        # Insert detection
-        cursor.execute('''
-            INSERT INTO detections 
-            (timestamp, latitude, longitude, confidence, message, drone_id, 
-             alert_level, duration, in_safe_zone, image_base64)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data.get('timestamp'),
-            data.get('latitude'),
-            data.get('longitude'),
-            data.get('confidence'),
-            data.get('message'),
-            data.get('drone_id'),
-            alert_level,
-            duration,
-            in_safe_zone,
-            data.get('image_base64')
-        ))
+        return detection_id
         
-        self.conn.commit()
-        detection_id = cursor.lastrowid
+    def add_detections_bulk(self, detections, tracking_updates=()):
+        """
+        Insert many detections (and tracking upserts) in a single transaction
         
-        print(f"✅ Detection #{detection_id} added: {data.get('message')} "
-              f"[{alert_level}] @ ({data.get('latitude'):.5f}, {data.get('longitude'):.5f})")
+        Args:
+            detections (list): Detection dicts, or (data, duration) pairs
+            tracking_updates (list): (lat, lon, seen_at_iso) tuples to upsert
+            
+        Returns:
+            list: IDs of the inserted detections, in input order
+        """
+        items = [(d, 0) if isinstance(d, dict) else d for d in detections]
+        images = [decode_image(data.get('image_base64')) for data, _ in items]
         
-        return detection_id
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            
+            # One safe-zone read for the whole batch instead of one per row
+            cursor.execute('SELECT * FROM safe_zones')
+            zones = cursor.fetchall()
+            rows = [
+                self._detection_row(data, duration, zones, image_id)
+                for (data, duration), (image_id, _) in zip(items, images)
+            ]
+            
+            try:
+                cursor.executemany(INSERT_IMAGE_SQL, [image for image in images if image[0]])
+                cursor.executemany(INSERT_DETECTION_SQL, rows)
+                
+                # Rows from one executemany under the write lock get consecutive ids
+                last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                self._update_rollups(cursor, rows)
+                
+                if tracking_updates:
+                    cursor.executemany(UPSERT_TRACKING_SQL, [
+                        (f"{lat:.5f}_{lon:.5f}", seen_at, seen_at, lat, lon)
+                        for lat, lon, seen_at in tracking_updates
+                    ])
+                self._commit()
+            except Exception:
+                self._rollback()
+                raise
+            
+            ids = list(range(last_id - len(rows) + 1, last_id + 1)) if rows else []
+            if ids:
+                self._detections_written(rows, ids)
+            
+        if ids:
+            print(f"✅ {len(ids)} detections added (#{ids[0]}-#{ids[-1]})")
+        return ids
+        
+    def queue_detection(self, data, duration=0, on_commit=None):
+        """
+        Add a detection via the write-behind buffer (or immediately if it is off)
+        
+        Args:
+            data (dict): Detection data from JSON
+            duration (float): How long person was visible (seconds)
+            on_commit (callable): Called with the detection ID once committed
+        """
+        if self.writer:
+            self.writer.add_detection(data, duration, on_commit)
+            return
+            
+        detection_id = self.add_detection(data, duration=duration)
+        if on_commit:
+            on_commit(detection_id)
+            
+    def queue_tracking_update(self, lat, lon):
+        """Update detection tracking via the write-behind buffer (or immediately)"""
+        if self.writer:
+            self.writer.add_tracking(lat, lon)
+        else:
+            self.update_detection_tracking(lat, lon)
+            
+    def queue_barrier(self, on_commit, on_error=None):
+        """
+        Call `on_commit()` once everything queued so far is committed
+        
+        Args:
+            on_commit (callable): Runs on the writer thread (or right away
+                when write-behind is off, since writes are then synchronous
+                and raise to their caller)
+            on_error (callable): Called with the exception instead if a row
+                queued before the barrier could not be written (invalid rows
+                are rejected and do not count as a failure)
+        """
+        if self.writer:
+            self.writer.add_barrier(on_commit, on_error)
+        else:
+            on_commit()
+        
+    def _iter_rows(self, sql, params=(), chunk_size=500, dedicated=True):
+        """
+        Yield detection dicts, `chunk_size` rows at a time
+        
+        A streamed response keeps its reader for as long as the client reads, so
+        by default the rows come from a dedicated connection rather than the pool
+        (`dedicated=False` borrows a pooled one, for callers that drain at once).
+        The reader is released when the generator is exhausted or closed.
+        """
+        source = self.connections.dedicated_reader if dedicated else self.connections.reader
+        with source() as conn:
+            cursor = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield self._detection_dict(row)
+            finally:
+                cursor.close()
+                
+    def iter_detections_last_hours(self, hours=1, chunk_size=500, dedicated=True):
+        """Stream detections from the last N hours, newest first (see get_detections_last_hours)"""
+        cutoff = to_epoch(datetime.now() - timedelta(hours=hours))
+        
+        return self._iter_rows(f'''
+            SELECT {DETECTION_SELECT} FROM detections 
+            WHERE ts_epoch >= ?
+            ORDER BY ts_epoch DESC
+        ''', (cutoff,), chunk_size, dedicated)
         
     def get_detections_last_hours(self, hours=1):
         """
@@ -177,101 +1193,284 @@ class DetectionDatabase:
         Returns:
             list: List of detection dictionaries
         """
-        cursor = self.conn.cursor()
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        cursor.execute('''
-            SELECT * FROM detections 
-            WHERE datetime(timestamp) >= datetime(?)
-            ORDER BY timestamp DESC
-        ''', (cutoff_time.strftime('%Y-%m-%d %H:%M:%S'),))
-        
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return list(self.iter_detections_last_hours(hours, dedicated=False))
         
     def get_all_detections(self):
         """Get all detections from database"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM detections ORDER BY timestamp DESC')
-        rows = cursor.fetchall()
+        with self.connections.reader() as conn:
+            rows = conn.execute(f'SELECT {DETECTION_SELECT} FROM detections ORDER BY ts_epoch DESC').fetchall()
         return [dict(row) for row in rows]
         
-    def get_statistics(self, period='all'):
+    def _detection_query(self, fields=None, after_id=None, limit=None, alert_level=None, drone_id=None,
+                         in_safe_zone=None, min_confidence=None, max_confidence=None):
+        """Build the keyset-paginated SELECT behind query_detections()"""
+        fields = DETECTION_LIST_COLUMNS if fields is None else tuple(fields)
+        unknown = [field for field in fields if field not in DETECTION_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            
+        # id is always returned: it is the pagination cursor
+        columns = ['d.id'] + [f'd.{field}' for field in fields if field not in ('id', 'image_base64')]
+        join = ''
+        if 'image_base64' in fields:
+            columns.append('i.data AS image_base64')
+            join = 'LEFT JOIN detection_images i ON i.image_id = d.image_id'
+            
+        conditions = []
+        params = []
+        if after_id is not None:
+            conditions.append('d.id > ?')
+            params.append(after_id)
+        for column, value in (('alert_level', alert_level), ('drone_id', drone_id)):
+            if value:
+                values = [value] if isinstance(value, str) else list(value)
+                conditions.append(f"d.{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if in_safe_zone is not None:
+            conditions.append('d.in_safe_zone = ?')
+            params.append(1 if in_safe_zone else 0)
+        if min_confidence is not None:
+            conditions.append('d.confidence >= ?')
+            params.append(min_confidence)
+        if max_confidence is not None:
+            conditions.append('d.confidence <= ?')
+            params.append(max_confidence)
+            
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        params.append(-1 if limit is None else limit)
+        sql = f'''
+            SELECT {', '.join(columns)} FROM detections d {join}
+            {where}
+            ORDER BY d.id
+            LIMIT ?
+        '''
+        return sql, params
+        
+    @staticmethod
+    def _detection_dict(row):
+        """Row -> dict, base64-encoding a joined snapshot"""
+        detection = dict(row)
+        if isinstance(detection.get('image_base64'), bytes):
+            detection['image_base64'] = base64.b64encode(detection['image_base64']).decode('ascii')
+        return detection
+        
+    def iter_detections(self, after_id=None, limit=None, fields=None, chunk_size=500, dedicated=True,
+                        **filters):
         """
-        Calculate detection statistics
+        Stream detections in id order with constant memory (see query_detections)
+        
+        Raises:
+            ValueError: If an unknown field is requested (before any row is read)
+        """
+        sql, params = self._detection_query(fields, after_id, limit, **filters)
+        return self._iter_rows(sql, params, chunk_size, dedicated)
+        
+    def query_detections(self, after_id=None, limit=500, fields=None, **filters):
+        """
+        One page of detections in id order (keyset pagination)
         
         Args:
-            period (str): 'today', 'week', 'month', or 'all'
+            after_id (int): Return rows with id greater than this (None = from the start)
+            limit (int): Max rows in the page
+            fields (list): Columns to return (DETECTION_FIELDS; default: all but image_base64)
+            **filters: alert_level, drone_id (value or list), in_safe_zone (bool),
+                min_confidence, max_confidence
+                
+        Returns:
+            list: Detection dictionaries
             
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        return list(self.iter_detections(after_id, limit, fields, dedicated=False, **filters))
+        
+    def get_detection_image_id(self, detection_id):
+        """
+        Look up the snapshot id for a detection (cheap primary-key read)
+        
         Returns:
-            dict: Statistics dictionary
+            str: image_id, or None if the detection has no snapshot
         """
-        cursor = self.conn.cursor()
+        with self.connections.reader() as conn:
+            row = conn.execute('SELECT image_id FROM detections WHERE id = ?', (detection_id,)).fetchone()
+        return row['image_id'] if row else None
+        
+    def get_image(self, image_id):
+        """
+        Load snapshot bytes by content address (immutable until pruned, so cached)
+        
+        Returns:
+            bytes: JPEG data, or None if unknown
+        """
+        with self._image_cache_lock:
+            data = self._image_cache.get(image_id)
+            if data is not None:
+                self._image_cache.move_to_end(image_id)
+                return data
+            epoch = self._image_cache_epoch
+            
+        with self.connections.reader() as conn:
+            row = conn.execute('SELECT data FROM detection_images WHERE image_id = ?', (image_id,)).fetchone()
+        if row is None:
+            return None  # Not cached: the image may still be on its way in
+            
+        data = bytes(row['data'])
+        with self._image_cache_lock:
+            if epoch == self._image_cache_epoch:
+                self._image_cache[image_id] = data
+                while len(self._image_cache) > self.image_cache_size:
+                    self._image_cache.popitem(last=False)
+        return data
+        
+    def _clear_image_cache(self):
+        """Forget cached snapshots (after images were deleted)"""
+        with self._image_cache_lock:
+            self._image_cache.clear()
+            self._image_cache_epoch += 1
+            
+    @contextmanager
+    def _snapshot(self):
+        """Borrow a reader and hold one read transaction so several queries agree"""
+        with self.connections.reader() as conn:
+            conn.execute('BEGIN')
+            try:
+                yield conn
+            finally:
+                conn.rollback()
+                
+    def get_statistics_buckets(self, cutoff_epoch):
+        """
+        Aggregate detections since `cutoff_epoch`
+        
+        Whole hours come from hourly_rollup; only the partial hour at the
+        cutoff edge is counted from the detections table.
+        
+        Args:
+            cutoff_epoch (int): Lower bound on ts_epoch
+            
+        Returns:
+            tuple: ({(hour 'HH', alert_level): [count, confidence_sum]}, highest id included)
+        """
+        boundary = -(-cutoff_epoch // 3600) * 3600  # First whole hour at or after the cutoff
         
-        # Determine time filter
-        if period == 'today':
-            cutoff = datetime.now().replace(hour=0, minute=0, second=0)
-        elif period == 'week':
-            cutoff = datetime.now() - timedelta(days=7)
-        elif period == 'month':
-            cutoff = datetime.now() - timedelta(days=30)
+        with self._snapshot() as conn:
+            rows = conn.execute('''
+                SELECT strftime('%H', hour_epoch, 'unixepoch') as hour, alert_level,
+                       SUM(count) as count, SUM(confidence_sum) as confidence_sum
+                FROM hourly_rollup
+                WHERE hour_epoch >= ?
+                GROUP BY hour, alert_level
+                UNION ALL
+                SELECT strftime('%H', ts_epoch, 'unixepoch') as hour, alert_level,
+                       COUNT(*) as count, SUM(confidence) as confidence_sum
+                FROM detections
+                WHERE ts_epoch >= ? AND ts_epoch < ?
+                GROUP BY hour, alert_level
+            ''', (boundary, cutoff_epoch, boundary)).fetchall()
+            last_id = conn.execute('SELECT MAX(id) FROM detections').fetchone()[0] or 0
+            
+        buckets = {}
+        for row in rows:
+            bucket = buckets.setdefault((row['hour'], row['alert_level']), [0, 0.0])
+            bucket[0] += row['count']
+            bucket[1] += row['confidence_sum'] or 0.0
+        return buckets, last_id
+        
+    def get_heatmap_cells(self, cutoff_epoch, drone_id=None):
+        """
+        Detection counts per heatmap grid cell since `cutoff_epoch`
+        
+        Args:
+            cutoff_epoch (int): Lower bound on ts_epoch
+            drone_id (str): Only count this drone (all drones if None)
+            
+        Returns:
+            dict: (cell_lat, cell_lon) -> count, cells in HEATMAP_CELL_SCALE units
+        """
+        boundary = -(-cutoff_epoch // 3600) * 3600
+        if drone_id is None:
+            rollup_filter = edge_filter = ''
+            drone_args = ()
         else:
-            cutoff = datetime(2000, 1, 1)  # All time
+            rollup_filter = ' AND drone_id = ?'
+            edge_filter = " AND COALESCE(drone_id, '') = ?"
+            drone_args = (drone_id,)
+        
+        with self._snapshot() as conn:
+            rows = conn.execute(f'''
+                SELECT cell_lat, cell_lon, SUM(count) as count
+                FROM heatmap_rollup
+                WHERE hour_epoch >= ?{rollup_filter}
+                GROUP BY cell_lat, cell_lon
+            ''', (boundary,) + drone_args).fetchall()
+            edge = conn.execute(f'''
+                SELECT latitude, longitude FROM detections
+                WHERE ts_epoch >= ? AND ts_epoch < ?{edge_filter}
+            ''', (cutoff_epoch, boundary) + drone_args).fetchall()
             
-        cutoff_str = cutoff.strftime('%Y-%m-%d %H:%M:%S')
+        cells = {(row['cell_lat'], row['cell_lon']): row['count'] for row in rows}
+        for row in edge:
+            cell = (grid_cell(row['latitude']), grid_cell(row['longitude']))
+            cells[cell] = cells.get(cell, 0) + 1
+        return cells
         
-        # Total detections
-        cursor.execute('''
-            SELECT COUNT(*) as total FROM detections 
-            WHERE datetime(timestamp) >= datetime(?)
-        ''', (cutoff_str,))
-        total = cursor.fetchone()['total']
+    def get_heatmap_tiles(self, level, cutoff_epoch, bbox, limit=None):
+        """
+        Heatmap tiles at one pyramid level inside a bounding box
         
-        # High alert count
-        cursor.execute('''
-            SELECT COUNT(*) as high_alerts FROM detections 
-            WHERE datetime(timestamp) >= datetime(?) AND alert_level = 'HIGH'
-        ''', (cutoff_str,))
-        high_alerts = cursor.fetchone()['high_alerts']
+        Whole days come from heatmap_tiles; the partial day at the cutoff
+        edge is binned from the detections table.
         
-        # Average confidence
-        cursor.execute('''
-            SELECT AVG(confidence) as avg_conf FROM detections 
-            WHERE datetime(timestamp) >= datetime(?)
-        ''', (cutoff_str,))
-        avg_conf = cursor.fetchone()['avg_conf'] or 0
+        Args:
+            level (int): Pyramid level (one of HEATMAP_TILE_LEVELS)
+            cutoff_epoch (int): Lower bound on ts_epoch
+            bbox (tuple): (west, south, east, north) in degrees
+            limit (int): Max tiles read from the pyramid, busiest first
+            
+        Returns:
+            dict: (tx, ty) -> [count, lat_sum, lon_sum]
+        """
+        west, south, east, north = bbox
+        min_tx, min_ty = tile_xy(south, west, level)
+        max_tx, max_ty = tile_xy(north, east, level)
+        boundary = -(-cutoff_epoch // 86400) * 86400  # First whole day at or after the cutoff
         
-        # Peak hour
-        cursor.execute('''
-            SELECT strftime('%H', timestamp) as hour, COUNT(*) as count
-            FROM detections
-            WHERE datetime(timestamp) >= datetime(?)
-            GROUP BY hour
-            ORDER BY count DESC
-            LIMIT 1
-        ''', (cutoff_str,))
-        peak_hour_row = cursor.fetchone()
-        peak_hour = f"{peak_hour_row['hour']}:00" if peak_hour_row else "N/A"
-        peak_count = peak_hour_row['count'] if peak_hour_row else 0
-        
-        # Detections by alert level
-        cursor.execute('''
-            SELECT alert_level, COUNT(*) as count
-            FROM detections
-            WHERE datetime(timestamp) >= datetime(?)
-            GROUP BY alert_level
-        ''', (cutoff_str,))
-        alert_breakdown = {row['alert_level']: row['count'] for row in cursor.fetchall()}
+        with self._snapshot() as conn:
+            rows = conn.execute('''
+                SELECT tx, ty, SUM(count) as count, SUM(lat_sum) as lat_sum, SUM(lon_sum) as lon_sum
+                FROM heatmap_tiles
+                WHERE level = ? AND day_epoch >= ?
+                  AND tx BETWEEN ? AND ? AND ty BETWEEN ? AND ?
+                GROUP BY tx, ty
+                ORDER BY count DESC
+                LIMIT ?
+            ''', (level, boundary, min_tx, max_tx, min_ty, max_ty, -1 if limit is None else limit)).fetchall()
+            edge = conn.execute('''
+                SELECT latitude, longitude FROM detections
+                WHERE ts_epoch >= ? AND ts_epoch < ?
+                  AND latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+            ''', (cutoff_epoch, boundary, south, north, west, east)).fetchall()
+            
+        tiles = {(row['tx'], row['ty']): [row['count'], row['lat_sum'], row['lon_sum']] for row in rows}
+        for row in edge:
+            tile = tiles.setdefault(tile_xy(row['latitude'], row['longitude'], level), [0, 0.0, 0.0])
+            tile[0] += 1
+            tile[1] += row['latitude']
+            tile[2] += row['longitude']
+        return tiles
         
-        return {
-            'total_detections': total,
-            'high_alerts': high_alerts,
-            'average_confidence': round(avg_conf, 4),
-            'peak_hour': peak_hour,
-            'peak_hour_count': peak_count,
-            'alert_breakdown': alert_breakdown,
-            'period': period
-        }
+    def get_statistics(self, period='all'):
+        """
+        Calculate detection statistics
+        
+        Args:
+            period (str): 'today', 'week', 'month', or 'all'
+            
+        Returns:
+            dict: Statistics dictionary
+        """
+        buckets, _ = self.get_statistics_buckets(to_epoch(period_cutoff(period)))
+        return summarize_buckets(buckets, period)
         
     def add_safe_zone(self, name, center_lat, center_lon, radius):
         """
@@ -286,22 +1485,23 @@ class DetectionDatabase:
         Returns:
             int: Zone ID
         """
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO safe_zones (name, center_lat, center_lon, radius)
-            VALUES (?, ?, ?, ?)
-        ''', (name, center_lat, center_lon, radius))
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT INTO safe_zones (name, center_lat, center_lon, radius)
+                VALUES (?, ?, ?, ?)
+            ''', (name, center_lat, center_lon, radius))
         
-        self.conn.commit()
-        zone_id = cursor.lastrowid
-        print(f"✅ Safe zone '{name}' added (ID: {zone_id})")
-        return zone_id
+            self.conn.commit()
+            self.write_generation += 1
+            zone_id = cursor.lastrowid
+            print(f"✅ Safe zone '{name}' added (ID: {zone_id})")
+            return zone_id
         
     def get_safe_zones(self):
         """Get all safe zones"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM safe_zones')
-        rows = cursor.fetchall()
+        with self.connections.reader() as conn:
+            rows = conn.execute('SELECT * FROM safe_zones').fetchall()
         return [dict(row) for row in rows]
         
     def update_detection_tracking(self, lat, lon):
@@ -315,42 +1515,167 @@ class DetectionDatabase:
         Returns:
             float: Duration in seconds
         """
-        cursor = self.conn.cursor()
+        with self._write_lock:
+            cursor = self.conn.cursor()
         
-        # Create unique key for this location (rounded to 5 decimal places)
-        location_key = f"{lat:.5f}_{lon:.5f}"
+            # Create unique key for this location (rounded to 5 decimal places)
+            location_key = f"{lat:.5f}_{lon:.5f}"
         
-        # Check if we've seen this location before
-        cursor.execute('''
-            SELECT * FROM detection_tracking WHERE location_key = ?
-        ''', (location_key,))
+            # Check if we've seen this location before
+            cursor.execute('''
+                SELECT * FROM detection_tracking WHERE location_key = ?
+            ''', (location_key,))
         
-        row = cursor.fetchone()
+            row = cursor.fetchone()
         
-        now = datetime.now()
+            now = datetime.now()
         
-        if row:
-            # Update existing tracking
-            first_seen = datetime.fromisoformat(row['first_seen'])
-            duration = (now - first_seen).total_seconds()
+            if row:
+                # Update existing tracking
+                first_seen = datetime.fromisoformat(row['first_seen'])
+                duration = (now - first_seen).total_seconds()
             
-            cursor.execute('''
-                UPDATE detection_tracking 
-                SET last_seen = ?, count = count + 1
-                WHERE location_key = ?
-            ''', (now.isoformat(), location_key))
+                cursor.execute('''
+                    UPDATE detection_tracking 
+                    SET last_seen = ?, count = count + 1
+                    WHERE location_key = ?
+                ''', (now.isoformat(), location_key))
             
-        else:
-            # New location
-            duration = 0
-            cursor.execute('''
-                INSERT INTO detection_tracking 
-                (location_key, first_seen, last_seen, latitude, longitude)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (location_key, now.isoformat(), now.isoformat(), lat, lon))
+            else:
+                # New location
+                duration = 0
+                cursor.execute('''
+                    INSERT INTO detection_tracking 
+                    (location_key, first_seen, last_seen, latitude, longitude)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (location_key, now.isoformat(), now.isoformat(), lat, lon))
             
-        self.conn.commit()
-        return duration
+            self._commit()
+            return duration
+        
+    def prune_detections(self, older_than_days, tombstone_days=7, chunk_size=1000):
+        """
+        Delete old detections, recording a tombstone for each deleted id
+        
+        Rollups are decremented in the same transaction and snapshots no
+        longer referenced by any detection are removed.
+        
+        Args:
+            older_than_days (float): Delete detections older than this
+            tombstone_days (float): How long tombstones are kept for syncing clients
+            chunk_size (int): Rows deleted per transaction
+            
+        Returns:
+            int: Number of detections deleted
+        """
+        cutoff = to_epoch(datetime.now() - timedelta(days=older_than_days))
+        columns = ', '.join(DETECTION_COLUMNS)
+        deleted = 0
+        
+        while True:
+            with self._write_lock:
+                cursor = self.conn.cursor()
+                rows = cursor.execute(f'''
+                    SELECT id, {columns} FROM detections
+                    WHERE ts_epoch < ?
+                    ORDER BY ts_epoch LIMIT ?
+                ''', (cutoff, chunk_size)).fetchall()
+                if not rows:
+                    break
+                    
+                now = int(time.time())
+                ids = [(row['id'],) for row in rows]
+                self._update_rollups(cursor, [tuple(row)[1:] for row in rows], sign=-1)
+                cursor.executemany('DELETE FROM detections WHERE id = ?', ids)
+                cursor.executemany(
+                    'INSERT INTO detection_tombstones (detection_id, deleted_epoch) VALUES (?, ?)',
+                    [(detection_id, now) for (detection_id,) in ids]
+                )
+                self._commit()
+                deleted += len(rows)
+                
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            if deleted:
+                # Emptied rollup buckets and orphaned snapshots only appear after deletes
+                cursor.execute('DELETE FROM hourly_rollup WHERE count <= 0')
+                cursor.execute('DELETE FROM heatmap_rollup WHERE count <= 0')
+                cursor.execute('DELETE FROM heatmap_tiles WHERE count <= 0')
+                cursor.execute('''
+                    DELETE FROM detection_images WHERE image_id NOT IN
+                    (SELECT image_id FROM detections WHERE image_id IS NOT NULL)
+                ''')
+            expired = cursor.execute(
+                'DELETE FROM detection_tombstones WHERE deleted_epoch < ?',
+                (int(time.time() - tombstone_days * 86400),)
+            ).rowcount
+            self._commit()
+            
+            # Leave cached responses valid when nothing changed (expired
+            # tombstones change what get_detections_since returns)
+            if deleted or expired:
+                self.write_generation += 1
+            
+        if deleted:
+            self._clear_image_cache()
+            print(f"🧹 Pruned {deleted} detections older than {older_than_days} days")
+        return deleted
+        
+    def get_detections_since(self, after_id, tombstone_seq=None, limit=500):
+        """
+        Delta sync: detections newer than a client's high-water mark
+        
+        Args:
+            after_id (int): Highest detection id the client already has
+                (None: return only the current high-water mark)
+            tombstone_seq (int): Tombstone sequence from the client's last sync
+                (None on first sync: no tombstones are returned)
+            limit (int): Max detections returned
+            
+        Returns:
+            dict: detections (id order, no inline images), high_water_mark,
+                has_more, tombstones ([[first_id, last_id], ...] the client should
+                drop), tombstone_seq (pass back next time), and reset (True when
+                tombstones the client needed have expired: reload from scratch)
+        """
+        with self._snapshot() as conn:
+            if after_id is None:
+                # Bootstrap: no rows, just the current marks
+                rows = []
+                after_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM detections').fetchone()[0]
+            else:
+                rows = conn.execute(f'''
+                    SELECT {DETECTION_SELECT} FROM detections
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                ''', (after_id, limit + 1)).fetchall()
+            
+            latest = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'detection_tombstones'"
+            ).fetchone()
+            latest_seq = latest[0] if latest else 0
+            
+            tombstones = []
+            reset = False
+            if tombstone_seq is not None and tombstone_seq < latest_seq:
+                oldest_seq = conn.execute('SELECT MIN(seq) FROM detection_tombstones').fetchone()[0]
+                reset = oldest_seq is None or tombstone_seq + 1 < oldest_seq
+                tombstones = [row[0] for row in conn.execute('''
+                    SELECT detection_id FROM detection_tombstones
+                    WHERE seq > ? AND detection_id <= ?
+                    ORDER BY detection_id
+                ''', (tombstone_seq, after_id))]
+                
+        detections = [dict(row) for row in rows[:limit]]
+        return {
+            'detections': detections,
+            'high_water_mark': detections[-1]['id'] if detections else after_id,
+            'has_more': len(rows) > limit,
+            'tombstones': compact_ids(tombstones),
+            'tombstone_seq': latest_seq,
+            'reset': reset
+        }
         
     def cleanup_old_tracking(self, max_age_seconds=30):
         """
@@ -359,23 +1684,27 @@ class DetectionDatabase:
         Args:
             max_age_seconds (int): Max age in seconds
         """
-        cursor = self.conn.cursor()
-        cutoff = datetime.now() - timedelta(seconds=max_age_seconds)
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cutoff = datetime.now() - timedelta(seconds=max_age_seconds)
         
-        cursor.execute('''
-            DELETE FROM detection_tracking 
-            WHERE datetime(last_seen) < datetime(?)
-        ''', (cutoff.isoformat(),))
+            cursor.execute('''
+                DELETE FROM detection_tracking 
+                WHERE datetime(last_seen) < datetime(?)
+            ''', (cutoff.isoformat(),))
         
-        deleted = cursor.rowcount
-        self.conn.commit()
+            deleted = cursor.rowcount
+            self._commit()
         
-        if deleted > 0:
-            print(f"🧹 Cleaned up {deleted} old tracking entries")
+            if deleted > 0:
+                print(f"🧹 Cleaned up {deleted} old tracking entries")
             
     def close(self):
-        """Close database connection"""
-        self.conn.close()
+        """Flush pending writes and close database connection"""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        self.connections.close()
         print("✅ Database connection closed")
 
 
@@ -0,0 +1,155 @@
+"""
+Detection Log Reader - Byte-offset cursor over the drone's NDJSON segments
+Consumes every record appended since the last read, across segment rotation.
+The read position lives in memory; the persisted cursor only moves when the
+caller commits it, so records that never reached the database are replayed.
+"""
+
+import json
+import os
+import re
+import threading
+
+SEGMENT_PATTERN = re.compile(r'^segment-(\d{8})\.ndjson$')
+
+
+def segment_name(index):
+    """File name for segment number `index` (matches Ultron/detection_log.py)"""
+    return f"segment-{index:08d}.ndjson"
+
+
+def list_segments(directory):
+    """Return sorted segment indexes present in `directory`"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(SEGMENT_PATTERN.match, names) if m)
+
+
+class DetectionLogReader:
+    def __init__(self, directory, cursor_path):
+        """
+        Initialize the reader and restore its cursor
+
+        Args:
+            directory (str): Directory holding the segment files
+            cursor_path (str): File where (segment, offset) is persisted between runs
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.cursor_path = cursor_path
+        self.segment_index = 0
+        self.offset = 0
+        self._load_cursor()
+        self.committed = (self.segment_index, self.offset)  # Last persisted cursor
+        self.epoch = 0  # Bumped by rewind(); commits from an older epoch are ignored
+        self._lock = threading.Lock()
+
+    def _load_cursor(self):
+        try:
+            with open(self.cursor_path, 'r') as f:
+                cursor = json.load(f)
+            self.segment_index = int(cursor['segment'])
+            self.offset = int(cursor['offset'])
+        except (FileNotFoundError, ValueError, KeyError):
+            self.segment_index, self.offset = 0, 0
+
+    def _save_cursor(self, cursor):
+        tmp_path = self.cursor_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'segment': cursor[0], 'offset': cursor[1]}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def commit(self, cursor, epoch=None):
+        """
+        Persist a cursor returned by read_new() once its records are stored
+
+        Args:
+            cursor (tuple): (segment, offset) just past the last handled record
+            epoch (int): Value of `epoch` taken before the read; if the reader
+                was rewound since, the commit is dropped
+
+        Returns:
+            bool: True if the persisted cursor moved
+        """
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return False
+            if cursor <= self.committed:
+                return False
+            self._save_cursor(cursor)
+            self.committed = cursor
+            return True
+
+    def rewind(self):
+        """
+        Move the read position back to the committed cursor after a failed batch
+
+        Everything read since is replayed by the next read_new(), and commits
+        for reads made before the rewind are dropped so none can skip past it.
+        """
+        with self._lock:
+            self.segment_index, self.offset = self.committed
+            self.epoch += 1
+        print(f"⏪ Detection log rewound to {segment_name(self.committed[0])}@{self.committed[1]}")
+
+    def read_new(self):
+        """
+        Read every complete record appended since the last call
+
+        The cursor is not persisted here: pass the returned end cursor to
+        commit() after the records are durable.
+
+        Returns:
+            tuple: (records, end_cursor) - detection dicts in write order and
+                the (segment, offset) just past the last one consumed
+        """
+        with self._lock:
+            return self._read_new()
+
+    def _read_new(self):
+        records = []
+
+        while True:
+            segments = list_segments(self.directory)
+            if not segments:
+                break
+
+            if self.segment_index not in segments:
+                # Cursor segment was pruned by retention (or first run): skip ahead
+                later = [s for s in segments if s > self.segment_index]
+                if not later:
+                    break
+                self.segment_index, self.offset = later[0], 0
+
+            path = os.path.join(self.directory, segment_name(self.segment_index))
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(self.offset)
+                    chunk = f.read()
+            except FileNotFoundError:
+                continue
+
+            # Only consume up to the last newline; a partial tail is still being written
+            end = chunk.rfind(b'\n') + 1
+            for line in chunk[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"⚠️ Skipping corrupt log line in {segment_name(self.segment_index)}: {e}")
+            self.offset += end
+
+            # The writer only appends to the newest segment, so an older one is complete
+            later = [s for s in segments if s > self.segment_index]
+            if later:
+                if end != len(chunk):
+                    print(f"⚠️ Dropping truncated tail of {segment_name(self.segment_index)}")
+                self.segment_index, self.offset = later[0], 0
+                continue
+            break
+
+        return records, (self.segment_index, self.offset)
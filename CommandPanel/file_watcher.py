@@ -0,0 +1,158 @@
+"""
+File Watcher Module - Event-driven change notification for the live feed
+Uses Linux inotify when available and falls back to stat polling elsewhere
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class FileWatcher:
+    def __init__(self, directory, filename=None, events=IN_CLOSE_WRITE | IN_MOVED_TO,
+                 poll_interval=0.5):
+        """
+        Watch a directory (optionally a single file inside it) for finished writes
+
+        Args:
+            directory (str): Directory to watch
+            filename (str): Only report changes to this file name (None = any file)
+            events (int): inotify event mask to wake on
+            poll_interval (float): Stat interval in seconds for the polling fallback
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.filename = filename
+        self.events = events
+        self.poll_interval = poll_interval
+        self.backend = 'polling'
+
+        self._fd = None
+        self._last_signature = self._signature()
+        self._open_inotify()
+
+    def _open_inotify(self):
+        """Set up an inotify watch, leaving the polling fallback in place on failure"""
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            return
+
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return  # Not Linux (or a libc without inotify)
+
+        fd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return
+
+        wd = inotify_add_watch(fd, os.fsencode(os.path.abspath(self.directory)),
+                               self.events | IN_Q_OVERFLOW)
+        if wd < 0:
+            os.close(fd)
+            return
+
+        self._fd = fd
+        self.backend = 'inotify'
+
+    def _signature(self):
+        """Return a (inode, size, mtime_ns) snapshot of the watched file(s)"""
+        if self.filename:
+            names = [self.filename]
+        else:
+            try:
+                names = sorted(os.listdir(self.directory))
+            except OSError:
+                return None
+
+        signature = []
+        for name in names:
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            signature.append((name, st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(signature)
+
+    def wait(self, timeout=None):
+        """
+        Block until the watched file changes or the timeout elapses
+
+        Args:
+            timeout (float): Max seconds to wait (None = forever)
+
+        Returns:
+            bool: True if a change was observed, False on timeout
+        """
+        if self._fd is not None:
+            return self._wait_inotify(timeout)
+        return self._wait_polling(timeout)
+
+    def _wait_inotify(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        # Drain every queued event; one wake-up covers all of them
+        changed = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                changed = True  # Events were dropped; assume ours was one of them
+            elif self.filename is None or name == os.fsencode(self.filename):
+                changed = True
+
+        return changed
+
+    def _wait_polling(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            signature = self._signature()
+            if signature != self._last_signature:
+                self._last_signature = signature
+                return True
+
+            if deadline is None:
+                time.sleep(self.poll_interval)
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        """Release the inotify descriptor"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -11,6 +11,10 @@ class TacticalMap {
         this.zoom = zoom;
         this.containerId = containerId;
         this.markerTimeout = 300000; // 5 minutes in milliseconds
+        this.heatmapLayer = null;
+        this.heatmapLoader = null;
+        this.heatmapTimer = null;
+        this.heatmapRefresh = () => this.scheduleHeatmapRefresh();
     }
 
     /**
@@ -54,7 +58,8 @@ class TacticalMap {
      * @param {Object} detection - Detection data
      */
     addMarker(detection) {
-        const { latitude, longitude, confidence, message, timestamp, image_base64, alert_level } = detection;
+        const { latitude, longitude, confidence, message, timestamp, alert_level } = detection;
+        const imageSrc = UltronAPI.detectionImageSrc(detection);
 
         // Determine marker color based on alert level
         let color;
@@ -79,7 +84,7 @@ class TacticalMap {
         // Create popup content
         const popupContent = `
             <div style="min-width: 200px;">
-                ${image_base64 ? `<img src="data:image/jpeg;base64,${image_base64}" style="width: 100%; height: 120px; object-fit: cover; border-radius: 4px; margin-bottom: 8px;" />` : ''}
+                ${imageSrc ? `<img src="${imageSrc}" loading="lazy" style="width: 100%; height: 120px; object-fit: cover; border-radius: 4px; margin-bottom: 8px;" />` : ''}
                 <div style="font-weight: 700; margin-bottom: 4px; color: ${color};">${message}</div>
                 <div style="font-size: 0.75rem; color: #666; margin-bottom: 2px;">
                     <strong>Confidence:</strong> ${(confidence * 100).toFixed(1)}%
@@ -135,6 +140,18 @@ class TacticalMap {
         }
     }
 
+    /**
+     * Remove markers for deleted detections
+     * @param {Array} ranges - Tombstone ranges [[firstId, lastId], ...]
+     */
+    removeMarkersByIds(ranges) {
+        const isDeleted = (id) => ranges.some(([first, last]) => id >= first && id <= last);
+
+        this.markers
+            .filter(markerData => isDeleted(markerData.detection.id))
+            .forEach(markerData => this.removeMarker(markerData));
+    }
+
     /**
      * Clear all markers
      */
@@ -180,12 +197,74 @@ class TacticalMap {
     }
 
     /**
-     * Add heatmap layer (if needed in future)
+     * Show the heatmap and keep it in sync with the visible area
+     * @param {Function} loader - (bbox, zoom) => Promise<Array of [lat, lon, intensity]>
+     */
+    enableHeatmap(loader) {
+        this.heatmapLoader = loader;
+        this.map.on('moveend', this.heatmapRefresh);
+        this.refreshHeatmap();
+    }
+
+    /**
+     * Hide the heatmap and stop refreshing it
+     */
+    disableHeatmap() {
+        this.map.off('moveend', this.heatmapRefresh);
+        clearTimeout(this.heatmapTimer);
+        this.heatmapLoader = null;
+        if (this.heatmapLayer) {
+            this.map.removeLayer(this.heatmapLayer);
+            this.heatmapLayer = null;
+        }
+    }
+
+    /**
+     * Debounce viewport refreshes while the user is panning/zooming
+     */
+    scheduleHeatmapRefresh() {
+        clearTimeout(this.heatmapTimer);
+        this.heatmapTimer = setTimeout(() => this.refreshHeatmap(), 250);
+    }
+
+    /**
+     * Fetch the cells for the current viewport and redraw
+     */
+    async refreshHeatmap() {
+        const loader = this.heatmapLoader;
+        if (!loader) return;
+
+        const bbox = this.map.getBounds().toBBoxString();
+        const heatmapData = await loader(bbox, this.map.getZoom());
+
+        // Drop responses that arrive after the heatmap was turned off
+        if (this.heatmapLoader === loader) {
+            this.addHeatmap(heatmapData);
+        }
+    }
+
+    /**
+     * Draw heatmap cells (replaces the previous heatmap layer)
      * @param {Array} heatmapData - Array of [lat, lon, intensity]
      */
     addHeatmap(heatmapData) {
-        // Placeholder for heatmap functionality
-        // Would require leaflet-heat plugin
+        if (this.heatmapLayer) {
+            this.map.removeLayer(this.heatmapLayer);
+        }
+
+        const maxCount = heatmapData.reduce((max, [, , count]) => Math.max(max, count), 1);
+
+        this.heatmapLayer = L.layerGroup(heatmapData.map(([lat, lon, count]) => {
+            const intensity = count / maxCount;
+            return L.circleMarker([lat, lon], {
+                radius: 6 + 10 * intensity,
+                stroke: false,
+                fillColor: '#ff4444',
+                fillOpacity: 0.15 + 0.5 * intensity,
+                interactive: false
+            });
+        })).addTo(this.map);
+
         console.log('Heatmap data received:', heatmapData.length, 'points');
     }
 }
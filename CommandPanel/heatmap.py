@@ -0,0 +1,94 @@
+"""
+Heatmap Module - Viewport heatmap queries over the tile pyramid
+Picks a tile level that matches the map zoom and returns only the tiles
+inside the visible bounding box, capped at a fixed number of cells.
+"""
+
+from database import HEATMAP_TILE_LEVELS, period_cutoff, to_epoch
+
+
+def level_for_zoom(zoom, cell_pixels=16):
+    """
+    Pick the pyramid level whose tiles are about `cell_pixels` wide on screen
+    
+    Args:
+        zoom (int): Web map zoom (256 px tiles, 2^zoom of them around the world)
+        cell_pixels (int): Target on-screen cell width
+        
+    Returns:
+        int: One of HEATMAP_TILE_LEVELS
+    """
+    # A level-L tile is 256 * 2^zoom / 2^L pixels wide
+    target = zoom + 8 - max(cell_pixels.bit_length() - 1, 0)
+    candidates = [level for level in HEATMAP_TILE_LEVELS if level <= target]
+    return candidates[-1] if candidates else HEATMAP_TILE_LEVELS[0]
+
+
+def parse_bbox(value):
+    """
+    Parse a Leaflet `toBBoxString()` value
+    
+    Args:
+        value (str): "west,south,east,north"
+        
+    Returns:
+        tuple: (west, south, east, north), clamped to valid coordinates
+        
+    Raises:
+        ValueError: If the value is malformed
+    """
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox must be "west,south,east,north"')
+    west, south, east, north = parts
+    if west > east or south > north:
+        raise ValueError('bbox must be "west,south,east,north"')
+    return max(west, -180.0), max(south, -90.0), min(east, 180.0), min(north, 90.0)
+
+
+class HeatmapService:
+    def __init__(self, database, max_cells=2000):
+        """
+        Initialize the heatmap service
+        
+        Args:
+            database (DetectionDatabase): Database holding the tile pyramid
+            max_cells (int): Most cells returned for one viewport
+        """
+        self.db = database
+        self.max_cells = max_cells
+        
+    def get_cells(self, bbox, zoom=14, period='all'):
+        """
+        Heatmap cells visible in a viewport
+        
+        Falls back to coarser levels while the viewport holds more than
+        `max_cells` tiles; at the coarsest level the busiest cells win.
+        
+        Args:
+            bbox (tuple): (west, south, east, north)
+            zoom (int): Map zoom level
+            period (str): 'today', 'week', 'month', or 'all'
+            
+        Returns:
+            dict: {'level', 'cells': [[lat, lon, count], ...], 'truncated'}
+        """
+        cutoff = to_epoch(period_cutoff(period))
+        levels = [level for level in HEATMAP_TILE_LEVELS if level <= level_for_zoom(zoom)]
+        
+        for level in reversed(levels):
+            tiles = self.db.get_heatmap_tiles(level, cutoff, bbox, limit=self.max_cells + 1)
+            if len(tiles) <= self.max_cells:
+                break
+                
+        busiest = sorted(tiles.values(), key=lambda tile: tile[0], reverse=True)
+        cells = [
+            [lat_sum / count, lon_sum / count, count]  # Centroid of the detections in the tile
+            for count, lat_sum, lon_sum in busiest[:self.max_cells]
+        ]
+        
+        return {
+            'level': level,
+            'cells': cells,
+            'truncated': len(busiest) > self.max_cells
+        }
@@ -0,0 +1,131 @@
+"""
+Ingest Module - Bounded ingest queue with a single batching consumer
+Detections pushed over HTTP/WebSocket or replayed from the detection log all
+funnel through here, so filtering and database writes happen on one thread.
+"""
+
+import queue
+import threading
+import time
+
+
+class _Done:
+    """Queue marker: run `callback` once every record queued before it is handled"""
+    __slots__ = ('callback', 'failed')
+
+    def __init__(self, callback, failed):
+        self.callback = callback
+        self.failed = failed  # IngestQueue.failed when the records were submitted
+
+
+class IngestQueue:
+    def __init__(self, handler, max_size=10000, batch_size=200, batch_window=0.05,
+                 tick=None, tick_interval=0.5):
+        """
+        Initialize the ingest queue
+
+        Args:
+            handler (callable): Called with each record, in order; an exception
+                only loses that record (counted in `failed`)
+            max_size (int): Records buffered before submit() starts rejecting
+            batch_size (int): Max records drained from the queue at once
+            batch_window (float): Max seconds to wait while filling a batch
+            tick (callable): Optional housekeeping hook run on the consumer thread
+            tick_interval (float): Seconds between `tick` calls
+        """
+        self.handler = handler
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.tick = tick
+        self.tick_interval = tick_interval
+
+        self.queue = queue.Queue(maxsize=max_size)
+        self.received = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = None
+
+    def submit(self, records, block=False, on_done=None):
+        """
+        Enqueue records
+
+        Args:
+            records (list): Detection dicts
+            block (bool): Wait for space instead of dropping (for durable sources)
+            on_done (callable): Called on the consumer thread with `ok` once
+                `handler` has processed every accepted record (skipped if any
+                were dropped); `ok` is False if a record failed in the meantime,
+                which may include records other callers submitted alongside
+
+        Returns:
+            int: Number of records accepted (the rest were dropped: queue full)
+        """
+        failed = self.failed
+        accepted = 0
+        for record in records:
+            try:
+                self.queue.put(record, block=block)
+                accepted += 1
+            except queue.Full:
+                break
+
+        self.received += accepted
+        self.dropped += len(records) - accepted
+        if on_done and accepted == len(records):
+            self.queue.put(_Done(on_done, failed))
+        return accepted
+
+    def start(self):
+        """Start the consumer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def depth(self):
+        """Records currently waiting"""
+        return self.queue.qsize()
+
+    def _next_batch(self, timeout):
+        """Block for the first record, then gather more until size or window is hit"""
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _handle(self, record):
+        """Run one record through `handler`, isolating its failure from the batch"""
+        try:
+            self.handler(record)
+        except Exception as e:
+            self.failed += 1
+            print(f"⚠️ Ingest record failed: {e}")
+
+    def _run(self):
+        last_tick = time.monotonic()
+
+        while True:
+            try:
+                for item in self._next_batch(timeout=self.tick_interval):
+                    if isinstance(item, _Done):
+                        item.callback(self.failed == item.failed)
+                    else:
+                        self._handle(item)
+
+                if self.tick and time.monotonic() - last_tick >= self.tick_interval:
+                    self.tick()
+                    last_tick = time.monotonic()
+
+            except Exception as e:
+                print(f"❌ Ingest error: {e}")
+                time.sleep(0.1)
@@ -0,0 +1,123 @@
+"""
+Response Cache - Generation-invalidated cache for read-only API responses
+Responses are keyed by path + sorted query string and stay valid until the
+database write generation changes (or an optional TTL passes, for endpoints
+whose answer also depends on the clock). Every cached response carries a
+strong ETag and Last-Modified, so polling clients and reverse proxies get
+304 Not Modified when nothing changed.
+"""
+
+import collections
+import functools
+import hashlib
+import threading
+import time
+
+from flask import Response, make_response, request
+
+
+class ResponseCache:
+    def __init__(self, generation, max_entries=256):
+        """
+        Initialize the cache
+        
+        Args:
+            generation (callable): Returns the current write generation
+            max_entries (int): Least recently used responses are evicted past this
+        """
+        self.generation = generation
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+    def cached(self, ttl=None, vary=()):
+        """
+        Decorator for GET view functions
+        
+        Args:
+            ttl (float): Max seconds an entry is reused even without writes (None = no limit)
+            vary (tuple): Request headers that select a different representation
+            
+        Returns:
+            callable: Decorator
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                # Streamed responses and writes go straight through
+                if request.method != 'GET' or request.args.get('stream'):
+                    return view(*args, **kwargs)
+                    
+                key = (
+                    request.path,
+                    tuple(sorted(request.args.items(multi=True))),
+                    tuple(request.headers.get(header, '') for header in vary)
+                )
+                # Read the generation first: a write that lands while the view
+                # runs must invalidate what we store
+                generation = self.generation()
+                
+                entry = self._lookup(key, generation, ttl)
+                if entry is None:
+                    self.misses += 1
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    entry = self._store(key, generation, response)
+                else:
+                    self.hits += 1
+                    
+                response = Response(entry['body'], status=200, headers=entry['headers'])
+                response.set_etag(entry['etag'])
+                response.last_modified = entry['last_modified']
+                response.cache_control.no_cache = True  # Proxies may store it but must revalidate
+                for header in vary:
+                    response.vary.add(header)
+                return response.make_conditional(request)
+                
+            return wrapper
+        return decorator
+        
+    def _lookup(self, key, generation, ttl):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry['generation'] != generation:
+                return None
+            if ttl is not None and time.monotonic() - entry['created_at'] >= ttl:
+                return None
+            self.entries.move_to_end(key)
+            return entry
+            
+    def _store(self, key, generation, response):
+        body = response.get_data()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        
+        with self.lock:
+            previous = self.entries.get(key)
+            # Unchanged body after an unrelated write keeps its Last-Modified
+            if previous is not None and previous['etag'] == etag:
+                last_modified = previous['last_modified']
+            else:
+                last_modified = time.time()
+                
+            entry = {
+                'generation': generation,
+                'body': body,
+                'headers': [(name, value) for name, value in response.headers
+                            if name.lower() not in ('content-length', 'etag', 'last-modified')],
+                'etag': etag,
+                'last_modified': last_modified,
+                'created_at': time.monotonic()
+            }
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+        
+    def clear(self):
+        """Drop every cached response"""
+        with self.lock:
+            self.entries.clear()
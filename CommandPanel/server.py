@@ -3,7 +3,7 @@ Flask Server - Backend API for Command Panel
 Provides REST API endpoints and WebSocket real-time updates
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 import json
@@ -11,28 +11,73 @@ import os
 import time
 import threading
 from datetime import datetime
-from database import DetectionDatabase
+from database import DetectionDatabase, ReaderPoolExhausted, to_epoch, validate_detection
 from analytics import Analytics
+from stats_engine import StatisticsEngine
+from heatmap import HeatmapService, parse_bbox
+from response_cache import ResponseCache
+from broadcaster import Broadcaster
+from client_queues import ClientQueueManager
+from subscriptions import Subscription, SubscriptionIndex
+from tracker import SpatialHashTracker
+from compression import MSGPACK_MIMETYPE, ResponseCompressor, msgpack, pack, wants_msgpack
+from file_watcher import FileWatcher, IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE
+from detection_log import DetectionLogReader
+from ingest import IngestQueue
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'ultron-command-panel-secret-2026'
 CORS(app, resources={r"/*": {"origins": "*"}})  # Enable CORS for all routes
 
+# gzip (or brotli/zstd when installed) for responses over 1 KB
+compressor = ResponseCompressor(app, min_size=1024)
+
 # Initialize SocketIO for real-time updates (Allow all origins)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Initialize database and analytics
 db = DetectionDatabase()
+db.enable_write_behind(max_rows=200, max_delay=0.05)  # Grouped commits for the ingest path
 analytics = Analytics(db)
-
-# File watcher configuration
-JSON_FILE_PATH = 'data/live_feed.json'
-last_modified_time = 0
-
-# Active detections tracking (for 5-second persistence)
-active_detections = {}
+stats_engine = StatisticsEngine(db)  # Incrementally updated /api/statistics
+heatmap_service = HeatmapService(db, max_cells=2000)
+
+# Read APIs are served from here until the database write generation changes
+response_cache = ResponseCache(lambda: db.write_generation)
+
+# Detection log configuration (append-only NDJSON segments written by Ultron)
+DETECTION_LOG_DIR = 'data/detection_log'
+DETECTION_LOG_CURSOR = 'data/detection_log.cursor'
+CLEANUP_INTERVAL = 0.5  # seconds between stale-detection sweeps
+
+# Push ingestion configuration (POST /api/ingest and the 'ingest' socket event)
+INGEST_QUEUE_SIZE = 10000  # records buffered before pushes are rejected
+INGEST_BATCH_SIZE = 200  # records committed per transaction
+INGEST_BATCH_WINDOW = 0.05  # seconds to wait while filling a batch
+
+# Retention (None keeps every detection); pruned ids are reported to syncing clients
+DETECTION_RETENTION_DAYS = None
+TOMBSTONE_RETENTION_DAYS = 7
+PRUNE_INTERVAL = 3600  # seconds between retention sweeps
+SYNC_PAGE_SIZE = 500  # detections per /api/detections/since response
+
+# WebSocket fan-out of stored detections
+BROADCAST_INTERVAL = 0.1  # seconds between 'new_detections' frames
+BROADCAST_MAX_FRAME = 200  # detections per frame
+
+# Per-client send queues (backpressure for slow dashboards)
+CLIENT_QUEUE_SIZE = 32  # events queued per client
+CLIENT_QUEUE_POLICY = 'drop_oldest'  # 'drop_oldest', 'coalesce' or 'disconnect'
+CLIENT_ACK_WINDOW = 4  # un-acked events in flight per client
+CLIENT_ACK_TIMEOUT = 5.0  # seconds before an un-acked event stops blocking the window
+SUBSCRIPTION_CELL_SIZE = 0.01  # degrees per viewport index cell (~1.1 km)
+
+# Live target tracking (for 5-second persistence)
 PERSISTENCE_THRESHOLD = 0.1  # seconds (Reduced for instant feedback)
+TRACK_RADIUS_M = 3.0  # observations this close continue the same target (absorbs GPS jitter)
+TRACK_MAX_AGE = 10.0  # seconds unseen before a target is forgotten
+tracker = SpatialHashTracker(radius_m=TRACK_RADIUS_M, max_age=TRACK_MAX_AGE)
 
 # ==========================================
 #           API ENDPOINTS (REST)
@@ -53,8 +98,10 @@ def index():
             'endpoints': {
                 'detections_live': '/api/detections/live',
                 'detections_all': '/api/detections/all',
+                'detection_image': '/api/detections/<id>/image',
                 'statistics': '/api/statistics',
                 'safe_zones': '/api/safe-zones',
+                'ingest': '/api/ingest',
                 'export_csv': '/api/export/csv',
                 'export_pdf': '/api/export/pdf'
             }
@@ -70,8 +117,12 @@ def api_info():
         'endpoints': {
             'detections_live': '/api/detections/live',
             'detections_all': '/api/detections/all',
+            'detections_since': '/api/detections/since',
+            'metrics': '/api/metrics',
+            'detection_image': '/api/detections/<id>/image',
             'statistics': '/api/statistics',
             'safe_zones': '/api/safe-zones',
+            'ingest': '/api/ingest',
             'export_csv': '/api/export/csv',
             'export_pdf': '/api/export/pdf'
         }
@@ -113,43 +164,252 @@ def serve_css_js(filename):
     return send_from_directory(os.path.join(base_dir, 'frontend', 'css', 'js'), filename)
 
 
+@app.errorhandler(ReaderPoolExhausted)
+def reader_pool_exhausted(e):
+    """Every database reader is busy: ask the client to retry shortly"""
+    response = jsonify({'success': False, 'error': str(e)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+def error_response(e):
+    """JSON error for a failed API request (503 when the reader pool is exhausted, else 500)"""
+    if isinstance(e, ReaderPoolExhausted):
+        return reader_pool_exhausted(e)
+    return jsonify({'success': False, 'error': str(e)}), 500
+
+DETECTION_PAGE_SIZE = 500  # Default page size for /api/detections/all
+DETECTION_PAGE_MAX = 5000
+
+def with_image_url(detection):
+    """Point a detection at its lazily served snapshot instead of inlining it"""
+    if 'image_id' in detection:  # Unless projected out with ?fields=
+        image_id = detection['image_id']
+        detection['image_url'] = f"/api/detections/{detection['id']}/image" if image_id else None
+    return detection
+
+def with_image_urls(detections):
+    """with_image_url() for a list of detections"""
+    for detection in detections:
+        with_image_url(detection)
+    return detections
+
+STREAM_MODES = ('json', 'ndjson')
+
+def detection_list_response(payload):
+    """JSON response, or MessagePack when the client sends Accept: application/msgpack"""
+    if wants_msgpack(request):
+        return Response(pack(payload), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload)
+
+def stream_detections(detections, mode, limit=None):
+    """
+    Stream detections as they come off the database cursor
+    
+    Args:
+        detections (iterator): Detection dicts (e.g. DetectionDatabase.iter_detections())
+        mode (str): 'ndjson' (one object per line) or 'json' (same envelope as
+            the buffered endpoints, written incrementally)
+        limit (int): Page size, to report next_after_id in 'json' mode
+        
+    Returns:
+        Response: Chunked response; the database reader is released when it ends
+    """
+    def generate():
+        if mode == 'ndjson':
+            for detection in detections:
+                yield json.dumps(with_image_url(detection), separators=(',', ':')) + '\n'
+            return
+            
+        count = 0
+        last_id = None
+        yield '{"success":true,"detections":['
+        for detection in detections:
+            yield (',' if count else '') + json.dumps(with_image_url(detection), separators=(',', ':'))
+            count += 1
+            last_id = detection['id']
+        next_after_id = last_id if limit is not None and count == limit else None
+        yield f'],"count":{count},"next_after_id":{json.dumps(next_after_id)}}}'
+        
+    mimetype = 'application/x-ndjson' if mode == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def _parse_bool(value):
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Expected a boolean, got '{value}'")
+
+def parse_detection_query(args):
+    """
+    Translate list-endpoint query params into DetectionDatabase.query_detections() arguments
+    
+    Raises:
+        ValueError: On malformed values
+    """
+    query = {
+        'after_id': args.get('after_id', type=int),
+        'limit': min(max(args.get('limit', DETECTION_PAGE_SIZE, type=int), 1), DETECTION_PAGE_MAX)
+    }
+    if args.get('after_id') and query['after_id'] is None:
+        raise ValueError('after_id must be an integer')
+        
+    if args.get('fields'):
+        query['fields'] = [field.strip() for field in args['fields'].split(',') if field.strip()]
+    for name in ('alert_level', 'drone_id'):
+        if args.get(name):
+            query[name] = [value.strip() for value in args[name].split(',') if value.strip()]
+    if args.get('in_safe_zone'):
+        query['in_safe_zone'] = _parse_bool(args['in_safe_zone'])
+    for name in ('min_confidence', 'max_confidence'):
+        if args.get(name):
+            query[name] = float(args[name])
+    return query
+
 @app.route('/api/detections/live')
+@response_cache.cached(ttl=5, vary=('Accept',))
 def get_live_detections():
     """
     Get detections from the last hour
     
+    Query params:
+        stream: 'json' or 'ndjson' to stream rows as they are read (optional)
+    
     Returns:
-        JSON: List of recent detections
+        JSON (or MessagePack with Accept: application/msgpack): List of recent detections
     """
     try:
-        detections = db.get_detections_last_hours(1)
-        return jsonify({
+        stream = request.args.get('stream')
+        if stream:
+            if stream not in STREAM_MODES:
+                return jsonify({'success': False, 'error': f"stream must be one of {', '.join(STREAM_MODES)}"}), 400
+            return stream_detections(db.iter_detections_last_hours(1), stream)
+            
+        detections = with_image_urls(db.get_detections_last_hours(1))
+        return detection_list_response({
             'success': True,
             'count': len(detections),
             'detections': detections
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return error_response(e)
 
 @app.route('/api/detections/all')
+@response_cache.cached(vary=('Accept',))
 def get_all_detections():
     """
-    Get all detections from database
+    Get detections from database, one page at a time (oldest first)
+    
+    Query params:
+        after_id: Return detections with a higher id (next_after_id of the previous page)
+        limit: Page size (default: 500, max: 5000; unlimited when streaming)
+        fields: Comma-separated columns to return (id is always included;
+            image_base64 is only read when listed)
+        alert_level, drone_id: Comma-separated values to match
+        in_safe_zone: true/false
+        min_confidence, max_confidence: Confidence range
+        stream: 'json' or 'ndjson' to stream rows as they are read (optional)
     
     Returns:
-        JSON: List of all detections
+        JSON: Page of detections plus next_after_id (null on the last page)
     """
     try:
-        detections = db.get_all_detections()
-        return jsonify({
+        stream = request.args.get('stream')
+        if stream and stream not in STREAM_MODES:
+            return jsonify({'success': False, 'error': f"stream must be one of {', '.join(STREAM_MODES)}"}), 400
+            
+        try:
+            query = parse_detection_query(request.args)
+            if stream:
+                # Constant memory, so an archival client may pull the full history in one request
+                if 'limit' not in request.args:
+                    query['limit'] = None
+                return stream_detections(db.iter_detections(**query), stream, limit=query['limit'])
+                
+            detections = with_image_urls(db.query_detections(**query))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+            
+        full_page = len(detections) == query['limit']
+        return detection_list_response({
             'success': True,
             'count': len(detections),
-            'detections': detections
+            'detections': detections,
+            'next_after_id': detections[-1]['id'] if full_page else None
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return error_response(e)
+
+def sync_detections(args):
+    """Run a delta sync for 'id'/'tombstone_seq' params (REST query string or socket payload)"""
+    after_id, tombstone_seq = (
+        int(args[name]) if args.get(name) not in (None, '') else None
+        for name in ('id', 'tombstone_seq')
+    )
+    
+    result = db.get_detections_since(after_id, tombstone_seq, limit=SYNC_PAGE_SIZE)
+    with_image_urls(result['detections'])
+    return result
+
+@app.route('/api/detections/since')
+@response_cache.cached(vary=('Accept',))
+def get_detections_since():
+    """
+    Delta sync for (re)connecting dashboards
+    
+    Query params:
+        id: Highest detection id the client has (omit to only get the
+            current high_water_mark and tombstone_seq before a full load)
+        tombstone_seq: tombstone_seq from the previous sync (omit on first sync)
+    
+    Returns:
+        JSON: New detections, high_water_mark, has_more, tombstones
+        ([[first_id, last_id], ...] to drop), tombstone_seq and reset
+    """
+    try:
+        try:
+            result = sync_detections(request.args)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'id and tombstone_seq must be integers'}), 400
+        return detection_list_response({'success': True, 'count': len(result['detections']), **result})
+    except Exception as e:
+        return error_response(e)
+
+@app.route('/api/detections/<int:detection_id>/image')
+def get_detection_image(detection_id):
+    """
+    Serve a detection snapshot as image/jpeg
+    
+    Snapshots are content-addressed, so the image id doubles as a strong
+    ETag and responses can be cached forever by browsers and proxies.
+    
+    Returns:
+        JPEG bytes, 304 if the client copy is current, or 404
+    """
+    try:
+        image_id = db.get_detection_image_id(detection_id)
+        if not image_id:
+            return jsonify({'success': False, 'error': 'No image for this detection'}), 404
+        
+        # Answer revalidations without touching the blob
+        if image_id in request.if_none_match:
+            response = Response(status=304)
+        else:
+            data = db.get_image(image_id)
+            if data is None:
+                return jsonify({'success': False, 'error': 'Image not found'}), 404
+            response = Response(data, mimetype='image/jpeg')
+        
+        response.set_etag(image_id)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+    except Exception as e:
+        return error_response(e)
 
 @app.route('/api/statistics')
+@response_cache.cached(ttl=30)
 def get_statistics():
     """
     Get detection statistics
@@ -162,15 +422,16 @@ def get_statistics():
     """
     try:
         period = request.args.get('period', 'all')
-        stats = db.get_statistics(period)
+        stats = stats_engine.get_statistics(period)
         return jsonify({
             'success': True,
             'statistics': stats
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return error_response(e)
 
 @app.route('/api/safe-zones', methods=['GET', 'POST'])
+@response_cache.cached()
 def safe_zones():
     """
     GET: Get all safe zones
@@ -196,7 +457,7 @@ def safe_zones():
                 'zones': zones
             })
         except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return error_response(e)
             
     elif request.method == 'POST':
         try:
@@ -213,7 +474,7 @@ def safe_zones():
                 'message': f"Safe zone '{data['name']}' created"
             })
         except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return error_response(e)
 
 @app.route('/api/export/csv')
 def export_csv():
@@ -235,7 +496,7 @@ def export_csv():
             'message': 'CSV exported successfully'
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return error_response(e)
 
 @app.route('/api/export/pdf')
 def export_pdf():
@@ -257,37 +518,217 @@ def export_pdf():
             'message': 'PDF report generated successfully'
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return error_response(e)
 
 @app.route('/api/heatmap')
+@response_cache.cached(ttl=60)
 def get_heatmap_data():
     """
     Get heatmap data for visualization
     
     Query params:
         period: 'today', 'week', 'month', or 'all' (default: 'all')
+        bbox: Visible area as "west,south,east,north" (optional)
+        zoom: Map zoom level, used with bbox (default: 14)
     
     Returns:
-        JSON: Heatmap data points
+        JSON: Heatmap data points ([lat, lon, count]); with bbox, only the
+        cells in view at a resolution matching the zoom. Either way at most
+        max_cells points (the busiest), with 'truncated' set if more exist
     """
     try:
         period = request.args.get('period', 'all')
-        heatmap_data = analytics.generate_heatmap_data(period)
+        
+        if 'bbox' not in request.args:
+            max_cells = heatmap_service.max_cells
+            heatmap_data = analytics.generate_heatmap_data(period, limit=max_cells + 1)
+            return jsonify({
+                'success': True,
+                'data': heatmap_data[:max_cells],
+                'truncated': len(heatmap_data) > max_cells
+            })
+            
+        try:
+            bbox = parse_bbox(request.args['bbox'])
+            zoom = int(request.args.get('zoom', 14))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+            
+        result = heatmap_service.get_cells(bbox, zoom=zoom, period=period)
         return jsonify({
             'success': True,
-            'data': heatmap_data
+            'data': result['cells'],
+            'level': result['level'],
+            'truncated': result['truncated']
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return error_response(e)
+
+@app.route('/api/metrics')
+def get_metrics():
+    """
+    Live pipeline metrics (socket send queues, ingest and broadcast backlog, caches)
+    
+    Returns:
+        JSON: Metrics dictionary
+    """
+    return jsonify({
+        'success': True,
+        'metrics': {
+            'socket_queues': client_queues.metrics(),
+            'broadcaster': {
+                'pending': broadcaster.depth(),
+                'published': broadcaster.published,
+                'merged': broadcaster.merged,
+                'frames': broadcaster.frames
+            },
+            'ingest': {
+                'queue_depth': ingest_queue.depth(),
+                'received': ingest_queue.received,
+                'dropped': ingest_queue.dropped,
+                'failed': ingest_queue.failed
+            },
+            'live_tracks': len(tracker),
+            'response_cache': {
+                'entries': len(response_cache.entries),
+                'hits': response_cache.hits,
+                'misses': response_cache.misses
+            }
+        }
+    })
+
+def _parse_ingest_payload(payload):
+    """
+    Normalize an ingest payload (single record or array) and validate every record
+    
+    Returns:
+        tuple: (records, invalid) - normalized records, and {'index', 'error'}
+            for each record that failed validate_detection()
+    
+    Raises:
+        ValueError: If the payload is not a detection object or array of them
+    """
+    records = payload if isinstance(payload, list) else [payload]
+    if not records or not all(isinstance(r, dict) for r in records):
+        raise ValueError('Expected a detection object or an array of detection objects')
+    
+    valid, invalid = [], []
+    for index, record in enumerate(records):
+        try:
+            valid.append(validate_detection(record))
+        except ValueError as e:
+            invalid.append({'index': index, 'error': str(e)})
+    return valid, invalid
+
+@app.route('/api/ingest', methods=['POST'])
+def ingest_detections():
+    """
+    Push detections from a drone (alternative to the shared detection log)
+    
+    POST body:
+        A single detection object or an array of them, in the same format
+        Ultron writes to the detection log
+    
+    Returns:
+        JSON: Accepted/dropped counts (202, or 503 when the ingest queue is full);
+        400 with the indexes of invalid records, in which case nothing is queued
+    """
+    try:
+        records, invalid = _parse_ingest_payload(request.get_json(force=True))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if invalid:
+        return jsonify({'success': False, 'error': 'Invalid detection records',
+                        'invalid': invalid}), 400
+    
+    accepted = ingest_queue.submit(records)
+    dropped = len(records) - accepted
+    return jsonify({
+        'success': dropped == 0,
+        'accepted': accepted,
+        'dropped': dropped,
+        'queue_depth': ingest_queue.depth()
+    }), 202 if dropped == 0 else 503
 
 # ==========================================
 #           WEBSOCKET EVENTS
 # ==========================================
 
+# Per-client socket preferences: payload encoding ('json' or 'msgpack') and
+# whether to receive snapshots inline. Frames are serialized once per
+# profile and queued per client (see broadcast_detections).
+client_profiles = {}
+SOCKET_ENCODINGS = ('json', 'msgpack')
+
+def update_profile(sid, **changes):
+    """Apply preference changes to a client's profile"""
+    profile = client_profiles.setdefault(sid, {'encoding': 'json', 'images': False})
+    profile.update(changes)
+    return profile
+
+def broadcast_detections(event, frame, full_frame):
+    """
+    Queue a 'new_detections' frame, trimmed per client to what it subscribed to
+    
+    Args:
+        event (str): Event name
+        frame (dict): Frame without inline images
+        full_frame (dict): Same frame with inline images
+    """
+    # Route each detection through the subscription index: only clients whose
+    # filters (drone, alert level, viewport cell) match are looked at
+    selected = {}  # sid -> indexes of the frame items it receives
+    for index, item in enumerate(frame['detections']):
+        for sid in subscriptions.match(item['detection']):
+            selected.setdefault(sid, []).append(index)
+            
+    encoded = {}  # Serialize once per (items, encoding, images), not once per client
+    for sid, indexes in selected.items():
+        profile = client_profiles.get(sid)
+        if profile is None:
+            continue
+        variant = (tuple(indexes), profile['encoding'], profile['images'])
+        if variant not in encoded:
+            source = full_frame if profile['images'] else frame
+            data = {**source, 'detections': [source['detections'][i] for i in indexes]}
+            encoded[variant] = pack(data) if profile['encoding'] == 'msgpack' else data
+        client_queues.enqueue(sid, event, encoded[variant])
+
+def emit_encoded(event, payload):
+    """emit() to the requesting client in its chosen encoding"""
+    if client_profiles.get(request.sid, {}).get('encoding') == 'msgpack':
+        payload = pack(payload)
+    emit(event, payload)
+
+# Bounded per-client outbound queues; events are acked by the client
+client_queues = ClientQueueManager(
+    socketio,
+    max_size=CLIENT_QUEUE_SIZE,
+    policy=CLIENT_QUEUE_POLICY,
+    window=CLIENT_ACK_WINDOW,
+    ack_timeout=CLIENT_ACK_TIMEOUT
+)
+
+# Per-client detection filters (drone, minimum alert level, map viewport)
+subscriptions = SubscriptionIndex(cell_size=SUBSCRIPTION_CELL_SIZE)
+
+# Stored detections reach clients as coalesced 'new_detections' frames
+broadcaster = Broadcaster(
+    socketio,
+    broadcast_detections,
+    interval=BROADCAST_INTERVAL,
+    max_frame=BROADCAST_MAX_FRAME,
+    tick=client_queues.pump_all  # Reopen ack windows that timed out
+)
+broadcaster.start()
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     print(f"🔌 Client connected: {request.sid}")
+    update_profile(request.sid)
+    client_queues.register(request.sid)
+    subscriptions.subscribe(request.sid)  # Everything until the client narrows it
     emit('connection_response', {
         'status': 'connected',
         'message': 'Connected to AFK-Ultron Command Panel'
@@ -297,19 +738,90 @@ def handle_connect():
 def handle_disconnect():
     """Handle client disconnection"""
     print(f"🔌 Client disconnected: {request.sid}")
+    client_profiles.pop(request.sid, None)
+    client_queues.unregister(request.sid)
+    subscriptions.unsubscribe(request.sid)
+
+@socketio.on('set_encoding')
+def handle_set_encoding(data):
+    """Switch this client's event payloads between JSON and MessagePack (binary frames)"""
+    encoding = (data or {}).get('encoding', 'json')
+    if encoding not in SOCKET_ENCODINGS:
+        return {'success': False, 'error': f"encoding must be one of {', '.join(SOCKET_ENCODINGS)}"}
+    if encoding == 'msgpack' and msgpack is None:
+        return {'success': False, 'error': 'MessagePack is not available on this server'}
+        
+    update_profile(request.sid, encoding=encoding)
+    return {'success': True, 'encoding': encoding}
+
+@socketio.on('subscribe_images')
+def handle_subscribe_images(data):
+    """Opt in/out of inline snapshots in 'new_detections' frames"""
+    enabled = bool((data or {}).get('enabled', True))
+    update_profile(request.sid, images=enabled)
+    return {'success': True, 'images': enabled}
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """
+    Narrow this client's 'new_detections' feed (omitted/null fields = no filter)
+    
+    Payload: {"drone_ids": [...], "min_alert_level": "MEDIUM", "bbox": "west,south,east,north"}
+    """
+    data = data or {}
+    try:
+        drone_ids = data.get('drone_ids')
+        if isinstance(drone_ids, str):
+            drone_ids = [drone_ids]
+        bbox = data.get('bbox')
+        if isinstance(bbox, (list, tuple)):
+            bbox = ','.join(str(v) for v in bbox)
+        subscription = Subscription(
+            drone_ids=drone_ids,
+            min_alert_level=data.get('min_alert_level'),
+            bbox=parse_bbox(bbox) if bbox else None
+        )
+    except (TypeError, ValueError) as e:
+        return {'success': False, 'error': str(e)}
+        
+    subscriptions.subscribe(request.sid, subscription)
+    return {'success': True, 'subscription': subscription.to_dict()}
 
 @socketio.on('request_update')
 def handle_update_request():
     """Handle manual update request from client"""
     try:
-        detections = db.get_detections_last_hours(1)
-        emit('detections_update', {
+        detections = with_image_urls(db.get_detections_last_hours(1))
+        emit_encoded('detections_update', {
             'detections': detections,
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
         emit('error', {'message': str(e)})
 
+@socketio.on('sync_since')
+def handle_sync_since(data):
+    """Delta sync over the socket (same payload and result as /api/detections/since)"""
+    try:
+        result = sync_detections(data or {})
+        emit_encoded('detections_sync', {**result, 'timestamp': datetime.now().isoformat()})
+    except Exception as e:
+        emit('error', {'message': str(e)})
+
+@socketio.on('ingest')
+def handle_ingest(payload):
+    """Push detections over a persistent socket (same payload as POST /api/ingest)"""
+    try:
+        records, invalid = _parse_ingest_payload(payload)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}
+    if invalid:
+        return {'success': False, 'error': 'Invalid detection records', 'invalid': invalid}
+    
+    accepted = ingest_queue.submit(records)
+    return {'success': accepted == len(records), 'accepted': accepted,
+            'dropped': len(records) - accepted}
+
 # ==========================================
 #      FILE WATCHER & SMART FILTERING
 # ==========================================
@@ -319,111 +831,141 @@ def process_detection(data):
     Process a new detection with smart filtering
     
     Args:
-        data (dict): Detection data from JSON
+        data (dict): Detection record from the detection log
         
     Returns:
         bool: True if detection should be stored, False if filtered out
     """
-    # Create unique key for this detection location
     lat = data.get('latitude', 0)
     lon = data.get('longitude', 0)
-    detection_key = f"{lat:.5f}_{lon:.5f}"
     
-    current_time = time.time()
+    # Match to the nearest live target (or the drone's own track id, if it sends one)
+    track_id = data.get('track_id')
+    if track_id is not None:
+        track_id = f"{data.get('drone_id', 'unknown')}:{track_id}"
+    # Time the observation by the record's own timestamp, so a replayed backlog
+    # or a burst arriving at once keeps the spacing it was detected with
+    track, is_new = tracker.observe(lat, lon, data, track_id=track_id,
+                                    now=to_epoch(data.get('timestamp')))
     
-    # Check if we've seen this location before
-    if detection_key in active_detections:
-        # Update existing detection
-        detection_info = active_detections[detection_key]
-        detection_info['count'] += 1
-        detection_info['last_seen'] = current_time
-        detection_info['data'] = data  # Update with latest data
+    if is_new:
+        print(f"🆕 New detection tracked: {track.track_id}")
+        return False
         
-        # Calculate duration
-        duration = current_time - detection_info['first_seen']
+    # Only store if the target persisted >= threshold, and only once per target
+    duration = track.duration
+    if duration >= PERSISTENCE_THRESHOLD and not track.stored:
+        # Mark as stored
+        track.stored = True
         
-        # Only store if duration >= persistence threshold
-        if duration >= PERSISTENCE_THRESHOLD and not detection_info.get('stored', False):
-            # Mark as stored
-            detection_info['stored'] = True
-            
-            # Update tracking in database
-            db_duration = db.update_detection_tracking(lat, lon)
-            
-            # Add to database
-            detection_id = db.add_detection(data, duration=duration)
-            
-            print(f"✅ Detection persisted: {detection_key} (duration: {duration:.1f}s)")
-            
-            # Emit to all connected clients
-            socketio.emit('new_detection', {
-                'detection': data,
-                'duration': duration,
-                'detection_id': detection_id
-            })
-            
-            return True
-    else:
-        # New detection - start tracking
-        active_detections[detection_key] = {
-            'first_seen': current_time,
-            'last_seen': current_time,
-            'count': 1,
-            'data': data,
-            'stored': False
-        }
-        print(f"🆕 New detection tracked: {detection_key}")
+        # Update tracking in database (write-behind, grouped with the insert)
+        db.queue_tracking_update(lat, lon)
+        
+        # Fan out to connected clients (in the next frame) once the row is committed;
+        # updates for the same target coalesce on its track id
+        def on_commit(detection_id, key=track.track_id, data=data, duration=duration):
+            detection = dict(data, alert_level=db.calculate_alert_level(data.get('confidence', 0)))
+            broadcaster.publish(key, detection_id, detection, duration)
+        
+        # Add to database
+        db.queue_detection(data, duration=duration, on_commit=on_commit)
+        
+        print(f"✅ Detection persisted: {track.track_id} (duration: {duration:.1f}s)")
+        
+        return True
     
     return False
 
 def cleanup_stale_detections():
-    """Remove detections that haven't been seen recently"""
-    current_time = time.time()
-    stale_threshold = 10.0  # seconds
+    """Forget targets that haven't been seen recently"""
+    expired = tracker.expire()
     
-    stale_keys = [
-        key for key, info in active_detections.items()
-        if current_time - info['last_seen'] > stale_threshold
-    ]
-    
-    for key in stale_keys:
-        del active_detections[key]
-    
-    if stale_keys:
-        print(f"🧹 Cleaned up {len(stale_keys)} stale detections")
+    if expired:
+        print(f"🧹 Cleaned up {len(expired)} stale detections")
     
     # Also cleanup database tracking
     db.cleanup_old_tracking(max_age_seconds=30)
+    
+    prune_old_detections()
+
+_last_prune = 0.0
+
+def prune_old_detections():
+    """Apply DETECTION_RETENTION_DAYS (at most once per PRUNE_INTERVAL)"""
+    global _last_prune
+    
+    if DETECTION_RETENTION_DAYS is None or time.time() - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = time.time()
+    
+    if db.prune_detections(DETECTION_RETENTION_DAYS, tombstone_days=TOMBSTONE_RETENTION_DAYS):
+        stats_engine.invalidate()
+
+# Single consumer for every ingest source; also owns the stale-detection sweep.
+# Stored rows go to the write-behind buffer, which commits them in groups
+ingest_queue = IngestQueue(
+    process_detection,
+    max_size=INGEST_QUEUE_SIZE,
+    batch_size=INGEST_BATCH_SIZE,
+    batch_window=INGEST_BATCH_WINDOW,
+    tick=cleanup_stale_detections,
+    tick_interval=CLEANUP_INTERVAL
+)
+ingest_queue.start()
+
+def ingest_detection_log(reader):
+    """Queue every record appended to the detection log since the last read"""
+    epoch = reader.epoch
+    start = (reader.segment_index, reader.offset)
+    records, cursor = reader.read_new()
+    if cursor == start:
+        return 0
+        
+    # Invalid records are rejected for good, so the cursor may move past them
+    valid = []
+    for data in records:
+        try:
+            valid.append(validate_detection(data))
+        except ValueError as e:
+            print(f"⚠️ Rejected logged detection: {e}")
+    
+    # Persist the cursor only after these records are filtered and every row
+    # they produced is committed; if either fails, rewind and replay them
+    def on_done(ok):
+        if not ok:
+            reader.rewind()
+            return
+        db.queue_barrier(lambda: reader.commit(cursor, epoch),
+                         on_error=lambda error: reader.rewind())
+        
+    # The log is durable, so wait for queue space rather than dropping
+    ingest_queue.submit(valid, block=True, on_done=on_done)
+    return len(valid)
 
-def watch_json_file():
+def watch_detection_log():
     """
-    Watch the JSON file for changes and process new detections
+    Watch the detection log for appended records and queue them for ingest
     This runs in a separate thread
+    
+    Wakes on inotify write events (or a stat-polling fallback) and replays
+    every record since the saved byte offset, so bursts are never collapsed.
     """
-    global last_modified_time
+    reader = DetectionLogReader(DETECTION_LOG_DIR, DETECTION_LOG_CURSOR)
+    watcher = FileWatcher(DETECTION_LOG_DIR,
+                          events=IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
     
-    print(f"👁️  Watching file: {JSON_FILE_PATH}")
+    print(f"👁️  Watching detection log: {DETECTION_LOG_DIR} ({watcher.backend})")
+    
+    # Catch up on whatever was written while we were down
+    backlog = ingest_detection_log(reader)
+    if backlog:
+        print(f"📥 Replayed {backlog} logged detections")
     
     while True:
         try:
-            if os.path.exists(JSON_FILE_PATH):
-                current_modified = os.path.getmtime(JSON_FILE_PATH)
-                
-                if current_modified > last_modified_time:
-                    # File has been updated
-                    with open(JSON_FILE_PATH, 'r') as f:
-                        data = json.load(f)
-                    
-                    # Process the detection
-                    process_detection(data)
-                    
-                    last_modified_time = current_modified
-            
-            # Cleanup stale detections every iteration
-            cleanup_stale_detections()
-            
-            # Check every 0.5 seconds
-            time.sleep(0.5)
+            # Read on timeouts too, so a rewound batch is retried without new writes
+            watcher.wait(timeout=CLEANUP_INTERVAL)
+            ingest_detection_log(reader)
             
         except Exception as e:
             print(f"❌ File watcher error: {e}")
@@ -435,7 +977,7 @@ def watch_json_file():
 
 def start_file_watcher():
     """Start the file watcher in a background thread"""
-    watcher_thread = threading.Thread(target=watch_json_file, daemon=True)
+    watcher_thread = threading.Thread(target=watch_detection_log, daemon=True)
     watcher_thread.start()
     print("✅ File watcher started")
 
@@ -445,7 +987,8 @@ if __name__ == '__main__':
     print("=" * 70)
     print(f"📡 Starting server on http://localhost:5000")
     print(f"🔌 WebSocket enabled for real-time updates")
-    print(f"👁️  Monitoring: {JSON_FILE_PATH}")
+    print(f"👁️  Monitoring: {DETECTION_LOG_DIR}")
+    print(f"📥 Push ingest: POST /api/ingest")
     print(f"⏱️  Persistence threshold: {PERSISTENCE_THRESHOLD}s")
     print("=" * 70)
     
@@ -0,0 +1,81 @@
+"""
+Statistics Engine - Cached dashboard statistics
+Each period is aggregated once with a single grouped query and then kept
+current from database commit notifications, so /api/statistics does not
+rescan the detections table on every dashboard refresh.
+"""
+
+import threading
+import time
+
+from database import period_cutoff, summarize_buckets, to_epoch
+
+
+class StatisticsEngine:
+    def __init__(self, database, max_age=60):
+        """
+        Initialize the engine and subscribe to new detections
+        
+        Args:
+            database (DetectionDatabase): Database to aggregate
+            max_age (float): Seconds before a sliding period ('week', 'month')
+                is re-aggregated so detections that aged out are dropped
+        """
+        self.db = database
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.cache = {}  # period -> {'cutoff', 'buckets', 'last_id', 'computed_at'}
+        
+        database.add_commit_listener(self._on_commit)
+        
+    def get_statistics(self, period='all'):
+        """
+        Get detection statistics (same shape as DetectionDatabase.get_statistics)
+        
+        Args:
+            period (str): 'today', 'week', 'month', or 'all'
+            
+        Returns:
+            dict: Statistics dictionary
+        """
+        cutoff = to_epoch(period_cutoff(period))
+        
+        with self.lock:
+            entry = self.cache.get(period)
+            if entry is None or self._is_stale(entry, cutoff):
+                buckets, last_id = self.db.get_statistics_buckets(cutoff)
+                entry = {
+                    'cutoff': cutoff,
+                    'buckets': buckets,
+                    'last_id': last_id,
+                    'computed_at': time.monotonic()
+                }
+                self.cache[period] = entry
+                
+            return summarize_buckets(entry['buckets'], period)
+            
+    def invalidate(self):
+        """Drop every cached period (e.g. after bulk deletes)"""
+        with self.lock:
+            self.cache.clear()
+            
+    def _is_stale(self, entry, cutoff):
+        if cutoff == entry['cutoff']:
+            return False  # 'all' and 'today' (until midnight) never slide
+        return time.monotonic() - entry['computed_at'] >= self.max_age or \
+            cutoff // 86400 != entry['cutoff'] // 86400
+        
+    def _on_commit(self, records):
+        """Fold newly committed detections into every cached period"""
+        with self.lock:
+            for entry in self.cache.values():
+                for record in records:
+                    # Skip rows the aggregate query already counted
+                    if record['id'] <= entry['last_id'] or record['ts_epoch'] < entry['cutoff']:
+                        continue
+                    
+                    hour = time.strftime('%H', time.gmtime(record['ts_epoch']))
+                    bucket = entry['buckets'].setdefault((hour, record['alert_level']), [0, 0.0])
+                    bucket[0] += 1
+                    bucket[1] += record['confidence']
+                    entry['last_id'] = record['id']
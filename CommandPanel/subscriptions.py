@@ -0,0 +1,139 @@
+"""
+Subscriptions Module - Which socket clients want which detections
+Clients can narrow their feed by drone_id, minimum alert level and a map
+bounding box. Viewports are kept in a spatial grid, so routing a detection
+only looks at the clients whose viewport covers its grid cell (plus the
+clients without a viewport filter).
+"""
+
+import math
+import threading
+
+ALERT_RANK = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
+
+
+class Subscription:
+    def __init__(self, drone_ids=None, min_alert_level=None, bbox=None):
+        """
+        One client's filters (None = no filter)
+        
+        Args:
+            drone_ids (iterable): Drones to receive
+            min_alert_level (str): 'LOW', 'MEDIUM' or 'HIGH'
+            bbox (tuple): (west, south, east, north)
+        """
+        if min_alert_level is not None and min_alert_level not in ALERT_RANK:
+            raise ValueError(f"min_alert_level must be one of {', '.join(ALERT_RANK)}")
+            
+        self.drone_ids = frozenset(drone_ids) if drone_ids else None
+        self.min_alert_level = min_alert_level
+        self.min_rank = ALERT_RANK.get(min_alert_level, 0)
+        self.bbox = tuple(bbox) if bbox else None
+        
+    def matches(self, detection):
+        """Apply the drone, alert and (exact) bbox filters to a detection dict"""
+        if self.drone_ids is not None and detection.get('drone_id') not in self.drone_ids:
+            return False
+        if ALERT_RANK.get(detection.get('alert_level'), 0) < self.min_rank:
+            return False
+        if self.bbox is not None:
+            west, south, east, north = self.bbox
+            lat, lon = detection.get('latitude'), detection.get('longitude')
+            if lat is None or lon is None or not (south <= lat <= north and west <= lon <= east):
+                return False
+        return True
+        
+    def to_dict(self):
+        return {
+            'drone_ids': sorted(self.drone_ids) if self.drone_ids is not None else None,
+            'min_alert_level': self.min_alert_level,
+            'bbox': list(self.bbox) if self.bbox else None
+        }
+
+
+class SubscriptionIndex:
+    def __init__(self, cell_size=0.01, max_cells=4096):
+        """
+        Initialize the index
+        
+        Args:
+            cell_size (float): Grid cell size in degrees (0.01 ≈ 1.1 km)
+            max_cells (int): Viewports covering more cells than this are not
+                gridded; they are checked directly like unfiltered clients
+        """
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.subscriptions = {}  # sid -> Subscription
+        self.grid = {}  # (cx, cy) -> set of sids
+        self.ungridded = set()  # sids checked for every detection
+        self.cells = {}  # sid -> list of cells it occupies
+        self.lock = threading.Lock()
+        
+    def _cell(self, lat, lon):
+        return math.floor(lon / self.cell_size), math.floor(lat / self.cell_size)
+        
+    def subscribe(self, sid, subscription=None):
+        """
+        Set (or replace) a client's filters
+        
+        Args:
+            sid (str): Socket.IO session id
+            subscription (Subscription): Filters (None = receive everything)
+        """
+        subscription = subscription or Subscription()
+        
+        with self.lock:
+            self._remove(sid)
+            self.subscriptions[sid] = subscription
+            
+            cells = []
+            if subscription.bbox is not None:
+                west, south, east, north = subscription.bbox
+                min_x, min_y = self._cell(south, west)
+                max_x, max_y = self._cell(north, east)
+                if (max_x - min_x + 1) * (max_y - min_y + 1) <= self.max_cells:
+                    cells = [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+                    
+            if cells:
+                for cell in cells:
+                    self.grid.setdefault(cell, set()).add(sid)
+                self.cells[sid] = cells
+            else:
+                self.ungridded.add(sid)
+                
+    def unsubscribe(self, sid):
+        """Forget a client"""
+        with self.lock:
+            self._remove(sid)
+            
+    def _remove(self, sid):
+        self.subscriptions.pop(sid, None)
+        self.ungridded.discard(sid)
+        for cell in self.cells.pop(sid, ()):
+            members = self.grid.get(cell)
+            if members is not None:
+                members.discard(sid)
+                if not members:
+                    del self.grid[cell]
+                    
+    def match(self, detection):
+        """
+        Clients that should receive a detection
+        
+        Args:
+            detection (dict): Detection with latitude, longitude, drone_id, alert_level
+            
+        Returns:
+            list: Matching sids
+        """
+        with self.lock:
+            candidates = set(self.ungridded)
+            lat, lon = detection.get('latitude'), detection.get('longitude')
+            if lat is not None and lon is not None:
+                candidates |= self.grid.get(self._cell(lat, lon), set())
+                
+            return [sid for sid in candidates if self.subscriptions[sid].matches(detection)]
+            
+    def get(self, sid):
+        """A client's current Subscription (or None)"""
+        return self.subscriptions.get(sid)
@@ -0,0 +1,98 @@
+"""
+Ack window of the per-client send queues
+"""
+
+from client_queues import ClientQueueManager
+
+
+class FakeServer:
+    def __init__(self, manager_ref):
+        self.manager_ref = manager_ref
+        self.disconnected = []
+
+    def disconnect(self, sid, namespace=None):
+        # A real server runs the disconnect handler, which unregisters the client
+        assert not self.manager_ref[0].lock._is_owned(), "disconnect called under the manager lock"
+        self.disconnected.append(sid)
+        self.manager_ref[0].unregister(sid)
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.manager_ref = [None]
+        self.server = FakeServer(self.manager_ref)
+        self.emitted = []  # (event, data, sid, callback)
+
+    def emit(self, event, data, to=None, callback=None):
+        self.emitted.append((event, data, to, callback))
+
+
+def make_manager(**options):
+    socketio = FakeSocketIO()
+    manager = ClientQueueManager(socketio, **options)
+    socketio.manager_ref[0] = manager
+    manager.register('a')
+    return manager, socketio
+
+
+def test_window_limits_unacked_events():
+    manager, socketio = make_manager(window=2)
+    for n in range(5):
+        manager.enqueue('a', 'new_detections', n)
+
+    assert [data for _, data, _, _ in socketio.emitted] == [0, 1]
+    assert manager.metrics()['total_depth'] == 3
+
+    socketio.emitted[0][3]()  # Client acks the first event
+    assert [data for _, data, _, _ in socketio.emitted] == [0, 1, 2]
+
+
+def test_acks_are_matched_by_event_id():
+    manager, socketio = make_manager(window=2)
+    for n in range(4):
+        manager.enqueue('a', 'new_detections', n)
+    first_ack = socketio.emitted[0][3]
+
+    first_ack()
+    first_ack()  # A duplicate ack must not free a second slot
+    assert [data for _, data, _, _ in socketio.emitted] == [0, 1, 2]
+
+    socketio.emitted[2][3]()  # Out of order: ack event 2 before event 1
+    assert [data for _, data, _, _ in socketio.emitted] == [0, 1, 2, 3]
+    assert list(manager.clients['a'].in_flight) == [2, 4]  # Events 1 and 3 still un-acked
+
+
+def test_late_ack_after_timeout_does_not_free_newer_slot():
+    manager, socketio = make_manager(window=1, ack_timeout=0)
+    manager.enqueue('a', 'new_detections', 0)
+    manager.enqueue('a', 'new_detections', 1)  # Event 0 timed out, so 1 goes out
+    assert len(socketio.emitted) == 2
+
+    manager.ack_timeout = 60
+    manager.enqueue('a', 'new_detections', 2)
+    socketio.emitted[0][3]()  # Late ack of the expired event
+    assert len(socketio.emitted) == 2
+
+    socketio.emitted[1][3]()
+    assert [data for _, data, _, _ in socketio.emitted] == [0, 1, 2]
+
+
+def test_backpressure_notice_after_drops():
+    manager, socketio = make_manager(window=1, max_size=2)
+    for n in range(5):
+        manager.enqueue('a', 'new_detections', n)
+
+    socketio.emitted[0][3]()
+    events = [(event, data) for event, data, _, _ in socketio.emitted]
+    assert events[1] == ('backpressure', {'dropped': 2})
+    assert events[2] == ('new_detections', 3)
+
+
+def test_disconnect_policy_disconnects_outside_lock():
+    manager, socketio = make_manager(window=1, max_size=1, policy='disconnect')
+    for n in range(3):
+        manager.enqueue('a', 'new_detections', n)
+
+    assert socketio.server.disconnected == ['a']
+    assert 'a' not in manager.clients
+    assert manager.metrics()['disconnected'] == 1
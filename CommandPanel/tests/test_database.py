@@ -0,0 +1,193 @@
+"""
+Persistence path: detections written through the writer connection must be
+visible to the read-only pool, listeners only hear about committed rows
+"""
+
+import base64
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from database import DetectionDatabase, ReaderPoolExhausted, validate_detection
+
+IMAGE = base64.b64encode(b'\xff\xd8\xff\xe0 not really a jpeg').decode()
+
+
+def make_detection(**overrides):
+    detection = {
+        'timestamp': '2026-01-01 12:00:00',
+        'latitude': 28.6139,
+        'longitude': 77.2090,
+        'confidence': 0.9,
+        'message': 'NEW TARGET #1: 1 TOTAL',
+        'drone_id': 'ULTRON-01'
+    }
+    detection.update(overrides)
+    return detection
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = DetectionDatabase(str(tmp_path / 'detections.db'), readers=2)
+    yield database
+    database.close()
+
+
+def test_add_detection_is_visible_to_readers(db):
+    detection_id = db.add_detection(make_detection())
+
+    with db.connections.reader() as conn:
+        row = conn.execute('SELECT * FROM detections WHERE id = ?', (detection_id,)).fetchone()
+
+    assert row is not None
+    assert row['message'] == 'NEW TARGET #1: 1 TOTAL'
+    assert row['drone_id'] == 'ULTRON-01'
+
+
+def test_exhausted_reader_pool_times_out_but_streams_still_read(tmp_path):
+    db = DetectionDatabase(str(tmp_path / 'detections.db'), readers=1, reader_timeout=0.05)
+    db.add_detection(make_detection())
+
+    with db.connections.reader():
+        with pytest.raises(ReaderPoolExhausted):
+            with db.connections.reader():
+                pass
+        # Streams read on their own connection, not from the pool
+        assert len(list(db.iter_detections_last_hours(24 * 365 * 100))) == 1
+    db.close()
+
+
+def test_commit_listeners_see_committed_rows(db):
+    seen = []
+
+    def listener(records):
+        # Read back through the pool: the rows must already be committed
+        with db.connections.reader() as conn:
+            for record in records:
+                seen.append(conn.execute('SELECT id FROM detections WHERE id = ?',
+                                         (record['id'],)).fetchone() is not None)
+
+    db.add_commit_listener(listener)
+    db.add_detection(make_detection())
+    db.add_detections_bulk([make_detection(), make_detection(latitude=28.62)])
+
+    assert seen == [True, True, True]
+    assert db.write_generation == 2
+
+
+def test_prune_without_old_rows_keeps_the_generation(db):
+    db.add_detection(make_detection(timestamp='2026-01-01 12:00:00'))
+    generation = db.write_generation
+
+    assert db.prune_detections(older_than_days=36500) == 0
+    assert db.write_generation == generation
+
+
+def test_prune_removes_rows_and_orphaned_images(db):
+    db.add_detection(make_detection(timestamp='2000-01-01 12:00:00', image_base64=IMAGE))
+    kept_id = db.add_detection(make_detection(timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+    generation = db.write_generation
+
+    assert db.prune_detections(older_than_days=30) == 1
+    assert db.write_generation == generation + 1
+    with db.connections.reader() as conn:
+        assert [row['id'] for row in conn.execute('SELECT id FROM detections')] == [kept_id]
+        assert conn.execute('SELECT COUNT(*) FROM detection_images').fetchone()[0] == 0
+
+
+def test_rollups_match_raw_counts_after_inserts_and_prune(db):
+    today = datetime.now().strftime('%Y-%m-%d')
+    db.add_detection(make_detection(timestamp='2000-01-01 12:00:00'))
+    db.add_detection(make_detection(timestamp=f'{today} 00:10:00', drone_id=None))
+    db.add_detections_bulk([
+        make_detection(timestamp='2000-01-01 12:30:00', confidence=0.5),
+        make_detection(timestamp=f'{today} 00:20:00', latitude=28.62, confidence=0.5),
+        make_detection(timestamp=f'{today} 00:50:00', drone_id='ULTRON-02'),
+    ])
+    db.prune_detections(older_than_days=30)
+
+    with db.connections.reader() as conn:
+        raw = conn.execute('SELECT COUNT(*) FROM detections').fetchone()[0]
+        hourly = conn.execute('''
+            SELECT ts_epoch - ts_epoch % 3600, alert_level, COALESCE(drone_id, ''), COUNT(*)
+            FROM detections GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ''').fetchall()
+        rollup = conn.execute('''
+            SELECT hour_epoch, alert_level, drone_id, count FROM hourly_rollup ORDER BY 1, 2, 3
+        ''').fetchall()
+        heatmap = conn.execute('SELECT SUM(count) FROM heatmap_rollup').fetchone()[0]
+
+    assert raw == 3
+    assert [tuple(row) for row in rollup] == [tuple(row) for row in hourly]
+    assert heatmap == raw
+    assert sum(db.get_heatmap_cells(0).values()) == raw
+
+
+def test_image_cache_is_per_instance_and_cleared_on_prune(tmp_path, db):
+    db.add_detection(make_detection(timestamp='2000-01-01 12:00:00', image_base64=IMAGE))
+    with db.connections.reader() as conn:
+        image_id = conn.execute('SELECT image_id FROM detections').fetchone()['image_id']
+    assert db.get_image(image_id) == base64.b64decode(IMAGE)
+
+    other = DetectionDatabase(str(tmp_path / 'other.db'), readers=1)
+    assert other.get_image(image_id) is None  # No cache shared between instances
+    other.close()
+
+    db.prune_detections(older_than_days=30)
+    assert db.get_image(image_id) is None
+
+
+def test_image_cache_is_bounded(tmp_path):
+    db = DetectionDatabase(str(tmp_path / 'detections.db'), readers=1, image_cache_size=2)
+    images = [base64.b64encode(f'jpeg {n}'.encode()).decode() for n in range(3)]
+    db.add_detections_bulk([make_detection(image_base64=image) for image in images])
+    with db.connections.reader() as conn:
+        image_ids = [row['image_id'] for row in conn.execute('SELECT image_id FROM detections ORDER BY id')]
+
+    for image_id in image_ids:
+        db.get_image(image_id)
+    assert list(db._image_cache) == image_ids[1:]
+    db.close()
+
+
+def test_one_bad_row_does_not_sink_a_write_behind_flush(db):
+    db.enable_write_behind(max_rows=1000, max_delay=60)
+    committed, barriers = [], []
+    db.queue_detection(make_detection(message='a'), on_commit=committed.append)
+    db.queue_detection(make_detection(message='bad', confidence=None), on_commit=committed.append)
+    db.queue_detection(make_detection(message='b'), on_commit=committed.append)
+    db.queue_barrier(lambda: barriers.append('ok'), lambda error: barriers.append(error))
+    db.flush()
+
+    assert len(committed) == 2
+    assert barriers == ['ok']  # The invalid row was rejected, not a failed write
+    with db.connections.reader() as conn:
+        messages = [row['message'] for row in conn.execute('SELECT message FROM detections ORDER BY id')]
+    assert messages == ['a', 'b']
+
+
+def test_failed_write_fails_the_barrier(db, monkeypatch):
+    db.enable_write_behind(max_rows=1000, max_delay=60)
+    barriers = []
+    db.queue_detection(make_detection())
+    db.queue_barrier(lambda: barriers.append('ok'), lambda error: barriers.append('failed'))
+
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError('disk I/O error')
+    monkeypatch.setattr(db, 'add_detections_bulk', broken)
+    db.flush()
+
+    assert barriers == ['failed']
+
+
+@pytest.mark.parametrize('field, value', [
+    ('latitude', None), ('longitude', 'east'), ('confidence', float('nan')), ('latitude', 91), ('confidence', 1.5)
+])
+def test_invalid_detections_are_rejected(field, value):
+    with pytest.raises(ValueError):
+        validate_detection(make_detection(**{field: value}))
+
+
+def test_numeric_strings_are_normalized():
+    assert validate_detection(make_detection(latitude='28.5'))['latitude'] == 28.5
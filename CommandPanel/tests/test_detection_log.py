@@ -0,0 +1,141 @@
+"""
+Detection log cursor: records are replayed until their cursor is committed
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from database import DetectionDatabase
+from detection_log import DetectionLogReader, segment_name
+from ingest import IngestQueue
+
+
+def append(directory, index, *records, tail=b''):
+    with open(os.path.join(directory, segment_name(index)), 'ab') as f:
+        for record in records:
+            f.write(json.dumps(record).encode() + b'\n')
+        f.write(tail)
+
+
+def make_reader(tmp_path):
+    return DetectionLogReader(str(tmp_path / 'log'), str(tmp_path / 'log.cursor'))
+
+
+def test_cursor_is_not_saved_until_commit(tmp_path):
+    reader = make_reader(tmp_path)
+    append(reader.directory, 0, {'n': 1}, {'n': 2})
+
+    records, cursor = reader.read_new()
+    assert records == [{'n': 1}, {'n': 2}]
+    assert not os.path.exists(reader.cursor_path)
+
+    # Crash before the commit: a new reader replays the same records
+    records, _ = make_reader(tmp_path).read_new()
+    assert records == [{'n': 1}, {'n': 2}]
+
+    reader.commit(cursor)
+    append(reader.directory, 0, {'n': 3})
+    assert make_reader(tmp_path).read_new()[0] == [{'n': 3}]
+
+
+def test_read_position_advances_without_commit(tmp_path):
+    reader = make_reader(tmp_path)
+    append(reader.directory, 0, {'n': 1})
+    reader.read_new()
+    append(reader.directory, 0, {'n': 2})
+
+    assert reader.read_new()[0] == [{'n': 2}]
+    assert reader.read_new()[0] == []
+
+
+def test_partial_tail_waits_and_rotation_continues(tmp_path):
+    reader = make_reader(tmp_path)
+    append(reader.directory, 0, {'n': 1}, tail=b'{"n": ')
+
+    records, cursor = reader.read_new()
+    assert records == [{'n': 1}]
+    assert cursor == (0, len(json.dumps({'n': 1})) + 1)
+
+    append(reader.directory, 0, tail=b'2}\n')
+    append(reader.directory, 1, {'n': 3})
+    records, cursor = reader.read_new()
+    assert records == [{'n': 2}, {'n': 3}]
+    assert cursor[0] == 1
+
+
+def test_commit_never_moves_backwards(tmp_path):
+    reader = make_reader(tmp_path)
+    reader.commit((2, 10))
+    reader.commit((1, 50))
+
+    assert make_reader(tmp_path).committed == (2, 10)
+
+
+def test_rewind_replays_and_drops_stale_commits(tmp_path):
+    reader = make_reader(tmp_path)
+    append(reader.directory, 0, {'n': 1})
+    epoch = reader.epoch
+    _, first = reader.read_new()
+    append(reader.directory, 0, {'n': 2})
+    _, second = reader.read_new()
+
+    # The first batch failed: a commit for the second must not skip past it
+    reader.rewind()
+    assert not reader.commit(second, epoch)
+    assert reader.committed == (0, 0)
+
+    records, cursor = reader.read_new()
+    assert records == [{'n': 1}, {'n': 2}]
+    assert reader.commit(cursor, reader.epoch)
+
+
+def test_cursor_commits_after_write_behind_flush(tmp_path):
+    db = DetectionDatabase(str(tmp_path / 'detections.db'), readers=1)
+    db.enable_write_behind(max_rows=1000, max_delay=60)
+    reader = make_reader(tmp_path)
+    append(reader.directory, 0, {'message': 'a'}, {'message': 'b'})
+    handled = threading.Event()
+
+    def handler(record):
+        db.queue_detection(dict(record, timestamp='2026-01-01 12:00:00',
+                                latitude=1.0, longitude=2.0, confidence=0.9))
+
+    ingest = IngestQueue(handler, batch_window=0.01, tick_interval=0.05)
+    ingest.start()
+    records, cursor = reader.read_new()
+    ingest.submit(records, block=True,
+                  on_done=lambda ok: (db.queue_barrier(lambda: reader.commit(cursor)), handled.set()))
+
+    assert handled.wait(5)
+    # Rows are still buffered in the writer, so the cursor has not moved
+    assert not os.path.exists(reader.cursor_path)
+
+    db.flush()
+    assert make_reader(tmp_path).committed == cursor
+    with db.connections.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM detections').fetchone()[0] == 2
+    db.close()
+
+
+def test_failed_flush_rewinds_instead_of_committing(tmp_path, monkeypatch):
+    db = DetectionDatabase(str(tmp_path / 'detections.db'), readers=1)
+    db.enable_write_behind(max_rows=1000, max_delay=60)
+    reader = make_reader(tmp_path)
+    append(reader.directory, 0, {'message': 'a'})
+    epoch = reader.epoch
+    records, cursor = reader.read_new()
+    db.queue_detection(dict(records[0], timestamp='2026-01-01 12:00:00',
+                            latitude=1.0, longitude=2.0, confidence=0.9))
+    db.queue_barrier(lambda: reader.commit(cursor, epoch), on_error=lambda error: reader.rewind())
+
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError('disk I/O error')
+    monkeypatch.setattr(db, 'add_detections_bulk', broken)
+    db.flush()
+
+    assert reader.committed == (0, 0)
+    assert not os.path.exists(reader.cursor_path)
+    assert reader.read_new()[0] == [{'message': 'a'}]
+    db.close()
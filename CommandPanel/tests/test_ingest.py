@@ -0,0 +1,29 @@
+"""
+IngestQueue: records are handled one at a time, so a failure stays with its record
+"""
+
+import threading
+
+from ingest import IngestQueue
+
+
+def test_failed_record_does_not_lose_its_neighbours():
+    handled = []
+    done = threading.Event()
+
+    def handler(record):
+        if record['n'] == 2:
+            raise KeyError('latitude')
+        handled.append(record['n'])
+
+    ingest = IngestQueue(handler, batch_window=0.05, tick_interval=0.05)
+    results = []
+    ingest.submit([{'n': 1}, {'n': 2}, {'n': 3}], on_done=lambda ok: (results.append(ok), done.set()))
+    ingest.start()
+
+    assert done.wait(5)
+    assert handled == [1, 3]
+    # The failure is reported, so a durable source can replay instead of committing
+    assert results == [False]
+    assert ingest.failed == 1
+    assert ingest.received == 3
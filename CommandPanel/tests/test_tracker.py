@@ -0,0 +1,29 @@
+"""
+SpatialHashTracker timed by record timestamps: replayed tracks keep their spacing
+"""
+
+from tracker import SpatialHashTracker
+
+
+def test_replayed_observations_keep_their_duration():
+    tracker = SpatialHashTracker(max_age=10.0)
+    hour_ago = 1_000_000.0
+
+    track, is_new = tracker.observe(28.5, 77.2, now=hour_ago)
+    assert is_new
+    track, is_new = tracker.observe(28.5, 77.2, now=hour_ago + 3)
+
+    assert not is_new
+    assert track.duration == 3
+    # The sweep runs on the same clock, so the replayed track is not dropped at once
+    assert tracker.expire() == []
+    assert tracker.expire(now=hour_ago + 14) == [track]
+
+
+def test_untimed_observations_use_the_wall_clock():
+    tracker = SpatialHashTracker(max_age=10.0)
+    track, _ = tracker.observe(28.5, 77.2)
+
+    assert tracker.lag == 0.0
+    assert tracker.expire() == []
+    assert tracker.expire(now=track.last_seen + 11) == [track]
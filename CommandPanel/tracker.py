@@ -0,0 +1,178 @@
+"""
+Tracker Module - Spatial-hash tracking of live detections
+Matches each incoming observation to the nearest live track within a radius,
+so GPS jitter does not turn one person into a stream of "new" detections.
+Tracks live in a grid of radius-sized cells (a match only looks at the 3x3
+cells around the observation) and expire through a deadline heap instead
+of a scan over every track.
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+METERS_PER_DEGREE = 111320.0
+
+
+class Track:
+    __slots__ = ('track_id', 'lat', 'lon', 'cell', 'first_seen', 'last_seen',
+                 'count', 'data', 'stored')
+
+    def __init__(self, track_id, lat, lon, cell, now, data):
+        self.track_id = track_id
+        self.lat = lat
+        self.lon = lon
+        self.cell = cell
+        self.first_seen = now
+        self.last_seen = now
+        self.count = 1
+        self.data = data
+        self.stored = False
+
+    @property
+    def duration(self):
+        return self.last_seen - self.first_seen
+
+
+class SpatialHashTracker:
+    def __init__(self, radius_m=3.0, max_age=10.0, smoothing=0.3):
+        """
+        Initialize the tracker
+        
+        Args:
+            radius_m (float): Max distance (meters) between an observation
+                and the track it continues; also the grid cell size
+            max_age (float): Seconds without an observation before a track expires
+            smoothing (float): Weight of a new observation in the track's
+                position (lower = steadier under jitter, slower to follow)
+        """
+        self.radius_m = radius_m
+        self.max_age = max_age
+        self.smoothing = smoothing
+        self.tracks = {}  # track_id -> Track
+        self.grid = {}  # (cx, cy) -> set of track_ids
+        self.deadlines = []  # heap of (expires_at, track_id), one entry per track
+        self.lag = 0.0  # Arrival time minus observation time of the latest timed observe()
+        self._ids = itertools.count(1)
+
+    def _project(self, lat, lon):
+        """Local equirectangular projection to meters"""
+        y = lat * METERS_PER_DEGREE
+        x = lon * METERS_PER_DEGREE * math.cos(math.radians(lat))
+        return x, y
+
+    def _cell(self, x, y):
+        return math.floor(x / self.radius_m), math.floor(y / self.radius_m)
+
+    def _nearest(self, x, y, cell):
+        """Closest live track within radius_m of (x, y), or None"""
+        best = None
+        best_distance = self.radius_m
+        cx, cy = cell
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for track_id in self.grid.get((cx + dx, cy + dy), ()):
+                    track = self.tracks[track_id]
+                    tx, ty = self._project(track.lat, track.lon)
+                    distance = math.hypot(tx - x, ty - y)
+                    if distance <= best_distance:
+                        best, best_distance = track, distance
+        return best
+
+    def _move(self, track, lat, lon):
+        """Pull the track toward an observation and re-bucket it if its cell changed"""
+        track.lat += self.smoothing * (lat - track.lat)
+        track.lon += self.smoothing * (lon - track.lon)
+        cell = self._cell(*self._project(track.lat, track.lon))
+        if cell != track.cell:
+            members = self.grid[track.cell]
+            members.discard(track.track_id)
+            if not members:
+                del self.grid[track.cell]
+            self.grid.setdefault(cell, set()).add(track.track_id)
+            track.cell = cell
+
+    def observe(self, lat, lon, data=None, track_id=None, now=None):
+        """
+        Record an observation
+        
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            data (dict): Latest detection record, kept on the track
+            track_id (str): Id assigned upstream (e.g. by the drone's own
+                tracker); matched directly instead of by position
+            now (float): Observation time, e.g. the record's own timestamp
+                (defaults to time.time()); any clock works, since expire()
+                follows it through `lag`
+        
+        Returns:
+            tuple: (Track, is_new)
+        """
+        if now is None:
+            now = time.time()
+        else:
+            self.lag = time.time() - now
+        x, y = self._project(lat, lon)
+        cell = self._cell(x, y)
+        
+        if track_id is not None:
+            track = self.tracks.get(track_id)
+        else:
+            track = self._nearest(x, y, cell)
+        
+        if track is not None:
+            self._move(track, lat, lon)
+            track.last_seen = now
+            track.count += 1
+            track.data = data
+            return track, False
+        
+        if track_id is None:
+            track_id = f"t{next(self._ids)}"
+        track = Track(track_id, lat, lon, cell, now, data)
+        self.tracks[track_id] = track
+        self.grid.setdefault(cell, set()).add(track_id)
+        heapq.heappush(self.deadlines, (now + self.max_age, track_id))
+        return track, True
+
+    def expire(self, now=None):
+        """
+        Drop tracks not observed for max_age seconds
+        
+        Only heap entries that are due get looked at; a track that was seen
+        since its entry was pushed is re-queued at its new deadline.
+        
+        Args:
+            now (float): Current time on the observation clock (defaults to
+                time.time() shifted by `lag`, so replayed records age in
+                their own time rather than expiring at the next sweep)
+        
+        Returns:
+            list: Expired Tracks
+        """
+        now = time.time() - self.lag if now is None else now
+        expired = []
+        
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, track_id = heapq.heappop(self.deadlines)
+            track = self.tracks.get(track_id)
+            if track is None:
+                continue
+            deadline = track.last_seen + self.max_age
+            if deadline > now:
+                heapq.heappush(self.deadlines, (deadline, track_id))
+                continue
+            
+            del self.tracks[track_id]
+            members = self.grid[track.cell]
+            members.discard(track_id)
+            if not members:
+                del self.grid[track.cell]
+            expired.append(track)
+        
+        return expired
+
+    def __len__(self):
+        return len(self.tracks)
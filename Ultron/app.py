@@ -1,12 +1,10 @@
 import cv2
 import requests
 import base64
-import json
 import numpy as np
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from PIL import Image, ImageTk, ImageOps, ImageDraw
-from ultralytics import YOLO
 import math
 import datetime
 import time
@@ -14,6 +12,7 @@ import threading
 import winsound # For audio alerts (Windows)
 from roboflow import Roboflow
 import os
+from pipeline import DEFAULT_CONFIG, UltronPipeline, draw_targets, merge_config
 
 # ==========================================
 #        USER CONFIGURATION SECTION
@@ -43,17 +42,42 @@ CAMERA_VERTICAL_FOV = 45  # Vertical field of view in degrees
 # Frame dimensions (must match your actual frame size)
 FRAME_WIDTH = 640
 FRAME_HEIGHT = 360 
+FRAME_POLL_MS = 5  # GUI checks for a newer processed frame this often
 
 # 4. DETECTION TUNING
 CONFIDENCE_THRESHOLD = 0.65 
 IOU_THRESHOLD = 0.45
+INFERENCE_WORKERS = 1  # Detector threads (each loads its own model copy)
+
+# Detector backend: 'ultralytics' (PyTorch .pt) or, for GPU-less laptops,
+# 'onnxruntime' / 'openvino' running an exported .onnx on the CPU.
+# Export once with: python -c "from detectors import export_onnx; export_onnx('yolov8n.pt', int8=True)"
+# and compare backends with benchmark_detectors.py
+DETECTOR_BACKEND = 'ultralytics'
+DETECTOR_MODEL = 'yolov8n.pt'  # e.g. 'yolov8n.onnx' or 'yolov8n-int8.onnx' for the ONNX backends
+
+# Multi-object tracking (stable ids across frames, sent to the panel as track_id)
+TRACK_IOU_THRESHOLD = 0.3  # Min overlap between a detection and a track's predicted box
+TRACK_MAX_AGE = 30  # Frames a lost track stays matchable
+TRACK_MIN_HITS = 2  # Detections before a track is shown/reported
+TRACK_MAX_COAST = 15  # Frames a track is drawn on predictions alone (covers slow inference)
 
 # 5. COMMAND PANEL INTEGRATION
 ENABLE_COMMAND_PANEL = True  # Set to False to disable JSON export
-JSON_OUTPUT_PATH = "../CommandPanel/data/live_feed.json"       
+DETECTION_LOG_DIR = "../CommandPanel/data/detection_log"  # Append-only NDJSON log read by the server
+DETECTION_LOG_SEGMENT_BYTES = 8 * 1024 * 1024  # Rotate segments at 8 MB
+DETECTION_LOG_MAX_SEGMENTS = 20  # Keep the newest 20 segments (~160 MB)
+JSON_OUTPUT_PATH = "../CommandPanel/data/live_feed.json"  # Latest-record snapshot for the diagnostic scripts
+
+# Remote Command Panel (push over HTTP instead of the shared log)
+# Paste the panel URL here when it runs on another host, e.g. "http://192.168.1.20:5000"
+# or your Render backend "https://my-app.onrender.com". None = local detection log.
+PANEL_INGEST_URL = None
+PANEL_SEND_QUEUE = 256  # Records buffered while the panel is slow (oldest dropped)
+PANEL_UPDATE_INTERVAL = 0.5  # Min seconds between TRACKING records per target
 
 class DroneApp:
-    def __init__(self, root, model_name='yolov8n.pt'):
+    def __init__(self, root, model_name=DETECTOR_MODEL):
         self.root = root
         self.root.title("Ultron Drone Command Center")
         self.root.geometry("1400x900")
@@ -68,8 +92,12 @@ class DroneApp:
         
         # State
         self.is_running = False
-        self.cap = None
-        self.model = None
+        self.pipeline = None  # Capture, inference, tracking and panel export (pipeline.py)
+        self.pipeline_thread = None
+        self.detectors = []  # Loaded once, reused on reconnect
+        self.view_lock = threading.Lock()
+        self.latest_view = None  # (frame_id, frame, targets) handed over by the pipeline thread
+        self.pending_alerts = []  # New targets not yet announced in the GUI
         
         # --- Roboflow Inference SDK Config (Cloud) ---
         self.use_workflow = False # Disabled to prevent 401 Errors (Using Local YOLOv8)
@@ -88,15 +116,7 @@ class DroneApp:
         self.last_alert_time = 0
         self.alert_cooldown = 1.5 
         self.last_human_count = 0 
-        self.last_local_boxes = [] 
-        self.is_local_inferencing = False 
         self.count_smoothing = []
-        
-        # Command Panel Integration
-        self.enable_command_panel = ENABLE_COMMAND_PANEL
-        self.json_output_path = JSON_OUTPUT_PATH
-        self.detection_history = []
-        self.current_frame = None  # Store current frame for JSON export 
 
         # --- UI Setup ---
         self.setup_styles()
@@ -243,95 +263,19 @@ class DroneApp:
         self.start_frame.pack_forget()
         self.dashboard_frame.pack(fill='both', expand=True)
     
-    def send_to_command_panel(self, detection_data):
-        """
-        Send detection data to Command Panel via JSON file export.
-        
-        Args:
-            detection_data (dict): Dictionary containing:
-                - timestamp: Detection time
-                - latitude: GPS latitude
-                - longitude: GPS longitude
-                - confidence: Detection confidence (0.0-1.0)
-                - message: Alert message
-                - drone_id: Identifier for this drone
-                - image_base64: Optional base64-encoded image
-        """
-        if not self.enable_command_panel:
-            return
-        
-        try:
-            # Ensure the directory exists
-            output_dir = os.path.dirname(self.json_output_path)
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # Write JSON to file (this will be monitored by command panel)
-            with open(self.json_output_path, 'w') as f:
-                json.dump(detection_data, f, indent=2)
-            
-            # Also maintain a history (optional, for debugging)
-            self.detection_history.append(detection_data)
-            
-            # Keep only last 100 detections in memory
-            if len(self.detection_history) > 100:
-                self.detection_history.pop(0)
-                
-        except Exception as e:
-            print(f"❌ Command Panel Export Error: {e}")
-            # Don't crash the app if command panel export fails
-    
-    def send_detection_to_panel(self, message, lat, lon, confidence, frame):
-        """
-        Send detection data to Command Panel WITHOUT triggering alerts.
-        Used for continuous tracking updates.
-        
-        Args:
-            message: Status message
-            lat: Latitude
-            lon: Longitude
-            confidence: Detection confidence (0.0-1.0)
-            frame: Current video frame
-        """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Prepare detection data
-        detection_data = {
-            "timestamp": timestamp,
-            "latitude": lat if lat is not None else CAMERA_LAT,
-            "longitude": lon if lon is not None else CAMERA_LON,
-            "confidence": float(confidence),
-            "message": message,
-            "drone_id": "ULTRON-01",
-            "image_base64": None
-        }
-        
-        # Encode current frame as base64 if available
-        if frame is not None:
-            try:
-                # Resize frame for smaller file size
-                small_frame = cv2.resize(frame, (320, 180))
-                _, buffer = cv2.imencode('.jpg', small_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                detection_data["image_base64"] = base64.b64encode(buffer).decode('utf-8')
-            except Exception as e:
-                print(f"⚠️ Image encoding error: {e}")
-        
-        # Send to command panel (no alert sound, no GUI log)
-        if self.enable_command_panel:
-            self.send_to_command_panel(detection_data)
-            # Optional: Print to console (comment out if too verbose)
-            # print(f"📡 Tracking update: {message} @ ({lat:.5f}, {lon:.5f})")
-
-    def trigger_alert(self, message, lat=None, lon=None, confidence=0.0, frame=None):
+    def trigger_alert(self, message, lat=None, lon=None, confidence=0.0, frame=None, track_id=None):
         """
         Trigger an alert and optionally send to command panel.
+        Tracked targets are exported by the pipeline itself; pass `frame` only
+        for detections it does not see (e.g. cloud results).
         
         Args:
             message: Alert message
             lat: Latitude (optional, defaults to HOME_LAT)
             lon: Longitude (optional, defaults to HOME_LON)
             confidence: Detection confidence (0.0-1.0)
-            frame: Current video frame (for image export)
+            frame: Current video frame (exports a record with its snapshot)
+            track_id: Tracker id of the target (lets the panel deduplicate by target)
         """
         if time.time() - self.last_alert_time > self.alert_cooldown:
             self.last_alert_time = time.time()
@@ -343,31 +287,13 @@ class DroneApp:
             threading.Thread(target=self.play_beep, daemon=True).start()
             self.animate_alert()
             
-            # Prepare detection data for command panel
-            detection_data = {
-                "timestamp": timestamp,
-                "latitude": lat if lat is not None else CAMERA_LAT,
-                "longitude": lon if lon is not None else CAMERA_LON,
-                "confidence": float(confidence),
-                "message": message,
-                "drone_id": "ULTRON-01",
-                "image_base64": None
-            }
-            
-            # Encode current frame as base64 if available
-            if frame is not None:
-                try:
-                    # Resize frame for smaller file size
-                    small_frame = cv2.resize(frame, (320, 180))
-                    _, buffer = cv2.imencode('.jpg', small_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                    detection_data["image_base64"] = base64.b64encode(buffer).decode('utf-8')
-                except Exception as e:
-                    print(f"⚠️ Image encoding error: {e}")
-            
             # Send to command panel
-            if self.enable_command_panel:
-                self.send_to_command_panel(detection_data)
-                print(f"✅ Detection sent to Command Panel: {message} @ ({detection_data['latitude']:.5f}, {detection_data['longitude']:.5f})")
+            exporter = self.pipeline.exporter if self.pipeline else None
+            if frame is not None and exporter:
+                lat = lat if lat is not None else CAMERA_LAT
+                lon = lon if lon is not None else CAMERA_LON
+                exporter.export(message, lat, lon, confidence, exporter.encode_snapshot(frame), track_id=track_id)
+                print(f"✅ Detection sent to Command Panel: {message} @ ({lat:.5f}, {lon:.5f})")
 
     def play_beep(self):
         try: winsound.Beep(2500, 150)
@@ -403,25 +329,81 @@ class DroneApp:
         self.root.update()
         threading.Thread(target=self.connect_camera_thread, daemon=True).start()
 
+    def pipeline_config(self):
+        """The configuration section above as an UltronPipeline config"""
+        return merge_config(DEFAULT_CONFIG, {
+            'camera': {'source': self.camera_source, 'width': FRAME_WIDTH, 'height': FRAME_HEIGHT},
+            'geometry': {
+                'lat': CAMERA_LAT,
+                'lon': CAMERA_LON,
+                'height': CAMERA_HEIGHT,
+                'tilt': CAMERA_TILT_ANGLE,
+                'bearing': CAMERA_BEARING,
+                'horizontal_fov': CAMERA_HORIZONTAL_FOV,
+                'vertical_fov': CAMERA_VERTICAL_FOV
+            },
+            'detector': {
+                'backend': DETECTOR_BACKEND,
+                'model': self.model_name,
+                'conf_threshold': self.confidence_threshold,
+                'iou_threshold': self.iou_threshold,
+                'workers': INFERENCE_WORKERS
+            },
+            'tracker': {
+                'iou_threshold': TRACK_IOU_THRESHOLD,
+                'max_age': TRACK_MAX_AGE,
+                'min_hits': TRACK_MIN_HITS,
+                'max_coast': TRACK_MAX_COAST
+            },
+            'panel': {
+                'enabled': ENABLE_COMMAND_PANEL,
+                'drone_id': "ULTRON-01",
+                'ingest_url': PANEL_INGEST_URL,
+                'send_queue': PANEL_SEND_QUEUE,
+                'log_dir': DETECTION_LOG_DIR,
+                'segment_bytes': DETECTION_LOG_SEGMENT_BYTES,
+                'max_segments': DETECTION_LOG_MAX_SEGMENTS,
+                'live_feed': JSON_OUTPUT_PATH,
+                'update_interval': PANEL_UPDATE_INTERVAL
+            }
+        })
+
     def connect_camera_thread(self):
-        if not self.model:
-            try: self.model = YOLO('yolov8n.pt'); print("YOLOv8 Loaded.")
-            except: pass
-        cap = cv2.VideoCapture(self.camera_source)
-        self.root.after(0, self.on_camera_connected, cap)
-        self.cap = cap
+        # The pipeline does capture, inference, tracking, GPS and panel export
+        # on its own thread; the GUI only draws what it hands to on_pipeline_frame
+        pipeline = UltronPipeline(self.pipeline_config())
+        pipeline.add_consumer(self.on_pipeline_frame)
+        try:
+            pipeline.start(detectors=self.detectors)
+        except Exception as e:
+            print(f"⚠️ Detector load failed: {e}")
+            self.root.after(0, lambda: self.status_label.config(text="Detector Load Failed (See Console)", foreground="red"))
+            return
+        self.detectors = pipeline.detectors
+        self.root.after(0, self.on_camera_connected, pipeline.grabber)
+        
+        self.pipeline = pipeline
+        self.latest_view = None
+        self.pending_alerts = []
+        self.pipeline_thread = threading.Thread(target=pipeline.run, daemon=True)
+        self.pipeline_thread.start()
         self.is_running = True
         self.show_dashboard()
         self.update_frame()
 
-    def on_camera_connected(self, cap):
-        if not cap.isOpened():
+    def on_camera_connected(self, grabber):
+        if not grabber.is_opened():
             self.status_label.config(text="Connection Failed (Check IP/Network)", foreground="red")
             messagebox.showerror("Connection Error", f"Could not connect to:\n{self.camera_source}\n\nTips:\n1. Ensure phone and PC are on same Wi-Fi.\n2. Try disabling PC Firewall.\n3. Check if URL ends in /video or /shot.jpg")
 
     def stop_detection(self):
         self.is_running = False
-        if self.cap: self.cap.release()
+        if self.pipeline:
+            # run() releases the camera, workers and panel export on its way out;
+            # wait for it so a reconnect does not share the detectors with it
+            self.pipeline.stop()
+            self.pipeline_thread.join(timeout=3.0)
+            self.pipeline = None
         self.show_start_screen()
 
     def run_workflow_thread(self, frame):
@@ -501,74 +483,10 @@ class DroneApp:
             self.is_inferencing = False
 
 
-    def send_to_command_panel(self, detection_data):
-        """
-        Send detection data to Command Panel (Local JSON or Cloud HTTP).
-        """
-        # ---------------------------------------------------------
-        # ☁️ CLOUD DEPLOYMENT CONFIGURATION
-        # Paste your Render Backend URL here to send data to the cloud!
-        # Example: "https://my-app.onrender.com/api/detections/live"
-        # ---------------------------------------------------------
-        CLOUD_BACKEND_URL = None 
-        
-        try:
-            if CLOUD_BACKEND_URL:
-                # Send to Cloud
-                import requests
-                # Add /api/detections/live if missing (common mistake)
-                if not CLOUD_BACKEND_URL.endswith('/api/detections/live'):
-                   # Handle potential / at end of base url
-                   base = CLOUD_BACKEND_URL.rstrip('/')
-                   CLOUD_BACKEND_URL = f"{base}/api/detections/live"
-
-                requests.post(CLOUD_BACKEND_URL, json=detection_data)
-                # print(f"☁️ Sent to Cloud: {data['message']}") # Uncomment to debug
-            else:
-                # Local Mode (JSON File)
-                os.makedirs(os.path.dirname(self.json_output_path), exist_ok=True)
-                with open(self.json_output_path, 'w') as f:
-                    json.dump(detection_data, f, indent=4)
-                
-        except Exception as e:
-            print(f"❌ Error sending data to Command Panel: {e}")
-
-    def send_detection_to_panel(self, message, lat, lon, confidence, frame):
-        """
-        Helper to construct data and send to command panel (for continuous updates).
-        """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        detection_data = {
-            "timestamp": timestamp,
-            "latitude": lat,
-            "longitude": lon,
-            "confidence": float(confidence),
-            "message": message,
-            "drone_id": "ULTRON-01",
-            "image_base64": None
-        }
-
-        # Encode frame if available
-        if frame is not None:
-            try:
-                small_frame = cv2.resize(frame, (320, 180))
-                _, buffer = cv2.imencode('.jpg', small_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                detection_data["image_base64"] = base64.b64encode(buffer).decode('utf-8')
-            except Exception as e:
-                print(f"⚠️ Image encoding error: {e}")
-
-        # Send to panel
-        if self.enable_command_panel:
-            self.send_to_command_panel(detection_data)
-
-
     def calculate_gps(self, x, y):
         """
-        Calculate accurate GPS coordinates from pixel position using camera geometry.
-        
-        This uses trigonometry to project the pixel position onto the ground plane,
-        then converts the distance and bearing to GPS coordinates.
+        Calculate accurate GPS coordinates from pixel position using camera geometry
+        (the pipeline's geolocation.CameraGeometry).
         
         Args:
             x: Pixel x-coordinate (0 to FRAME_WIDTH)
@@ -577,62 +495,7 @@ class DroneApp:
         Returns:
             (latitude, longitude) tuple
         """
-        # Convert pixel coordinates to normalized coordinates (-1 to 1)
-        # Center of frame is (0, 0)
-        norm_x = (x - FRAME_WIDTH / 2) / (FRAME_WIDTH / 2)
-        norm_y = (y - FRAME_HEIGHT / 2) / (FRAME_HEIGHT / 2)
-        
-        # Calculate angles from camera center
-        # Horizontal angle (left-right)
-        horizontal_angle = norm_x * (CAMERA_HORIZONTAL_FOV / 2)
-        
-        # Vertical angle (up-down), accounting for camera tilt
-        vertical_angle_from_center = norm_y * (CAMERA_VERTICAL_FOV / 2)
-        total_vertical_angle = CAMERA_TILT_ANGLE + vertical_angle_from_center
-        
-        # Calculate ground distance using trigonometry
-        # For a tilted camera looking at the ground:
-        # distance = height / tan(angle_from_horizontal)
-        angle_from_horizontal = 90 - total_vertical_angle
-        
-        # Prevent division by zero and handle edge cases
-        if angle_from_horizontal <= 0 or angle_from_horizontal >= 90:
-            # Point is above horizon or straight down
-            ground_distance = CAMERA_HEIGHT * 10  # Fallback to reasonable distance
-        else:
-            ground_distance = CAMERA_HEIGHT / math.tan(math.radians(angle_from_horizontal))
-        
-        # Adjust for horizontal angle to get actual distance in that direction
-        distance_in_direction = ground_distance / math.cos(math.radians(horizontal_angle))
-        
-        # Calculate bearing (direction from camera)
-        # Combine camera bearing with horizontal angle
-        target_bearing = (CAMERA_BEARING + horizontal_angle) % 360
-        
-        # Convert distance and bearing to GPS offset
-        # Earth's radius in meters
-        EARTH_RADIUS = 6371000
-        
-        # Convert bearing to radians
-        bearing_rad = math.radians(target_bearing)
-        
-        # Calculate latitude offset
-        # Moving north increases latitude
-        lat_offset = (distance_in_direction * math.cos(bearing_rad)) / EARTH_RADIUS
-        lat_offset_degrees = math.degrees(lat_offset)
-        
-        # Calculate longitude offset
-        # Moving east increases longitude, but this depends on latitude
-        # At the equator, 1 degree longitude = 111km
-        # At other latitudes: distance = 111km * cos(latitude)
-        lon_offset = (distance_in_direction * math.sin(bearing_rad)) / (EARTH_RADIUS * math.cos(math.radians(CAMERA_LAT)))
-        lon_offset_degrees = math.degrees(lon_offset)
-        
-        # Calculate final GPS coordinates
-        target_lat = CAMERA_LAT + lat_offset_degrees
-        target_lon = CAMERA_LON + lon_offset_degrees
-        
-        return target_lat, target_lon
+        return self.pipeline.geometry.pixel_to_gps(x, y)
 
     def update_radar_blip(self, x1, y1, x2, y2):
         cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
@@ -653,15 +516,29 @@ class DroneApp:
                 self.gps_label.config(text=f"LOC: {lat:.4f}, {lon:.4f}")
                 self.trigger_alert(f"{det.get('class', 'Person')} DETECTED", lat=lat, lon=lon, confidence=confidence, frame=frame)
 
+    def on_pipeline_frame(self, frame_id, frame, targets):
+        """Pipeline consumer (runs on the pipeline thread): hand the frame to the Tk loop"""
+        with self.view_lock:
+            # Copy: the capture/inference threads still share the original
+            self.latest_view = (frame_id, frame.copy(), targets)
+            self.pending_alerts.extend(target for target in targets if target['new'])
+
     def update_frame(self):
         if not self.is_running: return
-        ret, frame = self.cap.read()
-        if not ret:
-            self.handle_no_signal()
-            self.root.after(100, self.update_frame)
+        # Newest frame the pipeline processed (already tracked, geolocated and
+        # exported); frames that arrived while the GUI was busy were skipped
+        with self.view_lock:
+            view, self.latest_view = self.latest_view, None
+            new_targets, self.pending_alerts = self.pending_alerts, []
+        if view is None:
+            if not self.pipeline.grabber.is_opened():
+                self.handle_no_signal()
+                self.root.after(100, self.update_frame)
+            else:
+                self.root.after(FRAME_POLL_MS, self.update_frame)
             return
+        frame_id, frame, targets = view
 
-        frame = cv2.resize(frame, (640, 360))
         self.radar_canvas.delete("blip")
         
         valid_cloud = False
@@ -678,71 +555,30 @@ class DroneApp:
                     self.draw_cloud_results(frame)
 
         if not valid_cloud:
-            if not self.is_local_inferencing and self.frame_count % 3 == 0:
-                threading.Thread(target=self.run_local_inference_thread, args=(frame.copy(),), daemon=True).start()
-            
-            count = len(self.last_local_boxes)
-            for det in self.last_local_boxes:
+            count = len(targets)
+            draw_targets(frame, targets)
+            for det in targets:
                 x1, y1, x2, y2 = det['coords']
-                lat, lon = self.calculate_gps((x1+x2)/2, (y1+y2)/2)
-                color = (0, 255, 0)
-                cv2.line(frame, (x1, y1), (x1+20, y1), color, 2)
-                cv2.line(frame, (x1, y1), (x1, y1+20), color, 2)
-                cv2.line(frame, (x2, y1), (x2-20, y1), color, 2)
-                cv2.line(frame, (x2, y1), (x2, y1+20), color, 2)
-                cv2.line(frame, (x1, y2), (x1+20, y2), color, 2)
-                cv2.line(frame, (x1, y2), (x1, y2-20), color, 2)
-                cv2.line(frame, (x2, y2), (x2-20, y2), color, 2)
-                cv2.line(frame, (x2, y2), (x2, y2-20), color, 2)
-                
-                overlay = frame.copy()
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), color, -1)
-                cv2.addWeighted(overlay, 0.15, frame, 0.85, 0, frame)
-                cv2.putText(frame, f"THREAT LOC: {lat:.5f}, {lon:.5f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,0,255), 2)
+                lat, lon = det['lat'], det['lon']
                 self.update_radar_blip(x1, y1, x2, y2)
                 self.gps_label.config(text=f"LOC: {lat:.4f}, {lon:.4f}")
 
-        # Store annotated frame for JSON export (AFTER detection boxes are drawn)
-        self.current_frame = frame.copy()
-
         # Smoothing
         self.count_smoothing.append(count)
         if len(self.count_smoothing) > 5: self.count_smoothing.pop(0)
         stable_count = max(self.count_smoothing) if self.count_smoothing else 0
         self.count_label.config(text=f"HUMANS: {stable_count}")
         
-        # DYNAMIC JSON EXPORT: Update JSON continuously when detections are present
-        if stable_count > 0 and self.last_local_boxes:
-            # Get GPS from first detection
-            det = self.last_local_boxes[0]
-            x1, y1, x2, y2 = det['coords']
-            lat, lon = self.calculate_gps((x1+x2)/2, (y1+y2)/2)
-            confidence = det.get('conf', 0.0)
-            
-            # Determine message type
-            if stable_count > self.last_human_count:
-                message = f"NEW TARGET: {stable_count} TOTAL"
-                # Play alert sound only for NEW detections
-                self.trigger_alert(message, lat=lat, lon=lon, confidence=confidence, frame=self.current_frame)
-            else:
-                # Continuous update (no alert sound, just JSON update)
-                message = f"TRACKING: {stable_count} HUMAN{'S' if stable_count > 1 else ''}"
-                self.send_detection_to_panel(message, lat, lon, confidence, self.current_frame)
+        # Alert sound/log for NEW tracks (the pipeline already sent their records)
+        for det in new_targets:
+            self.trigger_alert(f"NEW TARGET #{det['track_id']}: {stable_count} TOTAL",
+                               lat=det['lat'], lon=det['lon'], confidence=det['conf'])
         
         self.last_human_count = stable_count
         self.frame_count += 1
         
         self.show_frame_in_gui(frame)
-        self.root.after(15, self.update_frame)
-
-    def run_local_inference_thread(self, frame):
-        try:
-            self.is_local_inferencing = True
-            res = self.model.predict(frame, verbose=False, conf=self.confidence_threshold, classes=[0])
-            if res:
-                self.last_local_boxes = [{'coords': list(map(int, b.xyxy[0])), 'conf': float(b.conf[0])} for b in res[0].boxes]
-        except: pass
-        finally: self.is_local_inferencing = False
+        self.root.after(FRAME_POLL_MS, self.update_frame)
 
     def show_frame_in_gui(self, frame):
         try:
@@ -0,0 +1,109 @@
+"""
+Benchmark the person-detector backends on this machine's CPU
+
+    python benchmark_detectors.py --source 0 --frames 100
+    python benchmark_detectors.py --source clip.mp4 --export --int8
+
+Runs the same frames through every backend that can be loaded and prints
+frames per second, latency and how many people each one found.
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from detectors import create_detector, export_onnx, quantize_onnx
+
+
+def load_frames(source, count, width=640, height=360):
+    """Read `count` frames from a camera/file, or make noise frames if there is no source"""
+    if source is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height)))
+    cap.release()
+    if not frames:
+        raise SystemExit(f"❌ No frames from {source}")
+    return frames
+
+
+def benchmark(detector, frames, warmup=5):
+    """
+    Time a detector over `frames`
+
+    Returns:
+        dict: fps, mean/p95 latency in ms, mean detections per frame
+    """
+    for frame in frames[:warmup]:
+        detector(frame)
+
+    latencies = []
+    found = 0
+    for frame in frames:
+        started = time.perf_counter()
+        found += len(detector(frame))
+        latencies.append(time.perf_counter() - started)
+
+    latencies = np.array(latencies)
+    return {
+        'fps': len(frames) / latencies.sum(),
+        'mean_ms': latencies.mean() * 1000,
+        'p95_ms': np.percentile(latencies, 95) * 1000,
+        'detections': found / len(frames)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare detector backends (frames per second on CPU)')
+    parser.add_argument('--source', help='Camera index or video file (default: synthetic frames)')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--model', default='yolov8n.pt', help='PyTorch weights')
+    parser.add_argument('--onnx', help='ONNX model (default: yolov8n.onnx next to the weights)')
+    parser.add_argument('--int8-onnx', help='INT8-quantized ONNX model to include')
+    parser.add_argument('--export', action='store_true', help='Export the ONNX model(s) first')
+    parser.add_argument('--int8', action='store_true', help='With --export, also quantize to INT8')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--threads', type=int, help='ONNX Runtime intra-op threads')
+    parser.add_argument('--conf', type=float, default=0.65)
+    args = parser.parse_args()
+
+    onnx_path = args.onnx or args.model.rsplit('.', 1)[0] + '.onnx'
+    int8_path = args.int8_onnx
+    if args.export:
+        onnx_path = export_onnx(args.model, imgsz=args.imgsz)
+        if args.int8:
+            int8_path = quantize_onnx(onnx_path)
+
+    candidates = [
+        ('ultralytics', 'ultralytics', args.model, {}),
+        ('onnxruntime', 'onnxruntime', onnx_path, {'imgsz': args.imgsz, 'threads': args.threads}),
+        ('openvino', 'openvino', onnx_path, {'imgsz': args.imgsz})
+    ]
+    if int8_path:
+        candidates.append(('onnxruntime-int8', 'onnxruntime', int8_path, {'imgsz': args.imgsz, 'threads': args.threads}))
+
+    frames = load_frames(args.source, args.frames)
+    print(f"📊 {len(frames)} frames, input {args.imgsz}px\n")
+    print(f"{'backend':<18}{'fps':>8}{'mean ms':>10}{'p95 ms':>10}{'people/frame':>14}")
+
+    for label, backend, model_path, options in candidates:
+        try:
+            detector = create_detector(backend, model_path, conf_threshold=args.conf, **options)
+        except Exception as e:
+            print(f"{label:<18}  skipped ({e})")
+            continue
+        result = benchmark(detector, frames)
+        print(f"{label:<18}{result['fps']:>8.1f}{result['mean_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['detections']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Capture - Camera reading on its own thread
+A FrameGrabber drains the capture device as fast as it delivers frames and
+resizes each one straight into a preallocated ring buffer, so consumers (GUI,
+inference) always get the newest frame instead of whatever the decoder has
+queued up. Frames nobody picked up in time are simply overwritten.
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameGrabber:
+    def __init__(self, source, width=640, height=360, slots=3, reconnect_delay=1.0):
+        """
+        Open the source and start the capture thread
+
+        Args:
+            source (int|str): Camera index or stream URL (anything cv2.VideoCapture takes)
+            width (int): Frame width handed to consumers
+            height (int): Frame height handed to consumers
+            slots (int): Ring buffer depth
+            reconnect_delay (float): Pause before reopening a stream that stopped delivering
+        """
+        self.source = source
+        self.width = width
+        self.height = height
+        self.reconnect_delay = reconnect_delay
+
+        self.buffer = np.zeros((slots, height, width, 3), dtype=np.uint8)
+        self.slot = -1  # Ring slot holding the newest frame
+        self.frame_id = 0  # Id of the newest frame (0 = none yet)
+        self.last_read_id = 0
+        self.cond = threading.Condition()
+
+        self.grabbed = 0
+        self.dropped = 0  # Frames overwritten before any consumer read them
+        self.connected = False
+        self.is_running = True
+
+        self.cap = self._open()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        # Keep the backend's own queue short where it honors this (V4L2, DirectShow, some FFmpeg)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.connected = cap.isOpened()
+        return cap
+
+    def _run(self):
+        raw = None
+        while self.is_running:
+            ret, raw = self.cap.read(raw)  # Reuses the decode buffer while the size holds
+            if not ret:
+                self.connected = False
+                time.sleep(self.reconnect_delay)
+                if not self.is_running:
+                    break
+                if isinstance(self.source, str):
+                    self.cap.release()
+                    self.cap = self._open()
+                raw = None
+                continue
+
+            self.connected = True
+            slot = (self.slot + 1) % len(self.buffer)
+            cv2.resize(raw, (self.width, self.height), dst=self.buffer[slot])
+
+            with self.cond:
+                if self.frame_id != self.last_read_id:
+                    self.dropped += 1
+                self.slot = slot
+                self.frame_id += 1
+                self.grabbed += 1
+                self.cond.notify_all()
+
+        self.cap.release()
+
+    def read(self, after_id=None, timeout=None):
+        """
+        Copy of the newest frame
+
+        Args:
+            after_id (int): Only return a frame newer than this id; waits up to
+                `timeout` for one
+            timeout (float): Seconds to wait when `after_id` is given
+
+        Returns:
+            tuple: (frame_id, frame), or (None, None) if no (new) frame is available
+        """
+        with self.cond:
+            if after_id is not None:
+                self.cond.wait_for(lambda: self.frame_id > after_id or not self.is_running, timeout)
+                if self.frame_id <= after_id:
+                    return None, None
+            if self.frame_id == 0:
+                return None, None
+
+            self.last_read_id = self.frame_id
+            return self.frame_id, self.buffer[self.slot].copy()
+
+    def is_opened(self):
+        return self.connected
+
+    def stop(self, timeout=2.0):
+        """Stop the capture thread and release the device"""
+        self.is_running = False
+        with self.cond:
+            self.cond.notify_all()
+        self._thread.join(timeout)
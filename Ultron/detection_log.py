@@ -0,0 +1,88 @@
+"""
+Detection Log Writer - Append-only NDJSON handoff to the Command Panel
+Every detection becomes one line in a rotating set of segment files, so the
+panel can replay all of them instead of only seeing the latest overwrite.
+"""
+
+import json
+import os
+import re
+
+SEGMENT_PATTERN = re.compile(r'^segment-(\d{8})\.ndjson$')
+
+
+def segment_name(index):
+    """File name for segment number `index`"""
+    return f"segment-{index:08d}.ndjson"
+
+
+def list_segments(directory):
+    """Return sorted segment indexes present in `directory`"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(SEGMENT_PATTERN.match, names) if m)
+
+
+class DetectionLogWriter:
+    def __init__(self, directory, segment_bytes=8 * 1024 * 1024, max_segments=20):
+        """
+        Open (or resume) a segmented detection log
+
+        Args:
+            directory (str): Directory holding the segment files
+            segment_bytes (int): Rotate to a new segment past this size
+            max_segments (int): Oldest segments beyond this count are deleted
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+
+        segments = list_segments(directory)
+        self.segment_index = segments[-1] if segments else 1
+        self._file = None
+        self._size = 0
+        self._open_segment()
+
+    def _open_segment(self):
+        path = os.path.join(self.directory, segment_name(self.segment_index))
+        self._file = open(path, 'ab')
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        """Close the current segment, start the next one and apply retention"""
+        self._file.close()
+        self.segment_index += 1
+        self._open_segment()
+
+        segments = list_segments(self.directory)
+        for index in segments[:-self.max_segments]:
+            try:
+                os.remove(os.path.join(self.directory, segment_name(index)))
+            except OSError:
+                pass
+
+    def append(self, record):
+        """
+        Append one detection record as a single NDJSON line
+
+        Args:
+            record (dict): Detection data
+        """
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+        if self._size > 0 and self._size + len(line) > self.segment_bytes:
+            self._rotate()
+
+        # One write per record so readers only ever see whole lines or a tail
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
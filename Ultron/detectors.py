@@ -0,0 +1,334 @@
+"""
+Detectors - Pluggable person-detector backends
+Every backend is a callable frame -> [{'coords': [x1, y1, x2, y2], 'conf': float}]
+(the box format DroneApp and the tracker consume):
+
+  - ultralytics: the YOLOv8 .pt model through ultralytics/PyTorch
+  - onnxruntime: an exported .onnx model on the ONNX Runtime CPU provider
+  - openvino:    the same .onnx (or an OpenVINO .xml) on the OpenVINO CPU plugin
+
+The ONNX backends do their own letterbox preprocessing and NMS in NumPy, so
+they need neither torch nor ultralytics at runtime. export_onnx() produces
+the model (optionally INT8 weight-quantized for ONNX Runtime).
+detect_batch() runs several frames in one call where the backend can.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+try:
+    from ultralytics import YOLO
+except ImportError:  # Not needed for the ONNX backends
+    YOLO = None
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+try:
+    import openvino
+except ImportError:
+    openvino = None
+
+PERSON_CLASS_ID = 0
+
+
+def letterbox(frame, size=640, pad_value=114):
+    """
+    Resize keeping the aspect ratio, pad to size x size, and lay out as a model input
+
+    Args:
+        frame (np.ndarray): BGR image (H x W x 3, uint8)
+        size (int): Model input size
+        pad_value (int): Padding gray level (what YOLOv8 was trained with)
+
+    Returns:
+        tuple: (input 1 x 3 x size x size float32 RGB in [0, 1], scale, (pad_x, pad_y))
+    """
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), pad_value, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1)[None]  # BGR HWC -> RGB NCHW
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0, scale, (pad_x, pad_y)
+
+
+def nms(boxes, scores, iou_threshold):
+    """
+    Greedy non-maximum suppression
+
+    Args:
+        boxes (np.ndarray): N x 4 [x1, y1, x2, y2]
+        scores (np.ndarray): N scores
+        iou_threshold (float): Boxes overlapping a kept box more than this are dropped
+
+    Returns:
+        np.ndarray: Indexes of kept boxes, best first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / np.maximum(areas[best] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+def decode_yolov8(output, frame_shape, scale, pad, conf_threshold, iou_threshold, class_id=PERSON_CLASS_ID):
+    """
+    Turn raw YOLOv8 output into person boxes in frame pixels
+
+    Args:
+        output (np.ndarray): 1 x (4 + classes) x anchors (or anchors-first)
+        frame_shape (tuple): Original frame shape
+        scale (float): Letterbox scale
+        pad (tuple): Letterbox (pad_x, pad_y)
+        conf_threshold (float): Minimum class score
+        iou_threshold (float): NMS IoU threshold
+        class_id (int): Class to keep
+
+    Returns:
+        list: [{'coords': [x1, y1, x2, y2], 'conf': float}]
+    """
+    predictions = output[0]
+    if predictions.shape[0] > predictions.shape[1]:
+        predictions = predictions.T  # anchors x channels -> channels x anchors
+    scores = predictions[4 + class_id]
+    mask = scores >= conf_threshold
+    if not mask.any():
+        return []
+
+    cx, cy, w, h = predictions[:4, mask]
+    scores = scores[mask]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / scale
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / scale
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, frame_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, frame_shape[0])
+
+    return [
+        {'coords': [int(v) for v in boxes[i]], 'conf': float(scores[i])}
+        for i in nms(boxes, scores, iou_threshold)
+    ]
+
+
+class UltralyticsDetector:
+    name = 'ultralytics'
+
+    def __init__(self, model_path='yolov8n.pt', conf_threshold=0.65, iou_threshold=0.45):
+        """
+        YOLOv8 through ultralytics (PyTorch eager mode)
+
+        Args:
+            model_path (str): .pt weights
+            conf_threshold (float): Minimum person confidence
+            iou_threshold (float): NMS IoU threshold
+        """
+        if YOLO is None:
+            raise RuntimeError('ultralytics is not installed (pip install ultralytics)')
+        self.model = YOLO(model_path)
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+    def __call__(self, frame):
+        res = self.model.predict(frame, verbose=False, conf=self.conf_threshold,
+                                 iou=self.iou_threshold, classes=[PERSON_CLASS_ID])
+        if not res:
+            return []
+        return self._boxes(res[0])
+
+    def detect_batch(self, frames):
+        """One predict() over a list of frames -> one box list per frame"""
+        res = self.model.predict(list(frames), verbose=False, conf=self.conf_threshold,
+                                 iou=self.iou_threshold, classes=[PERSON_CLASS_ID])
+        return [self._boxes(r) for r in res]
+
+    @staticmethod
+    def _boxes(result):
+        return [{'coords': list(map(int, b.xyxy[0])), 'conf': float(b.conf[0])} for b in result.boxes]
+
+
+class OnnxRuntimeDetector:
+    name = 'onnxruntime'
+
+    def __init__(self, model_path, conf_threshold=0.65, iou_threshold=0.45, imgsz=640, threads=None):
+        """
+        Exported YOLOv8 on ONNX Runtime's CPU provider
+
+        Args:
+            model_path (str): .onnx model (FP32 or INT8)
+            conf_threshold (float): Minimum person confidence
+            iou_threshold (float): NMS IoU threshold
+            imgsz (int): Input size the model was exported with
+            threads (int): Intra-op threads (None = ONNX Runtime default)
+        """
+        if onnxruntime is None:
+            raise RuntimeError('onnxruntime is not installed (pip install onnxruntime)')
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Exported batch size: 1, a fixed N (export_onnx(batch=N)) or None when dynamic
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.imgsz = imgsz
+
+    def __call__(self, frame):
+        blob, scale, pad = letterbox(frame, self.imgsz)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return decode_yolov8(output, frame.shape, scale, pad, self.conf_threshold, self.iou_threshold)
+
+    def detect_batch(self, frames):
+        """
+        Run frames in batches of the exported batch size -> one box list per frame
+
+        A batch-1 model falls back to one run per frame; a fixed-size batch is
+        padded with blank inputs.
+        """
+        if self.batch_size == 1:
+            return [self(frame) for frame in frames]
+
+        prepared = [letterbox(frame, self.imgsz) for frame in frames]
+        step = self.batch_size or len(prepared)
+        results = []
+        for start in range(0, len(prepared), step):
+            chunk = prepared[start:start + step]
+            blobs = [blob for blob, _, _ in chunk]
+            blobs += [np.zeros_like(blobs[0])] * (step - len(chunk))
+            outputs = self.session.run(None, {self.input_name: np.concatenate(blobs)})[0]
+            for i, (_, scale, pad) in enumerate(chunk):
+                frame = frames[start + i]
+                results.append(decode_yolov8(outputs[i:i + 1], frame.shape, scale, pad,
+                                             self.conf_threshold, self.iou_threshold))
+        return results
+
+
+class OpenVinoDetector:
+    name = 'openvino'
+
+    def __init__(self, model_path, conf_threshold=0.65, iou_threshold=0.45, imgsz=640, device='CPU'):
+        """
+        Exported YOLOv8 on OpenVINO
+
+        Args:
+            model_path (str): .onnx or OpenVINO IR (.xml) model
+            conf_threshold (float): Minimum person confidence
+            iou_threshold (float): NMS IoU threshold
+            imgsz (int): Input size the model was exported with
+            device (str): OpenVINO device ('CPU', 'GPU' for Intel iGPU, ...)
+        """
+        if openvino is None:
+            raise RuntimeError('openvino is not installed (pip install openvino)')
+        core = openvino.Core()
+        self.model = core.compile_model(model_path, device, {'PERFORMANCE_HINT': 'LATENCY'})
+        self.request = self.model.create_infer_request()
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.imgsz = imgsz
+
+    def __call__(self, frame):
+        blob, scale, pad = letterbox(frame, self.imgsz)
+        output = self.request.infer({0: blob})[self.model.output(0)]
+        return decode_yolov8(output, frame.shape, scale, pad, self.conf_threshold, self.iou_threshold)
+
+
+BACKENDS = {
+    'ultralytics': UltralyticsDetector,
+    'onnxruntime': OnnxRuntimeDetector,
+    'openvino': OpenVinoDetector
+}
+
+
+def detect_batch(detector, frames):
+    """
+    Run a list of frames through a detector
+
+    Uses the backend's batched path when it has one, otherwise one call per frame.
+
+    Returns:
+        list: One box list per frame
+    """
+    if hasattr(detector, 'detect_batch'):
+        return detector.detect_batch(frames)
+    return [detector(frame) for frame in frames]
+
+
+def create_detector(backend, model_path, **options):
+    """
+    Build a detector by backend name
+
+    Args:
+        backend (str): 'ultralytics', 'onnxruntime' or 'openvino'
+        model_path (str): Model file for that backend
+        **options: conf_threshold, iou_threshold and backend-specific options
+
+    Returns:
+        callable: frame -> person boxes
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[backend](model_path, **options)
+
+
+def export_onnx(model_path='yolov8n.pt', imgsz=640, int8=False, batch=1):
+    """
+    Export YOLOv8 weights to ONNX (needs ultralytics; run once, not in the field loop)
+
+    Args:
+        model_path (str): .pt weights
+        imgsz (int): Fixed input size to export with
+        int8 (bool): Also write an INT8 weight-quantized copy (ONNX Runtime
+            dynamic quantization; meant for the onnxruntime backend)
+        batch (int): Fixed batch size of the model input (for batched
+            multi-camera inference; 1 for a single feed)
+
+    Returns:
+        str: Path of the exported (or quantized) .onnx model
+    """
+    if YOLO is None:
+        raise RuntimeError('ultralytics is required to export (pip install ultralytics)')
+    onnx_path = YOLO(model_path).export(format='onnx', imgsz=imgsz, opset=12, dynamic=False, simplify=True, batch=batch)
+    print(f"✅ Exported {onnx_path}")
+    if not int8:
+        return onnx_path
+
+    return quantize_onnx(onnx_path)
+
+
+def quantize_onnx(onnx_path):
+    """
+    Write an INT8 weight-quantized copy of an ONNX model (dynamic quantization)
+
+    Args:
+        onnx_path (str): FP32 .onnx model
+
+    Returns:
+        str: Path of the quantized model (`<name>-int8.onnx`)
+    """
+    if onnxruntime is None:
+        raise RuntimeError('onnxruntime is required to quantize (pip install onnxruntime)')
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = os.path.splitext(onnx_path)[0] + '-int8.onnx'
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    print(f"✅ Quantized {int8_path}")
+    return int8_path
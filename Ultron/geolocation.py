@@ -0,0 +1,76 @@
+"""
+Geolocation - Project a pixel in the camera frame onto GPS coordinates
+Uses the camera's position, mounting height, tilt, bearing and field of view
+to intersect the pixel's viewing ray with flat ground.
+"""
+
+import math
+
+EARTH_RADIUS = 6371000  # meters
+
+
+class CameraGeometry:
+    def __init__(self, lat, lon, height=2.5, tilt=15, bearing=0, horizontal_fov=60,
+                 vertical_fov=45, frame_width=640, frame_height=360):
+        """
+        Camera placement
+
+        Args:
+            lat (float): Camera latitude
+            lon (float): Camera longitude
+            height (float): Height above ground in meters
+            tilt (float): Downward tilt in degrees (0=horizontal, 90=straight down)
+            bearing (float): Direction the camera faces (0=North, 90=East, ...)
+            horizontal_fov (float): Horizontal field of view in degrees
+            vertical_fov (float): Vertical field of view in degrees
+            frame_width (int): Width of the frames pixel positions refer to
+            frame_height (int): Height of the frames pixel positions refer to
+        """
+        self.lat = lat
+        self.lon = lon
+        self.height = height
+        self.tilt = tilt
+        self.bearing = bearing
+        self.horizontal_fov = horizontal_fov
+        self.vertical_fov = vertical_fov
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+
+    def pixel_to_gps(self, x, y):
+        """
+        GPS position of the ground point seen at a pixel
+
+        Args:
+            x: Pixel x-coordinate (0 to frame_width)
+            y: Pixel y-coordinate (0 to frame_height)
+
+        Returns:
+            (latitude, longitude) tuple
+        """
+        # Normalized coordinates (-1 to 1), center of frame is (0, 0)
+        norm_x = (x - self.frame_width / 2) / (self.frame_width / 2)
+        norm_y = (y - self.frame_height / 2) / (self.frame_height / 2)
+
+        # Angles from the camera axis, vertical one accounting for the tilt
+        horizontal_angle = norm_x * (self.horizontal_fov / 2)
+        total_vertical_angle = self.tilt + norm_y * (self.vertical_fov / 2)
+
+        # Ground distance: height / tan(angle_from_horizontal)
+        angle_from_horizontal = 90 - total_vertical_angle
+        if angle_from_horizontal <= 0 or angle_from_horizontal >= 90:
+            # Point is above horizon or straight down
+            ground_distance = self.height * 10  # Fallback to reasonable distance
+        else:
+            ground_distance = self.height / math.tan(math.radians(angle_from_horizontal))
+
+        # Distance along the pixel's direction and the bearing of that direction
+        distance_in_direction = ground_distance / math.cos(math.radians(horizontal_angle))
+        bearing_rad = math.radians((self.bearing + horizontal_angle) % 360)
+
+        # Offsets in degrees (a degree of longitude shrinks with latitude)
+        lat_offset = math.degrees((distance_in_direction * math.cos(bearing_rad)) / EARTH_RADIUS)
+        lon_offset = math.degrees(
+            (distance_in_direction * math.sin(bearing_rad)) / (EARTH_RADIUS * math.cos(math.radians(self.lat)))
+        )
+
+        return self.lat + lat_offset, self.lon + lon_offset
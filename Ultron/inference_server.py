@@ -0,0 +1,222 @@
+"""
+Inference Server - One detector shared by several camera feeds
+Each source contributes only its newest frame; a single batching thread
+gathers pending frames into a micro-batch (when `max_batch` sources are
+waiting or the oldest has waited `max_delay`), runs one batched predict and
+routes every result back to its source, tagged with the frame id.
+
+    python inference_server.py --source 0 --source http://10.0.0.5:8080/video \\
+        --backend onnxruntime --model yolov8n.onnx
+
+For batched ONNX inference export the model with a matching batch size,
+e.g. export_onnx('yolov8n.pt', batch=8); a batch-1 model runs the frames
+of a batch one after another.
+"""
+
+import argparse
+import threading
+import time
+
+from capture import FrameGrabber
+from detectors import create_detector, detect_batch
+
+
+class BatchInferenceService:
+    def __init__(self, detector, max_batch=8, max_delay=0.02, on_result=None):
+        """
+        Start the batching thread
+
+        Args:
+            detector (callable): Detector from detectors.create_detector
+            max_batch (int): Frames per batched predict
+            max_delay (float): Max seconds the oldest pending frame waits for a fuller batch
+            on_result (callable): Optional on_result(source_id, frame_id, detections),
+                called on the batching thread
+        """
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.on_result = on_result
+
+        self.cond = threading.Condition()
+        self.pending = {}  # source_id -> (frame_id, frame, submitted_at), newest frame only
+        self.results = {}  # source_id -> (frame_id, detections)
+        self.sources = {}  # source_id -> feeder thread
+
+        self.batches = 0
+        self.frames = 0
+        self.replaced = 0  # Frames superseded by a newer one from the same source before batching
+        self.errors = 0
+        self.is_running = True
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, source_id, frame_id, frame):
+        """
+        Offer a source's newest frame (never blocks)
+
+        Args:
+            source_id (str): Feed name
+            frame_id (int): Increasing per source
+            frame (np.ndarray): Frame; must not be modified by the caller afterwards
+        """
+        with self.cond:
+            previous = self.pending.get(source_id)
+            if previous is not None:
+                self.replaced += 1
+                submitted_at = previous[2]  # Keep its place in the queue
+            else:
+                submitted_at = time.monotonic()
+            self.pending[source_id] = (frame_id, frame, submitted_at)
+            if len(self.pending) >= self.max_batch or previous is None:
+                self.cond.notify()
+
+    def add_source(self, source_id, reader):
+        """
+        Feed a source's frames in from a background thread
+
+        Args:
+            source_id (str): Feed name
+            reader: Object with read(after_id, timeout) -> (frame_id, frame),
+                e.g. capture.FrameGrabber
+        """
+        def feed():
+            frame_id = 0
+            while self.is_running and source_id in self.sources:
+                newest_id, frame = reader.read(after_id=frame_id, timeout=0.5)
+                if frame is not None:
+                    frame_id = newest_id
+                    self.submit(source_id, frame_id, frame)
+
+        thread = threading.Thread(target=feed, daemon=True)
+        self.sources[source_id] = thread
+        thread.start()
+
+    def remove_source(self, source_id):
+        """Stop feeding a source and forget its pending frame and result"""
+        self.sources.pop(source_id, None)
+        with self.cond:
+            self.pending.pop(source_id, None)
+            self.results.pop(source_id, None)
+
+    def _take_batch(self):
+        """Wait for a full batch or for the oldest pending frame's deadline"""
+        with self.cond:
+            while True:
+                if not self.is_running:
+                    return []
+                if not self.pending:
+                    self.cond.wait()
+                    continue
+                oldest = min(entry[2] for entry in self.pending.values())
+                wait = oldest + self.max_delay - time.monotonic()
+                if len(self.pending) >= self.max_batch or wait <= 0:
+                    break
+                self.cond.wait(wait)
+
+            # Oldest submissions first, so a busy feed cannot starve the others
+            order = sorted(self.pending, key=lambda source_id: self.pending[source_id][2])
+            batch = []
+            for source_id in order[:self.max_batch]:
+                frame_id, frame, _ = self.pending.pop(source_id)
+                batch.append((source_id, frame_id, frame))
+            return batch
+
+    def _run(self):
+        while self.is_running:
+            batch = self._take_batch()
+            if not batch:
+                continue
+
+            try:
+                outputs = detect_batch(self.detector, [frame for _, _, frame in batch])
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Batch inference error: {e}")
+                continue
+
+            self.batches += 1
+            self.frames += len(batch)
+            for (source_id, frame_id, _), detections in zip(batch, outputs):
+                with self.cond:
+                    self.results[source_id] = (frame_id, detections)
+                if self.on_result:
+                    self.on_result(source_id, frame_id, detections)
+
+    def latest(self, source_id, after_id=0):
+        """
+        Newest result for a source
+
+        Args:
+            source_id (str): Feed name
+            after_id (int): Only return a result for a frame newer than this
+
+        Returns:
+            tuple: (frame_id, detections), or (None, None) if there is nothing newer
+        """
+        with self.cond:
+            frame_id, detections = self.results.get(source_id, (0, None))
+            if frame_id <= after_id:
+                return None, None
+            return frame_id, detections
+
+    def stats(self):
+        return {
+            'sources': len(self.sources),
+            'batches': self.batches,
+            'frames': self.frames,
+            'mean_batch': self.frames / self.batches if self.batches else 0.0,
+            'replaced': self.replaced,
+            'errors': self.errors
+        }
+
+    def stop(self, timeout=2.0):
+        """Stop batching and feeding (the batch in flight finishes)"""
+        self.is_running = False
+        self.sources.clear()
+        with self.cond:
+            self.cond.notify_all()
+        self._thread.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve person detection for several camera feeds from one model')
+    parser.add_argument('--source', action='append', required=True,
+                        help='Camera index or stream URL (repeat for each feed)')
+    parser.add_argument('--backend', default='ultralytics', help='ultralytics, onnxruntime or openvino')
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--conf', type=float, default=0.65)
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--max-delay', type=float, default=0.02, help='seconds')
+    args = parser.parse_args()
+
+    detector = create_detector(args.backend, args.model, conf_threshold=args.conf)
+    service = BatchInferenceService(detector, max_batch=args.max_batch, max_delay=args.max_delay)
+
+    grabbers = []
+    for index, source in enumerate(args.source):
+        grabber = FrameGrabber(int(source) if source.isdigit() else source)
+        grabbers.append(grabber)
+        service.add_source(f"cam{index}", grabber)
+        print(f"📷 cam{index}: {source}")
+
+    try:
+        last = service.stats()
+        while True:
+            time.sleep(5)
+            stats = service.stats()
+            fps = (stats['frames'] - last['frames']) / 5
+            people = {source_id: len(service.latest(source_id)[1] or []) for source_id in service.sources}
+            print(f"📊 {fps:.1f} frames/s total, mean batch {stats['mean_batch']:.1f}, people {people}")
+            last = stats
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        for grabber in grabbers:
+            grabber.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Inference Worker - Long-lived detector thread(s) fed from a latest-frame slot
+Workers pull the newest frame from a source (a FrameGrabber, or a LatestSlot
+the caller fills), run the detector and publish the result tagged with the
+frame id it came from. A worker picks up the next frame as soon as it is
+done, so the inference rate follows the model's speed and frames that
+arrived in the meantime are skipped instead of queued.
+"""
+
+import threading
+import time
+
+
+class LatestSlot:
+    """Size-1 frame slot: put() replaces whatever has not been taken yet"""
+
+    def __init__(self):
+        self.frame_id = 0
+        self.frame = None
+        self.replaced = 0
+        self.is_open = True
+        self.cond = threading.Condition()
+
+    def put(self, frame_id, frame):
+        """
+        Offer a frame (never blocks)
+
+        Args:
+            frame_id (int): Increasing frame id
+            frame (np.ndarray): Frame; must not be modified by the caller afterwards
+        """
+        with self.cond:
+            if self.frame is not None:
+                self.replaced += 1
+            self.frame_id = frame_id
+            self.frame = frame
+            self.cond.notify_all()
+
+    def read(self, after_id=None, timeout=None):
+        """
+        Take the frame if it is newer than `after_id` (same contract as FrameGrabber.read)
+
+        Returns:
+            tuple: (frame_id, frame), or (None, None) on timeout
+        """
+        after_id = 0 if after_id is None else after_id
+        with self.cond:
+            self.cond.wait_for(lambda: (self.frame is not None and self.frame_id > after_id) or not self.is_open, timeout)
+            if self.frame is None or self.frame_id <= after_id:
+                return None, None
+            frame, self.frame = self.frame, None
+            return self.frame_id, frame
+
+    def close(self):
+        with self.cond:
+            self.is_open = False
+            self.cond.notify_all()
+
+
+class InferenceWorker:
+    def __init__(self, infer, source, workers=1, poll_timeout=0.5):
+        """
+        Start the worker thread(s)
+
+        Args:
+            infer (callable|list): frame -> detections. With several workers,
+                pass one callable per worker unless `infer` is thread-safe
+            source: Object with read(after_id, timeout) -> (frame_id, frame),
+                e.g. FrameGrabber or LatestSlot
+            workers (int): Number of worker threads
+            poll_timeout (float): Max wait for a new frame before re-checking for stop
+        """
+        infers = infer if isinstance(infer, (list, tuple)) else [infer] * workers
+        self.source = source
+        self.poll_timeout = poll_timeout
+        self.lock = threading.Lock()
+
+        self.claimed_id = 0  # Newest frame id a worker has taken
+        self.result_id = 0  # Frame id of the published result
+        self.result = None
+        self.result_time = 0.0
+
+        self.runs = 0
+        self.errors = 0
+        self.latency = 0.0  # Moving average of seconds per inference
+        self.is_running = True
+
+        self._threads = [threading.Thread(target=self._run, args=(fn,), daemon=True) for fn in infers]
+        for thread in self._threads:
+            thread.start()
+
+    def _claim(self):
+        """Next frame no other worker has taken, or (None, None)"""
+        frame_id, frame = self.source.read(after_id=self.claimed_id, timeout=self.poll_timeout)
+        if frame is None:
+            return None, None
+        with self.lock:
+            if frame_id <= self.claimed_id:
+                return None, None  # Another worker took it first
+            self.claimed_id = frame_id
+        return frame_id, frame
+
+    def _run(self, infer):
+        while self.is_running:
+            frame_id, frame = self._claim()
+            if frame is None:
+                continue
+
+            started = time.monotonic()
+            try:
+                detections = infer(frame)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Inference error: {e}")
+                continue
+            elapsed = time.monotonic() - started
+
+            with self.lock:
+                self.runs += 1
+                self.latency = elapsed if self.runs == 1 else 0.9 * self.latency + 0.1 * elapsed
+                if frame_id > self.result_id:  # A slower worker must not publish an older frame
+                    self.result_id = frame_id
+                    self.result = detections
+                    self.result_time = time.time()
+
+    def latest(self, after_id=0):
+        """
+        Newest result
+
+        Args:
+            after_id (int): Only return a result for a frame newer than this
+
+        Returns:
+            tuple: (frame_id, detections), or (None, None) if there is nothing newer
+        """
+        with self.lock:
+            if self.result_id <= after_id:
+                return None, None
+            return self.result_id, self.result
+
+    def stop(self, timeout=2.0):
+        """Stop the workers (each finishes its current inference)"""
+        self.is_running = False
+        for thread in self._threads:
+            thread.join(timeout)
@@ -0,0 +1,176 @@
+"""
+Panel Sender - Background push of detections to the Command Panel over HTTP
+Keeps one keep-alive session to POST /api/ingest and never blocks the caller:
+records go into a bounded queue (oldest dropped when full) and a worker
+thread ships them in batches. Busy responses (429/503) and server errors are
+retried with exponential back-off; other 4xx rejections are logged and
+counted as failed.
+"""
+
+import collections
+import threading
+import time
+
+import requests
+
+RETRY_STATUSES = (429, 503)  # Panel busy: retry what it did not accept
+
+
+class PanelSender:
+    def __init__(self, base_url, max_queue=256, batch_size=32, timeout=2.0, retry_delay=1.0,
+                 max_retry_delay=30.0):
+        """
+        Initialize the sender and start its worker thread
+
+        Args:
+            base_url (str): Command Panel base URL (e.g. "http://192.168.1.20:5000")
+            max_queue (int): Records buffered while the panel is slow/unreachable
+            batch_size (int): Max records per POST
+            timeout (float): HTTP timeout in seconds
+            retry_delay (float): Back-off after the first failed POST (doubles per retry)
+            max_retry_delay (float): Upper bound for the back-off
+        """
+        base = base_url.rstrip('/')
+        if base.endswith('/api/ingest'):
+            base = base[:-len('/api/ingest')]
+        self.url = f"{base}/api/ingest"
+
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.retries = 0  # Consecutive failed attempts, drives the back-off
+
+        self.session = requests.Session()  # Reuses the TCP connection between batches
+        self.queue = collections.deque(maxlen=max_queue)
+        self.cond = threading.Condition()
+        self.sent = 0  # Records the panel accepted
+        self.failed = 0  # Records the panel rejected (4xx other than 429)
+        self.dropped = 0  # Records discarded here because the queue was full
+        self.is_running = True
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, record):
+        """
+        Queue a detection record (never blocks)
+
+        Args:
+            record (dict): Detection data
+        """
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1  # deque drops the oldest for us
+            self.queue.append(record)
+            self.cond.notify()
+
+    def _take_batch(self):
+        with self.cond:
+            while self.is_running and not self.queue:
+                self.cond.wait()
+            batch = []
+            while self.queue and len(batch) < self.batch_size:
+                batch.append(self.queue.popleft())
+            return batch
+
+    def _requeue(self, batch):
+        """Put a failed batch back at the front, still respecting the queue bound"""
+        with self.cond:
+            room = self.queue.maxlen - len(self.queue)
+            keep = batch[-room:] if room > 0 else []
+            self.dropped += len(batch) - len(keep)
+            self.queue.extendleft(reversed(keep))
+
+    def _post(self, batch):
+        """
+        POST one batch
+
+        Returns:
+            tuple: (records to retry, seconds to wait first or None for the back-off)
+        """
+        response = self.session.post(self.url, json=batch, timeout=self.timeout)
+        status = response.status_code
+
+        if status in RETRY_STATUSES:
+            # The panel accepts a prefix of the batch before its queue fills up
+            try:
+                accepted = int(response.json().get('accepted', 0))
+            except (ValueError, AttributeError):
+                accepted = 0
+            self.sent += accepted
+            retry_after = response.headers.get('Retry-After', '')
+            return batch[accepted:], float(retry_after) if retry_after.isdigit() else None
+
+        if status >= 500:
+            raise requests.HTTPError(f"HTTP {status}")
+
+        if status == 400:
+            # The panel names the invalid records and queues none of the batch;
+            # drop just those and resend the rest straight away
+            try:
+                invalid = {int(item['index']) for item in response.json().get('invalid', [])}
+            except (ValueError, TypeError, KeyError, AttributeError):
+                invalid = set()
+            if invalid:
+                self.failed += len(invalid)
+                print(f"❌ Command Panel rejected {len(invalid)} invalid records: {response.text[:200]}")
+                return [r for i, r in enumerate(batch) if i not in invalid], 0
+
+        if status >= 400:
+            self.failed += len(batch)
+            print(f"❌ Command Panel rejected {len(batch)} records (HTTP {status}): {response.text[:200]}")
+            return [], None
+
+        self.sent += len(batch)
+        return [], None
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return  # Stopped and drained
+
+            try:
+                retry, wait = self._post(batch)
+            except requests.RequestException as e:
+                print(f"⚠️ Command Panel push failed ({e}), retrying...")
+                retry, wait = batch, None
+
+            if not retry:
+                self.retries = 0
+                continue
+
+            self._requeue(retry)
+            if not self.is_running:
+                return
+            if wait is None:
+                wait = self.retry_delay * 2 ** self.retries
+            self.retries += 1
+            time.sleep(min(wait, self.max_retry_delay))
+
+    def stats(self):
+        """
+        Delivery counters
+
+        Returns:
+            dict: sent/failed/dropped record counts, records still queued
+                and consecutive retries
+        """
+        with self.cond:
+            queued = len(self.queue)
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'queued': queued,
+            'retries': self.retries
+        }
+
+    def close(self, timeout=2.0):
+        """Stop after flushing what is queued (bounded by `timeout`)"""
+        with self.cond:
+            self.is_running = False
+            self.cond.notify_all()
+        self._thread.join(timeout)
+        self.session.close()
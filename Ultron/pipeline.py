@@ -0,0 +1,403 @@
+"""
+Ultron Pipeline - Headless detection loop (no Tkinter, no winsound)
+Capture -> inference worker -> tracker -> GPS projection -> Command Panel
+export, configured from a JSON file so it can run on Linux edge boxes and
+servers at full speed:
+
+    python pipeline.py --config pipeline_config.json
+
+Any key left out of the config keeps its default (see DEFAULT_CONFIG).
+A GUI or recorder can still watch the pipeline through add_consumer().
+"""
+
+import argparse
+import base64
+import copy
+import datetime
+import json
+import os
+import threading
+import time
+
+import cv2
+
+from capture import FrameGrabber
+from detection_log import DetectionLogWriter
+from detectors import create_detector
+from geolocation import CameraGeometry
+from inference_worker import InferenceWorker
+from panel_sender import PanelSender
+from tracker import MultiObjectTracker
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CONFIG = {
+    'camera': {
+        'source': 0,  # Camera index or stream URL
+        'width': 640,
+        'height': 360
+    },
+    'geometry': {
+        'lat': 28.6139,
+        'lon': 77.2090,
+        'height': 2.5,
+        'tilt': 15,
+        'bearing': 0,
+        'horizontal_fov': 60,
+        'vertical_fov': 45
+    },
+    'detector': {
+        'backend': 'ultralytics',  # 'ultralytics', 'onnxruntime' or 'openvino'
+        'model': 'yolov8n.pt',
+        'conf_threshold': 0.65,
+        'iou_threshold': 0.45,
+        'workers': 1
+    },
+    'tracker': {
+        'iou_threshold': 0.3,
+        'max_age': 30,
+        'min_hits': 2,
+        'max_coast': 15
+    },
+    'panel': {
+        'enabled': True,
+        'drone_id': 'ULTRON-01',
+        'ingest_url': None,  # e.g. "http://192.168.1.20:5000"; None = local detection log
+        'send_queue': 256,
+        'log_dir': '../CommandPanel/data/detection_log',  # Relative paths are relative to this folder
+        'segment_bytes': 8 * 1024 * 1024,
+        'max_segments': 20,
+        'live_feed': None,  # Also write the latest record here (e.g. for compare_frames.py)
+        'update_interval': 0.5,  # Min seconds between TRACKING records per target
+        'snapshots': True  # Attach a 320x180 JPEG to each record
+    }
+}
+
+
+def merge_config(defaults, overrides):
+    """Recursively overlay `overrides` onto a copy of `defaults`"""
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def resolve_path(path):
+    """Resolve a config path; relative ones are relative to this folder, not the working directory"""
+    return os.path.join(BASE_DIR, path)  # join() keeps absolute paths as they are
+
+
+def load_config(path=None):
+    """
+    Load a JSON config file on top of DEFAULT_CONFIG
+
+    Args:
+        path (str): Config file (None = defaults only)
+
+    Returns:
+        dict: Full config
+    """
+    if path is None:
+        return copy.deepcopy(DEFAULT_CONFIG)
+    with open(path) as f:
+        return merge_config(DEFAULT_CONFIG, json.load(f))
+
+
+def draw_targets(frame, targets, color=(0, 255, 0)):
+    """
+    Draw tracked targets onto `frame` in place: corner brackets, a light fill
+    and a "#id THREAT LOC" label (the same overlay the GUI shows)
+
+    Args:
+        frame (ndarray): BGR frame
+        targets (list): Targets from UltronPipeline.step() (with 'lat'/'lon')
+    """
+    for target in targets:
+        x1, y1, x2, y2 = (int(v) for v in target['coords'])
+        for x, dx in ((x1, 20), (x2, -20)):
+            for y, dy in ((y1, 20), (y2, -20)):
+                cv2.line(frame, (x, y), (x + dx, y), color, 2)
+                cv2.line(frame, (x, y), (x, y + dy), color, 2)
+
+        overlay = frame.copy()
+        cv2.rectangle(overlay, (x1, y1), (x2, y2), color, -1)
+        cv2.addWeighted(overlay, 0.15, frame, 0.85, 0, frame)
+        cv2.putText(frame, f"#{target['track_id']} THREAT LOC: {target['lat']:.5f}, {target['lon']:.5f}",
+                    (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+
+
+class PanelExporter:
+    def __init__(self, config):
+        """
+        Ship detection records to the Command Panel (HTTP push or local detection log)
+
+        Args:
+            config (dict): The 'panel' config section
+        """
+        self.drone_id = config['drone_id']
+        self.snapshots = config['snapshots']
+        self.lock = threading.Lock()  # export() may also be called from a GUI thread
+        self.sender = None
+        self.log = None
+        self.live_feed = None
+        if config['ingest_url']:
+            self.sender = PanelSender(config['ingest_url'], max_queue=config['send_queue'])
+        else:
+            self.log = DetectionLogWriter(
+                resolve_path(config['log_dir']),
+                segment_bytes=config['segment_bytes'],
+                max_segments=config['max_segments']
+            )
+            if config['live_feed']:
+                self.live_feed = resolve_path(config['live_feed'])
+
+    def encode_snapshot(self, frame):
+        """
+        Snapshot attached to records of this frame
+
+        Returns:
+            str: Base64 320x180 JPEG, or None (snapshots off or encoding failed)
+        """
+        if frame is None or not self.snapshots:
+            return None
+        try:
+            small_frame = cv2.resize(frame, (320, 180))
+            _, buffer = cv2.imencode('.jpg', small_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+            return base64.b64encode(buffer).decode('utf-8')
+        except Exception as e:
+            print(f"⚠️ Image encoding error: {e}")
+            return None
+
+    def export(self, message, lat, lon, confidence, snapshot=None, track_id=None):
+        """Build a detection record (with a snapshot from encode_snapshot) and send it"""
+        record = {
+            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "latitude": lat,
+            "longitude": lon,
+            "confidence": float(confidence),
+            "message": message,
+            "drone_id": self.drone_id,
+            "image_base64": snapshot
+        }
+        if track_id is not None:
+            record["track_id"] = track_id
+
+        try:
+            with self.lock:
+                if self.sender:
+                    self.sender.send(record)
+                else:
+                    self.log.append(record)
+                    if self.live_feed:
+                        self._write_live_feed(record)
+        except Exception as e:
+            print(f"❌ Error sending data to Command Panel: {e}")
+
+    def _write_live_feed(self, record):
+        # Temp file + rename so readers never see a half-written document
+        os.makedirs(os.path.dirname(self.live_feed), exist_ok=True)
+        tmp_path = self.live_feed + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self.live_feed)
+
+    def close(self):
+        if self.sender:
+            self.sender.close()
+        if self.log:
+            self.log.close()
+
+
+class UltronPipeline:
+    def __init__(self, config):
+        """
+        Build the pipeline (nothing runs until start())
+
+        Args:
+            config (dict): Full config (see DEFAULT_CONFIG / load_config)
+        """
+        self.config = config
+        camera = config['camera']
+        self.geometry = CameraGeometry(frame_width=camera['width'], frame_height=camera['height'],
+                                       **config['geometry'])
+        self.tracker = MultiObjectTracker(**config['tracker'])
+        self.update_interval = config['panel']['update_interval']
+
+        self.detectors = []
+        self.grabber = None
+        self.worker = None
+        self.exporter = None
+        self.consumers = []
+        self.last_export = {}  # track_id -> time of its last record
+        self.last_frame_id = 0
+        self.last_result_id = 0
+
+        self.frames = 0
+        self.exported = 0
+        self.is_running = False
+
+    def add_consumer(self, callback):
+        """
+        Watch the pipeline, e.g. from a GUI
+
+        Args:
+            callback (callable): callback(frame_id, frame, targets), called on the
+                pipeline thread for every processed frame; targets carry
+                'track_id', 'coords', 'conf', 'lat', 'lon'
+        """
+        self.consumers.append(callback)
+
+    def start(self, detectors=None):
+        """
+        Load the detector(s), open the camera and start inference
+
+        Args:
+            detectors (list): Already loaded detectors to reuse (e.g. from a
+                previous run); None loads detector.workers new ones
+        """
+        camera = self.config['camera']
+        detector = self.config['detector']
+        if detectors:
+            self.detectors = detectors
+        else:
+            self.detectors = [
+                create_detector(detector['backend'], detector['model'],
+                                conf_threshold=detector['conf_threshold'], iou_threshold=detector['iou_threshold'])
+                for _ in range(detector['workers'])
+            ]
+            print(f"✅ {detector['backend']} detector loaded ({detector['model']})")
+
+        source = camera['source']
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        self.grabber = FrameGrabber(source, width=camera['width'], height=camera['height'])
+        if not self.grabber.is_opened():
+            print(f"⚠️ Could not open {source} yet, retrying in the background")
+
+        self.worker = InferenceWorker(self.detectors, self.grabber)
+        if self.config['panel']['enabled']:
+            self.exporter = PanelExporter(self.config['panel'])
+        self.is_running = True
+
+    def step(self, timeout=1.0):
+        """
+        Process the next captured frame
+
+        Args:
+            timeout (float): Max wait for a new frame
+
+        Returns:
+            list: Tracked targets in this frame (empty if no frame arrived)
+        """
+        frame_id, frame = self.grabber.read(after_id=self.last_frame_id, timeout=timeout)
+        if frame is None:
+            return []
+        self.last_frame_id = frame_id
+        self.frames += 1
+
+        # Fresh detections when the worker finished one, otherwise coast on predictions
+        result_id, boxes = self.worker.latest(after_id=self.last_result_id)
+        if result_id is not None:
+            self.last_result_id = result_id
+            targets = self.tracker.step(boxes)
+        else:
+            targets = self.tracker.step()
+
+        for target in targets:
+            x1, y1, x2, y2 = target['coords']
+            target['lat'], target['lon'] = self.geometry.pixel_to_gps((x1 + x2) / 2, (y1 + y2) / 2)
+
+        now = time.monotonic()
+        snapshot = None  # Encoded at most once per frame and shared by its records
+        for target in targets:
+            if self.exporter is None:
+                break
+
+            track_id = target['track_id']
+            if target['new']:
+                message = f"NEW TARGET #{track_id}: {len(targets)} TOTAL"
+            elif now - self.last_export.get(track_id, 0) >= self.update_interval:
+                message = f"TRACKING #{track_id}: {len(targets)} HUMAN{'S' if len(targets) > 1 else ''}"
+            else:
+                continue
+            self.last_export[track_id] = now
+            if snapshot is None:
+                # Annotated like the GUI view, on a copy: the capture thread shares `frame`
+                annotated = frame.copy()
+                draw_targets(annotated, targets)
+                snapshot = self.exporter.encode_snapshot(annotated)
+            self.exporter.export(message, target['lat'], target['lon'], target['conf'], snapshot, track_id=track_id)
+            self.exported += 1
+
+        # Forget throttle entries of tracks the tracker has dropped
+        if len(self.last_export) > 2 * len(self.tracker.tracks) + 64:
+            live = {track.track_id for track in self.tracker.tracks}
+            self.last_export = {k: v for k, v in self.last_export.items() if k in live}
+
+        for callback in self.consumers:
+            callback(frame_id, frame, targets)
+        return targets
+
+    def run(self, status_interval=10.0):
+        """
+        Run until stop() (or Ctrl+C), printing a status line every `status_interval`
+        seconds, then release everything (see close())
+
+        Starts the pipeline first unless start() was already called.
+        """
+        if not self.is_running:
+            self.start()
+        last_status = time.monotonic()
+        last_frames = 0
+        try:
+            while self.is_running:
+                self.step()
+                if time.monotonic() - last_status >= status_interval:
+                    elapsed = time.monotonic() - last_status
+                    print(f"📊 {(self.frames - last_frames) / elapsed:.1f} fps, "
+                          f"inference {self.worker.latency * 1000:.0f} ms, "
+                          f"{len(self.tracker.tracks)} tracks, {self.exported} records sent")
+                    last_status = time.monotonic()
+                    last_frames = self.frames
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping pipeline")
+        finally:
+            self.close()
+
+    def stop(self):
+        """Ask run() to finish (safe from any thread; run() closes the pipeline on its way out)"""
+        self.is_running = False
+
+    def close(self):
+        """Stop inference and capture and flush the panel export"""
+        self.is_running = False
+        if self.worker:
+            self.worker.stop()
+        if self.grabber:
+            self.grabber.stop()
+        if self.exporter:
+            self.exporter.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Ultron detection pipeline without the GUI')
+    parser.add_argument('--config', help='JSON config file (see DEFAULT_CONFIG in pipeline.py)')
+    parser.add_argument('--source', help='Override camera.source')
+    parser.add_argument('--print-config', action='store_true', help='Print the effective config and exit')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.source is not None:
+        config['camera']['source'] = args.source
+    if args.print_config:
+        print(json.dumps(config, indent=2))
+        return
+
+    UltronPipeline(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+ONNX/OpenVINO post-processing: letterbox geometry, YOLOv8 decoding and NMS
+"""
+
+import numpy as np
+
+from detectors import PERSON_CLASS_ID, decode_yolov8, letterbox, nms
+
+ANCHORS = 100  # Real models have 8400; enough to keep channels < anchors
+
+
+def raw_output(*predictions, classes=80):
+    """1 x (4 + classes) x ANCHORS output with (cx, cy, w, h, class_id, score) filled in"""
+    output = np.zeros((1, 4 + classes, ANCHORS), dtype=np.float32)
+    for anchor, (cx, cy, w, h, class_id, score) in enumerate(predictions):
+        output[0, :4, anchor] = cx, cy, w, h
+        output[0, 4 + class_id, anchor] = score
+    return output
+
+
+def test_letterbox_scales_and_pads_to_a_square_input():
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    frame[:, :, 2] = 255  # Pure red in BGR
+
+    blob, scale, pad = letterbox(frame, size=640)
+
+    assert blob.shape == (1, 3, 640, 640)
+    assert blob.dtype == np.float32
+    assert scale == 0.5
+    assert pad == (0, 140)
+    # Padding bands are gray, the image sits between them with channels as RGB
+    assert np.allclose(blob[0, :, :140], 114 / 255)
+    assert np.allclose(blob[0, :, 500:], 114 / 255)
+    assert np.allclose(blob[0, 0, 140:500], 1.0)
+    assert np.allclose(blob[0, 2, 140:500], 0.0)
+
+
+def test_nms_keeps_the_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=float)
+    scores = np.array([0.8, 0.9, 0.7])
+
+    assert nms(boxes, scores, iou_threshold=0.5).tolist() == [1, 2]
+    assert nms(boxes, scores, iou_threshold=0.9).tolist() == [1, 0, 2]
+    assert nms(np.zeros((0, 4)), np.zeros(0), 0.5).tolist() == []
+
+
+def test_decode_maps_boxes_back_to_frame_pixels():
+    frame_shape = (720, 1280, 3)
+    _, scale, pad = letterbox(np.zeros(frame_shape, dtype=np.uint8), size=640)
+    output = raw_output(
+        (100, 240, 40, 80, PERSON_CLASS_ID, 0.9),       # Person: (80, 200)-(120, 280) letterboxed
+        (102, 242, 40, 80, PERSON_CLASS_ID, 0.8),       # Duplicate of it, suppressed
+        (400, 300, 40, 80, PERSON_CLASS_ID + 1, 0.95),  # Another class
+        (500, 300, 40, 80, PERSON_CLASS_ID, 0.3),       # Below the threshold
+    )
+
+    detections = decode_yolov8(output, frame_shape, scale, pad, conf_threshold=0.5, iou_threshold=0.45)
+
+    assert len(detections) == 1
+    assert detections[0]['coords'] == [160, 120, 240, 280]
+    assert abs(detections[0]['conf'] - 0.9) < 1e-6
+
+
+def test_decode_accepts_anchors_first_output_and_clips_to_the_frame():
+    frame_shape = (720, 1280, 3)
+    output = raw_output((630, 150, 40, 40, PERSON_CLASS_ID, 0.9))
+
+    [detection] = decode_yolov8(output.transpose(0, 2, 1), frame_shape, 0.5, (0, 140),
+                                conf_threshold=0.5, iou_threshold=0.45)
+
+    # (610, 130)-(650, 170) letterboxed runs off the right and top edges
+    assert detection['coords'] == [1220, 0, 1280, 60]
+    assert decode_yolov8(raw_output(), frame_shape, 0.5, (0, 140), 0.5, 0.45) == []
@@ -0,0 +1,69 @@
+"""
+BatchInferenceService batching: release on size or deadline, newest frame per source
+"""
+
+import threading
+import time
+
+from inference_server import BatchInferenceService
+
+
+class RecordingDetector:
+    def __init__(self):
+        self.batches = []
+        self.done = threading.Event()
+
+    def __call__(self, frame):
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        self.batches.append((time.monotonic(), list(frames)))
+        self.done.set()
+        return [[{'coords': [0, 0, 1, 1], 'conf': 0.9}] for _ in frames]
+
+
+def test_full_batch_is_released_without_waiting_for_the_deadline():
+    detector = RecordingDetector()
+    service = BatchInferenceService(detector, max_batch=2, max_delay=10)
+    started = time.monotonic()
+    service.submit('a', 1, 'a1')
+    service.submit('b', 1, 'b1')
+
+    assert detector.done.wait(2)
+    released, frames = detector.batches[0]
+    assert released - started < 1
+    assert sorted(frames) == ['a1', 'b1']
+    service.stop()
+
+
+def test_partial_batch_is_released_at_the_deadline():
+    detector = RecordingDetector()
+    service = BatchInferenceService(detector, max_batch=8, max_delay=0.1)
+    started = time.monotonic()
+    service.submit('a', 1, 'a1')
+
+    assert detector.done.wait(2)
+    released, frames = detector.batches[0]
+    assert released - started >= 0.1
+    assert frames == ['a1']
+    assert service.latest('a') == (1, [{'coords': [0, 0, 1, 1], 'conf': 0.9}])
+    service.stop()
+
+
+def test_a_source_contributes_only_its_newest_frame():
+    detector = RecordingDetector()
+    results = []
+    service = BatchInferenceService(detector, max_batch=2, max_delay=10,
+                                    on_result=lambda *result: results.append(result[:2]))
+    for frame_id in (1, 2, 3):
+        service.submit('a', frame_id, f'a{frame_id}')
+    service.submit('b', 1, 'b1')
+
+    assert detector.done.wait(2)
+    assert sorted(detector.batches[0][1]) == ['a3', 'b1']
+    assert service.stats()['replaced'] == 2
+    deadline = time.monotonic() + 2
+    while len(results) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(results) == [('a', 3), ('b', 1)]
+    service.stop()
@@ -0,0 +1,55 @@
+"""
+MultiObjectTracker: ids survive across frames, stale tracks are dropped
+"""
+
+from tracker import MultiObjectTracker
+
+
+def box(x, y, conf=0.9):
+    return {'coords': (x, y, x + 50, y + 120), 'conf': conf}
+
+
+def test_ids_are_kept_while_targets_move():
+    tracker = MultiObjectTracker(min_hits=2)
+
+    assert tracker.step([box(100, 100), box(400, 100)]) == []  # Not confirmed yet
+    frames = [tracker.step([box(100 + 4 * i, 100), box(400 - 4 * i, 100)]) for i in range(1, 6)]
+
+    first, *rest = frames
+    assert [t['new'] for t in first] == [True, True]
+    ids = sorted(t['track_id'] for t in first)
+    for targets in rest:
+        assert sorted(t['track_id'] for t in targets) == ids
+        assert not any(t['new'] for t in targets)
+    # The reported box follows the target
+    assert min(t['coords'][0] for t in rest[-1]) > 110
+
+
+def test_tracks_coast_then_expire():
+    tracker = MultiObjectTracker(min_hits=1, max_coast=2, max_age=4)
+    [target] = tracker.step([box(100, 100)])
+
+    # Reported on predictions for max_coast frames, then hidden but still matchable
+    assert len(tracker.step([])) == 1
+    assert len(tracker.step(None)) == 1
+    assert tracker.step([]) == []
+    assert len(tracker.tracks) == 1
+
+    # Past max_age the track is gone; the same spot starts a new id
+    tracker.step([])
+    tracker.step([])
+    assert tracker.tracks == []
+    [again] = tracker.step([box(100, 100)])
+    assert again['track_id'] != target['track_id']
+    assert again['new']
+
+
+def test_returning_target_keeps_its_id_within_max_age():
+    tracker = MultiObjectTracker(min_hits=1, max_coast=1, max_age=10)
+    [target] = tracker.step([box(100, 100)])
+    for _ in range(3):
+        tracker.step([])
+
+    [back] = tracker.step([box(100, 100)])
+    assert back['track_id'] == target['track_id']
+    assert not back['new']
@@ -0,0 +1,106 @@
+"""
+PanelSender delivery accounting: busy responses are retried, rejections fail
+"""
+
+import threading
+import time
+
+from panel_sender import PanelSender
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.headers = headers or {}
+        self.text = str(self.body)
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posted = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        with self.lock:
+            self.posted.append(list(json))
+            return self.responses.pop(0) if self.responses else FakeResponse(202)
+
+    def close(self):
+        pass
+
+
+def make_sender(responses, **options):
+    sender = PanelSender('http://panel:5000', retry_delay=0.01, **options)
+    sender.session = FakeSession(responses)
+    return sender
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_busy_panel_is_retried_from_the_first_refused_record():
+    sender = make_sender([FakeResponse(503, {'accepted': 1, 'dropped': 2})])
+    sender.send({'n': 1})
+    sender.send({'n': 2})
+    sender.send({'n': 3})
+
+    assert wait_for(lambda: sender.stats()['sent'] == 3)
+    posted = sender.session.posted
+    # Depending on timing the first POST carries one to three records
+    assert [record['n'] for batch in posted for record in batch][-2:] == [2, 3]
+    assert sender.stats()['failed'] == 0
+    sender.close()
+
+
+def test_rate_limit_is_retried():
+    sender = make_sender([FakeResponse(429, headers={'Retry-After': '0'})])
+    sender.send({'n': 1})
+
+    assert wait_for(lambda: sender.stats()['sent'] == 1)
+    assert len(sender.session.posted) == 2
+    sender.close()
+
+
+def test_rejected_records_count_as_failed():
+    sender = make_sender([FakeResponse(400, {'error': 'bad record'})])
+    sender.send({'n': 1})
+
+    assert wait_for(lambda: sender.stats()['failed'] == 1)
+    stats = sender.stats()
+    assert stats['sent'] == 0
+    assert stats['queued'] == 0
+    assert len(sender.session.posted) == 1
+    sender.close()
+
+
+def test_invalid_records_are_dropped_and_the_rest_resent():
+    sender = make_sender([FakeResponse(400, {'invalid': [{'index': 0, 'error': 'latitude is required'}]})])
+    sender.send({'n': 1})
+    sender.send({'n': 2})
+
+    assert wait_for(lambda: sender.stats()['sent'] == 1)
+    assert sender.stats()['failed'] == 1
+    posted = [record['n'] for batch in sender.session.posted for record in batch]
+    assert posted.count(1) == 1
+    assert posted[-1] == 2
+    sender.close()
+
+
+def test_back_off_doubles_and_resets():
+    sender = make_sender([FakeResponse(500), FakeResponse(500), FakeResponse(500)],
+                         max_retry_delay=0.05)
+    sender.send({'n': 1})
+
+    assert wait_for(lambda: sender.stats()['sent'] == 1)
+    assert len(sender.session.posted) == 4
+    assert sender.stats()['retries'] == 0
+    sender.close()
@@ -0,0 +1,116 @@
+"""
+Headless pipeline: annotated per-frame snapshots and per-target TRACKING throttle
+"""
+
+import os
+
+import numpy as np
+
+from pipeline import UltronPipeline, load_config, resolve_path
+
+
+class FakeGrabber:
+    def __init__(self):
+        self.frame_id = 0
+
+    def read(self, after_id=None, timeout=None):
+        self.frame_id += 1
+        return self.frame_id, np.zeros((360, 640, 3), dtype=np.uint8)
+
+
+class FakeWorker:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.result_id = 0
+
+    def latest(self, after_id=0):
+        self.result_id += 1
+        return self.result_id, self.boxes
+
+
+class FakeExporter:
+    def __init__(self):
+        self.records = []
+        self.encoded = 0
+        self.frames = []
+
+    def encode_snapshot(self, frame):
+        self.encoded += 1
+        self.frames.append(frame)
+        return f"jpeg{self.encoded}"
+
+    def export(self, message, lat, lon, confidence, snapshot=None, track_id=None):
+        self.records.append((message.split()[0], track_id, snapshot))
+
+
+def make_pipeline(boxes, update_interval=60):
+    config = load_config()
+    config['tracker']['min_hits'] = 1
+    config['panel']['update_interval'] = update_interval
+    pipeline = UltronPipeline(config)
+    pipeline.grabber = FakeGrabber()
+    pipeline.worker = FakeWorker(boxes)
+    pipeline.exporter = FakeExporter()
+    return pipeline
+
+
+BOXES = [{'coords': (100, 100, 150, 220), 'conf': 0.9}, {'coords': (400, 120, 450, 240), 'conf': 0.8}]
+
+
+def test_one_snapshot_per_frame_shared_by_its_records():
+    pipeline = make_pipeline(BOXES)
+    targets = pipeline.step()
+
+    assert len(targets) == 2
+    assert pipeline.exporter.encoded == 1
+    assert [(kind, snapshot) for kind, _, snapshot in pipeline.exporter.records] == [('NEW', 'jpeg1'), ('NEW', 'jpeg1')]
+
+
+def test_snapshot_is_annotated_without_touching_the_shared_frame():
+    pipeline = make_pipeline(BOXES)
+    seen = []
+    pipeline.add_consumer(lambda frame_id, frame, targets: seen.append(frame))
+    pipeline.step()
+
+    snapshot = pipeline.exporter.frames[0]
+    # Boxes drawn in the snapshot; the frame consumers get is still raw
+    assert snapshot[100:220, 100:150].any()
+    assert not snapshot[300:, 600:].any()
+    assert not seen[0].any()
+
+
+def test_tracking_records_are_throttled_per_target():
+    pipeline = make_pipeline(BOXES)
+    for _ in range(5):
+        pipeline.step()
+
+    # Only the NEW records: TRACKING updates wait for update_interval
+    assert len(pipeline.exporter.records) == 2
+    assert pipeline.exporter.encoded == 1
+
+
+def test_tracking_records_after_the_interval():
+    pipeline = make_pipeline(BOXES, update_interval=0)
+    for _ in range(3):
+        pipeline.step()
+
+    kinds = [kind for kind, _, _ in pipeline.exporter.records]
+    assert kinds == ['NEW', 'NEW', 'TRACKING', 'TRACKING', 'TRACKING', 'TRACKING']
+    assert pipeline.exporter.encoded == 3
+
+
+def test_consumers_see_geolocated_targets():
+    pipeline = make_pipeline(BOXES)
+    seen = []
+    pipeline.add_consumer(lambda frame_id, frame, targets: seen.append((frame_id, targets)))
+    pipeline.step()
+
+    frame_id, targets = seen[0]
+    assert frame_id == 1
+    assert all('lat' in target and 'lon' in target for target in targets)
+
+
+def test_relative_paths_resolve_next_to_the_pipeline():
+    path = resolve_path('../CommandPanel/data/detection_log')
+    assert path.endswith(os.path.join('Ultron', '..', 'CommandPanel', 'data', 'detection_log'))
+    assert resolve_path('/var/log/ultron') == '/var/log/ultron'
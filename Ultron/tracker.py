@@ -0,0 +1,194 @@
+"""
+Tracker - SORT-style multi-object tracking of YOLO person boxes
+Each target gets a constant-velocity Kalman filter over its box; new
+detections are associated to the predicted boxes by IoU (Hungarian matching
+through `lap` when installed, greedy otherwise). Track ids stay stable across
+frames, and frames without inference are filled in from the predictions.
+"""
+
+import itertools
+
+import numpy as np
+
+try:
+    import lap
+except ImportError:  # lapx is optional: fall back to greedy matching
+    lap = None
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Pairwise IoU of two sets of [x1, y1, x2, y2] boxes
+
+    Args:
+        boxes_a (np.ndarray): N x 4
+        boxes_b (np.ndarray): M x 4
+
+    Returns:
+        np.ndarray: N x M IoU values
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = w * h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def associate(iou, threshold):
+    """
+    Match detections (rows) to tracks (columns)
+
+    Args:
+        iou (np.ndarray): Detection x track IoU matrix
+        threshold (float): Minimum IoU for a match
+
+    Returns:
+        list: (detection_index, track_index) pairs
+    """
+    if iou.size == 0:
+        return []
+
+    if lap is not None:
+        _, x, _ = lap.lapjv(-iou, extend_cost=True)
+        return [(d, t) for d, t in enumerate(x) if t >= 0 and iou[d, t] >= threshold]
+
+    pairs = []
+    used_d, used_t = set(), set()
+    for flat in np.argsort(-iou, axis=None):
+        d, t = divmod(int(flat), iou.shape[1])
+        if iou[d, t] < threshold:
+            break
+        if d not in used_d and t not in used_t:
+            pairs.append((d, t))
+            used_d.add(d)
+            used_t.add(t)
+    return pairs
+
+
+def box_to_z(box):
+    """[x1, y1, x2, y2] -> measurement [cx, cy, area, aspect]"""
+    w = box[2] - box[0]
+    h = box[3] - box[1]
+    return np.array([box[0] + w / 2, box[1] + h / 2, w * h, w / max(h, 1e-9)])
+
+
+def x_to_box(x):
+    """Kalman state -> [x1, y1, x2, y2]"""
+    area = max(x[2], 1e-9)
+    w = np.sqrt(area * max(x[3], 1e-9))
+    h = area / w
+    return np.array([x[0] - w / 2, x[1] - h / 2, x[0] + w / 2, x[1] + h / 2])
+
+
+class KalmanBoxTrack:
+    """
+    One target: state [cx, cy, area, aspect, vx, vy, varea], constant velocity
+    """
+
+    F = np.eye(7)
+    F[0, 4] = F[1, 5] = F[2, 6] = 1.0
+    H = np.eye(4, 7)
+    R = np.diag([1.0, 1.0, 10.0, 10.0])
+    Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+
+    def __init__(self, track_id, box, conf):
+        self.track_id = track_id
+        self.x = np.zeros(7)
+        self.x[:4] = box_to_z(box)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0])
+        self.conf = conf
+        self.hits = 1
+        self.time_since_update = 0
+        self.reported = False
+
+    def predict(self):
+        """Advance one frame and return the predicted box"""
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0  # Don't let the area go negative
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        self.time_since_update += 1
+        return x_to_box(self.x)
+
+    def update(self, box, conf):
+        """Correct with a matched detection"""
+        y = box_to_z(box) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+        self.conf = conf
+        self.hits += 1
+        self.time_since_update = 0
+
+    @property
+    def box(self):
+        return x_to_box(self.x)
+
+
+class MultiObjectTracker:
+    def __init__(self, iou_threshold=0.3, max_age=30, min_hits=2, max_coast=5):
+        """
+        Initialize the tracker
+
+        Args:
+            iou_threshold (float): Minimum IoU between a detection and a
+                predicted box to continue that track
+            max_age (int): Frames a track survives without a matching detection
+            min_hits (int): Matched detections before a track is reported
+            max_coast (int): Frames a track keeps being reported on its
+                predictions alone (it stays matchable until max_age)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.max_coast = max_coast
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def step(self, detections=None):
+        """
+        Advance one frame
+
+        Args:
+            detections (list): This frame's boxes as {'coords': [x1, y1, x2, y2],
+                'conf': float}, or None for a frame that was not run through
+                the detector (tracks coast on their predictions)
+
+        Returns:
+            list: Confirmed tracks as {'track_id', 'coords', 'conf', 'new'};
+                'new' is True the first frame a track is reported
+        """
+        predicted = np.array([t.predict() for t in self.tracks]).reshape(-1, 4)
+
+        if detections is not None:
+            boxes = np.array([d['coords'] for d in detections], dtype=float).reshape(-1, 4)
+            matches = associate(iou_matrix(boxes, predicted), self.iou_threshold)
+
+            matched = set()
+            for d, t in matches:
+                self.tracks[t].update(boxes[d], detections[d].get('conf', 0.0))
+                matched.add(d)
+
+            for d in range(len(boxes)):
+                if d not in matched:
+                    self.tracks.append(KalmanBoxTrack(next(self._ids), boxes[d], detections[d].get('conf', 0.0)))
+
+        self.tracks = [t for t in self.tracks if t.time_since_update <= self.max_age]
+
+        confirmed = []
+        for track in self.tracks:
+            if track.hits < self.min_hits or track.time_since_update > self.max_coast:
+                continue
+            new = not track.reported
+            track.reported = True
+            confirmed.append({
+                'track_id': track.track_id,
+                'coords': [int(round(v)) for v in track.box],
+                'conf': track.conf,
+                'new': new
+            })
+        return confirmed
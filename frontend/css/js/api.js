@@ -63,12 +63,15 @@ class UltronAPI {
     }
 
     /**
-     * Get all detections
-     * @returns {Promise<Array>} Array of all detection objects
+     * Get a page of detections (oldest first)
+     * @param {Object} params - Optional after_id, limit, fields, alert_level, drone_id,
+     *                          in_safe_zone, min_confidence, max_confidence
+     * @returns {Promise<Array>} Array of detection objects
      */
-    async getAllDetections() {
+    async getAllDetections(params = {}) {
         try {
-            const response = await fetch(`${this.baseURL}/api/detections/all`);
+            const query = new URLSearchParams(params).toString();
+            const response = await fetch(`${this.baseURL}/api/detections/all${query ? `?${query}` : ''}`);
             const data = await response.json();
 
             if (data.success) {
@@ -82,6 +85,36 @@ class UltronAPI {
         }
     }
 
+    /**
+     * Delta sync: detections newer than the client's high-water mark
+     * @param {number|null} id - Highest detection id already loaded (null: only fetch the current marks)
+     * @param {number|null} tombstoneSeq - tombstone_seq from the previous sync
+     * @returns {Promise<Object|null>} { detections, high_water_mark, has_more, tombstones, tombstone_seq, reset }
+     */
+    async getDetectionsSince(id, tombstoneSeq = null) {
+        try {
+            const params = new URLSearchParams();
+            if (id !== null) {
+                params.set('id', id);
+            }
+            if (tombstoneSeq !== null) {
+                params.set('tombstone_seq', tombstoneSeq);
+            }
+
+            const response = await fetch(`${this.baseURL}/api/detections/since?${params}`);
+            const data = await response.json();
+
+            if (data.success) {
+                return data;
+            } else {
+                throw new Error(data.error || 'Failed to sync detections');
+            }
+        } catch (error) {
+            console.error('Error syncing detections:', error);
+            return null;
+        }
+    }
+
     /**
      * Get statistics
      * @param {string} period - 'today', 'week', 'month', or 'all'
@@ -162,11 +195,19 @@ class UltronAPI {
     /**
      * Get heatmap data
      * @param {string} period - 'today', 'week', 'month', or 'all'
+     * @param {string} bbox - Visible area as "west,south,east,north" (optional)
+     * @param {number} zoom - Map zoom level, used with bbox
      * @returns {Promise<Array>} Array of [lat, lon, intensity]
      */
-    async getHeatmapData(period = 'all') {
+    async getHeatmapData(period = 'all', bbox = null, zoom = null) {
         try {
-            const response = await fetch(`${this.baseURL}/api/heatmap?period=${period}`);
+            const params = new URLSearchParams({ period });
+            if (bbox) {
+                params.set('bbox', bbox);
+                params.set('zoom', zoom);
+            }
+
+            const response = await fetch(`${this.baseURL}/api/heatmap?${params}`);
             const data = await response.json();
 
             if (data.success) {
@@ -232,11 +273,41 @@ class UltronAPI {
             return;
         }
 
-        this.socket.on('new_detection', (data) => {
-            callback(data);
+        // Detections arrive batched in 'new_detections' frames
+        this.socket.on('new_detections', (frame, ack) => {
+            frame.detections.forEach(data => callback(data));
+            if (ack) ack(); // Acks pace the server's per-client send queue
         });
     }
 
+    /**
+     * Opt in/out of inline snapshots in 'new_detections' frames (WebSocket)
+     * Without it, detections carry an image_url to load on demand.
+     * @param {boolean} enabled - Receive image_base64 with each detection
+     */
+    subscribeImages(enabled = true) {
+        if (!this.socket) {
+            console.error('WebSocket not initialized! Call initWebSocket() first.');
+            return;
+        }
+
+        this.socket.emit('subscribe_images', { enabled });
+    }
+
+    /**
+     * Narrow the 'new_detections' feed (WebSocket); omitted/null filters receive everything
+     * @param {Object} filters - { drone_ids: [...], min_alert_level: 'MEDIUM', bbox: 'west,south,east,north' }
+     * @returns {Promise<Object>} { success, subscription } or { success: false, error }
+     */
+    subscribe(filters = {}) {
+        if (!this.socket) {
+            console.error('WebSocket not initialized! Call initWebSocket() first.');
+            return Promise.resolve({ success: false, error: 'WebSocket not initialized' });
+        }
+
+        return new Promise(resolve => this.socket.emit('subscribe', filters, resolve));
+    }
+
     /**
      * Request manual update (WebSocket)
      */
@@ -249,6 +320,35 @@ class UltronAPI {
         this.socket.emit('request_update');
     }
 
+    /**
+     * Request a delta sync (WebSocket); the result arrives as 'detections_sync'
+     * @param {number} id - Highest detection id already loaded
+     * @param {number|null} tombstoneSeq - tombstone_seq from the previous sync
+     */
+    syncSince(id, tombstoneSeq = null) {
+        if (!this.socket) {
+            console.error('WebSocket not initialized! Call initWebSocket() first.');
+            return;
+        }
+
+        this.socket.emit('sync_since', { id, tombstone_seq: tombstoneSeq });
+    }
+
+    /**
+     * Listen for delta sync results (WebSocket)
+     * @param {Function} callback - Function to call when a sync result arrives
+     */
+    onDetectionsSync(callback) {
+        if (!this.socket) {
+            console.error('WebSocket not initialized! Call initWebSocket() first.');
+            return;
+        }
+
+        this.socket.on('detections_sync', (data) => {
+            callback(data);
+        });
+    }
+
     /**
      * Listen for detection updates (WebSocket)
      * @param {Function} callback - Function to call when update arrives
@@ -273,6 +373,23 @@ class UltronAPI {
         return `data:image/jpeg;base64,${base64}`;
     }
 
+    /**
+     * Resolve the snapshot <img> source for a detection
+     * Stored detections carry an image_url (served lazily, cached by the browser);
+     * live socket events may still inline image_base64.
+     * @param {Object} detection - Detection object
+     * @returns {string|null} Image URL, data URL, or null if there is no snapshot
+     */
+    static detectionImageSrc(detection) {
+        if (detection.image_url) {
+            return `${CONFIG.API_BASE_URL}${detection.image_url}`;
+        }
+        if (detection.image_base64) {
+            return UltronAPI.imageToDataURL(detection.image_base64);
+        }
+        return null;
+    }
+
     /**
      * Get alert level class based on confidence
      * @param {number} confidence - Confidence score (0-1)
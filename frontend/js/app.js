@@ -10,6 +10,8 @@ class CommandPanel {
         this.maxAlerts = 20;
         this.statsUpdateInterval = null;
         this.audioContext = null;
+        this.lastDetectionId = null; // Delta-sync high-water mark
+        this.tombstoneSeq = null;
 
         // DOM Elements
         this.elements = {
@@ -27,6 +29,7 @@ class CommandPanel {
             setLocationBtn: document.getElementById('setLocationBtn'),
             centerMapBtn: document.getElementById('centerMapBtn'),
             clearMarkersBtn: document.getElementById('clearMarkersBtn'),
+            heatmapBtn: document.getElementById('heatmapBtn'),
             loadingOverlay: document.getElementById('loadingOverlay'),
             toast: document.getElementById('toast'),
             toastIcon: document.getElementById('toastIcon'),
@@ -86,6 +89,11 @@ class CommandPanel {
             console.log('✅ WebSocket connected');
             this.updateConnectionStatus(true);
             this.showToast('✅', 'Connected', 'Real-time updates active');
+
+            // Reconnect: fetch only what was missed while offline
+            if (this.lastDetectionId !== null) {
+                this.api.syncSince(this.lastDetectionId, this.tombstoneSeq);
+            }
         });
 
         socket.on('disconnect', () => {
@@ -94,14 +102,70 @@ class CommandPanel {
             this.showToast('❌', 'Disconnected', 'Attempting to reconnect...');
         });
 
-        socket.on('new_detection', (data) => {
-            console.log('🚨 New detection received:', data);
-            this.handleNewDetection(data);
+        socket.on('new_detections', (frame, ack) => {
+            console.log(`🚨 ${frame.detections.length} new detection(s) received`);
+            this.handleDetectionFrame(frame);
+            if (ack) ack(); // Lets the server send the next frame
+        });
+
+        // The server dropped frames while we were slow: fetch what was missed
+        socket.on('backpressure', (data) => {
+            console.warn(`⚠️ ${data.dropped} frame(s) dropped by the server, resyncing`);
+            if (this.lastDetectionId !== null) {
+                this.api.syncSince(this.lastDetectionId, this.tombstoneSeq);
+            }
         });
 
         socket.on('detections_update', (data) => {
             console.log('📊 Detections update:', data);
         });
+
+        socket.on('detections_sync', (data) => {
+            this.handleDetectionsSync(data);
+        });
+    }
+
+    /**
+     * Track the highest detection id seen (delta-sync high-water mark)
+     */
+    trackDetectionId(id) {
+        if (id && (this.lastDetectionId === null || id > this.lastDetectionId)) {
+            this.lastDetectionId = id;
+        }
+    }
+
+    /**
+     * Apply a delta-sync result (new detections + tombstones)
+     */
+    async handleDetectionsSync(data) {
+        console.log(`🔄 Synced ${data.detections.length} detections, ${data.tombstones.length} tombstone ranges`);
+
+        if (data.reset) {
+            // Missed deletions can no longer be replayed: start over
+            this.map.clearAllMarkers();
+            this.lastDetectionId = null;
+            this.tombstoneSeq = null;
+            await this.loadInitialData();
+            return;
+        }
+
+        this.map.removeMarkersByIds(data.tombstones);
+
+        data.detections.forEach(detection => {
+            this.map.addMarker(detection);
+        });
+        data.detections.slice(-10).forEach(detection => {
+            this.addAlert(detection, false);
+        });
+
+        this.trackDetectionId(data.high_water_mark);
+        this.tombstoneSeq = data.tombstone_seq;
+
+        if (data.has_more) {
+            this.api.syncSince(this.lastDetectionId, this.tombstoneSeq);
+        } else if (data.detections.length) {
+            this.updateStatistics();
+        }
     }
 
     /**
@@ -109,6 +173,13 @@ class CommandPanel {
      */
     async loadInitialData() {
         try {
+            // Take the sync marks first so nothing committed during the load is missed
+            const marks = await this.api.getDetectionsSince(null);
+            if (marks) {
+                this.lastDetectionId = marks.high_water_mark;
+                this.tombstoneSeq = marks.tombstone_seq;
+            }
+
             // Load live detections
             const detections = await this.api.getLiveDetections();
             console.log(`📡 Loaded ${detections.length} live detections`);
@@ -132,17 +203,44 @@ class CommandPanel {
         }
     }
 
+    /**
+     * Handle a batched 'new_detections' frame from WebSocket
+     * One sound, toast and statistics refresh per frame, not per detection
+     */
+    handleDetectionFrame(frame) {
+        const items = frame.detections;
+        if (!items.length) return;
+
+        items.forEach(item => this.handleNewDetection(item, false));
+
+        // Notify about the most confident detection in the frame
+        const top = items.reduce((best, item) =>
+            item.detection.confidence > best.detection.confidence ? item : best);
+        const alertLevel = this.getAlertLevel(top.detection.confidence);
+        this.playAlertSound(alertLevel);
+        this.updateStatistics();
+
+        const more = items.length > 1 ? ` (+${items.length - 1} more)` : '';
+        this.showToast('🚨', `${alertLevel} Alert`, `${top.detection.message}${more}`);
+    }
+
     /**
      * Handle new detection from WebSocket
+     * @param {Object} data - { detection, duration, detection_id }
+     * @param {boolean} notify - Play sound, toast and refresh statistics
      */
-    handleNewDetection(data) {
+    handleNewDetection(data, notify = true) {
         const { detection, duration, detection_id } = data;
+        detection.id = detection.id ?? detection_id;
+        this.trackDetectionId(detection_id);
 
         // Add marker to map
         this.map.addMarker(detection);
 
         // Add to alerts feed
-        this.addAlert(detection, true); // Play sound
+        this.addAlert(detection, notify); // Play sound
+
+        if (!notify) return;
 
         // Update statistics
         this.updateStatistics();
@@ -156,8 +254,9 @@ class CommandPanel {
      * Add alert to feed
      */
     addAlert(detection, playSound = true) {
-        const { timestamp, confidence, message, latitude, longitude, image_base64 } = detection;
+        const { timestamp, confidence, message, latitude, longitude } = detection;
         const alertLevel = this.getAlertLevel(confidence);
+        const imageSrc = UltronAPI.detectionImageSrc(detection);
 
         // Create alert element
         const alertElement = document.createElement('div');
@@ -167,7 +266,7 @@ class CommandPanel {
                 <span class="alert-time">${timestamp}</span>
                 <span class="alert-confidence ${alertLevel.toLowerCase()}">${(confidence * 100).toFixed(1)}%</span>
             </div>
-            ${image_base64 ? `<img src="data:image/jpeg;base64,${image_base64}" class="alert-image" alt="Detection" />` : ''}
+            ${imageSrc ? `<img src="${imageSrc}" class="alert-image" alt="Detection" loading="lazy" />` : ''}
             <div class="alert-message">${message}</div>
             <div class="alert-location">📍 ${latitude.toFixed(6)}, ${longitude.toFixed(6)}</div>
         `;
@@ -332,6 +431,7 @@ class CommandPanel {
         // Statistics period change
         this.elements.statsPeriod.addEventListener('change', () => {
             this.updateStatistics();
+            this.map.refreshHeatmap();
         });
 
         // Export CSV
@@ -372,6 +472,19 @@ class CommandPanel {
             this.showToast('🗑️', 'Markers Cleared', 'All detection markers removed');
         });
 
+        // Toggle heatmap (follows the stats period selector)
+        this.elements.heatmapBtn.addEventListener('click', () => {
+            if (this.map.heatmapLoader) {
+                this.map.disableHeatmap();
+                this.elements.heatmapBtn.classList.remove('active');
+            } else {
+                this.map.enableHeatmap((bbox, zoom) =>
+                    this.api.getHeatmapData(this.elements.statsPeriod.value, bbox, zoom));
+                this.elements.heatmapBtn.classList.add('active');
+                this.showToast('🔥', 'Heatmap On', 'Detection density for the selected period');
+            }
+        });
+
         // Set GPS Location button
         this.elements.setLocationBtn.addEventListener('click', () => {
             this.openLocationModal();